@@ -2,11 +2,19 @@ import pygame
 import pandas as pd
 import tkinter as tk
 from tkinter import filedialog, simpledialog
-from pyproj import Transformer, CRS
 import sys
 import datetime
+import math
 import os
-from PIL import Image, ImageSequence  # For GIF support
+import queue
+import threading
+from collections import OrderedDict, namedtuple
+import numpy as np
+from PIL import Image  # For GIF support
+from naiad.ingest import load_mission
+from naiad.playback import PlaybackCursors
+from naiad.projection import column_transform
+from naiad.spatial_index import SegmentIndex
 
 # Constants
 WINDOW_WIDTH, WINDOW_HEIGHT = 1280, 720
@@ -26,37 +34,206 @@ SPEED_INCREMENT = 0.1
 MIN_SPEED = 0.1
 MAX_SPEED = 5.0
 DEFAULT_SPEED = 1.0
+CLICK_TOLERANCE = 8  # Pixels around a trail that still count as a click on it
+GIF_CACHE_FRAMES = 8  # Decoded background frames kept in memory
+TRAIL_ZOOM_TOLERANCE = 1.1  # Zoom ratio up to which cached trails are scaled rather than redrawn
 
-# Initialize Tkinter
-root = tk.Tk()
-root.withdraw()
+# Current position of a track, as used by the centering and auto-zoom helpers
+Position = namedtuple("Position", ["lon", "lat"])
 
 class AnimatedBackground:
-    def __init__(self, gif_path):
-        self.frames = []
+    """GIF background decoded frame by frame on demand.
+
+    Scaled frames are kept in a small LRU cache, so memory does not grow with
+    the length of the GIF and the window opens without decoding it first.
+    With ``prefetch``, a worker thread decodes the next frame while the
+    current one is shown; close() stops it.
+    """
+
+    def __init__(self, gif_path, cache_frames=GIF_CACHE_FRAMES, prefetch=True):
+        self.image = Image.open(gif_path)
+        self.n_frames = getattr(self.image, "n_frames", 1)
         self.current_frame = 0
         self.last_update = pygame.time.get_ticks()
         self.frame_delay = 100  # ms
-        
-        # Load GIF using PIL
-        pil_image = Image.open(gif_path)
-        for frame in ImageSequence.Iterator(pil_image):
-            frame = frame.convert("RGBA")
-            pygame_image = pygame.image.fromstring(
-                frame.tobytes(), frame.size, frame.mode
-            ).convert_alpha()
-            self.frames.append(pygame.transform.scale(
-                pygame_image, (WINDOW_WIDTH, WINDOW_HEIGHT)
-            ))
-    
+        self.cache_frames = cache_frames
+        # Frame index -> scaled surface, least recently shown first
+        self.frames = OrderedDict()
+        # Frames decoded by the worker thread, not yet shown
+        self.ready = {}
+        # The Pillow image is shared by both threads; seek and convert under the lock
+        self.lock = threading.Lock()
+        self.requests = None
+        self.worker = None
+        if prefetch and self.n_frames > 1:
+            self.requests = queue.Queue(maxsize=1)
+            self.worker = threading.Thread(target=self._prefetch, daemon=True)
+            self.worker.start()
+            self.requests.put(1)
+
+    def _decode(self, index):
+        with self.lock:
+            self.image.seek(index)
+            frame = self.image.convert("RGBA")
+        surface = pygame.image.fromstring(frame.tobytes(), frame.size, frame.mode)
+        return pygame.transform.scale(surface, (WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    def _prefetch(self):
+        while True:
+            index = self.requests.get()
+            if index is None:
+                return
+            if index not in self.frames and index not in self.ready:
+                self.ready[index] = self._decode(index)
+
+    def close(self):
+        """Stop the prefetch thread and wait for it to finish the frame it is decoding."""
+        if self.worker is None:
+            return
+        # The main thread is the only producer: once the pending request is dropped, the stop request fits
+        try:
+            self.requests.get_nowait()
+        except queue.Empty:
+            pass
+        self.requests.put(None)
+        self.worker.join()
+        self.worker = None
+        self.requests = None
+
     def update(self):
         now = pygame.time.get_ticks()
         if now - self.last_update > self.frame_delay:
             self.last_update = now
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-    
+            self.current_frame = (self.current_frame + 1) % self.n_frames
+            if self.requests is not None:
+                try:
+                    self.requests.put_nowait((self.current_frame + 1) % self.n_frames)
+                except queue.Full:
+                    pass
+
     def get_current_frame(self):
-        return self.frames[self.current_frame]
+        index = self.current_frame
+        if index in self.frames:
+            self.frames.move_to_end(index)
+            return self.frames[index]
+        surface = self.ready.pop(index, None)
+        if surface is None:
+            surface = self._decode(index)
+        # Frames the display skipped are not kept
+        upcoming = (index + 1) % self.n_frames
+        for stale in [i for i in list(self.ready) if i != upcoming]:
+            self.ready.pop(stale, None)
+        self.frames[index] = surface.convert_alpha()
+        if len(self.frames) > self.cache_frames:
+            self.frames.popitem(last=False)
+        return self.frames[index]
+
+class TrailCache:
+    """Off-screen surface holding the trails drawn so far.
+
+    Each frame only the segments that became visible since the previous frame
+    are drawn into the surface, which is then blitted in one call. The surface
+    is larger than the window and anchored at a map centre, so recentring is a
+    blit offset. Trails are drawn at the zoom of the last rebuild and scaled to
+    the current zoom when blitted, so small zoom changes (auto-zoom) do not
+    redraw them. The surface is cleared (and rebuilt on the following extend
+    calls) when the zoom moves beyond TRAIL_ZOOM_TOLERANCE of that zoom, when
+    the visibility filter changes, when the time goes backwards, or when the
+    surface no longer covers the window.
+    """
+
+    def __init__(self, store, colors, margin=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)):
+        self.store = store
+        # Trail colour of each track, by rank in the store
+        self.colors = [colors[track_id] for track_id in store.ids]
+        self.margin = margin
+        self.surface = pygame.Surface(
+            (WINDOW_WIDTH + 2 * margin[0], WINDOW_HEIGHT + 2 * margin[1]), pygame.SRCALPHA)
+        # Number of points of each track already drawn into the surface
+        self.drawn = np.zeros(len(store), dtype=np.int64)
+        self.zoom = None
+        self.visible_key = None
+        self.anchor = None
+        self.last_time = None
+
+    def invalidate(self):
+        self.zoom = None
+
+    def _placement(self, zoom_level, center_lat, center_lon):
+        # Scale from the surface to the screen, and screen position of the surface's corner
+        scale = zoom_level / self.zoom
+        ax, ay = latlon_to_screen(self.anchor[0], self.anchor[1], zoom_level, center_lat, center_lon)
+        if scale == 1:
+            return scale, ax - WINDOW_WIDTH // 2 - self.margin[0], ay - WINDOW_HEIGHT // 2 - self.margin[1]
+        return (scale, ax - (WINDOW_WIDTH // 2 + self.margin[0]) * scale,
+                ay - (WINDOW_HEIGHT // 2 + self.margin[1]) * scale)
+
+    def _covers(self, zoom_level, center_lat, center_lon):
+        scale, left, top = self._placement(zoom_level, center_lat, center_lon)
+        width, height = self.surface.get_size()
+        return (left <= 0 and top <= 0 and left + width * scale >= WINDOW_WIDTH
+                and top + height * scale >= WINDOW_HEIGHT)
+
+    def set_view(self, zoom_level, center_lat, center_lon, visible_key, current_time):
+        """Prepare the surface for this frame's view, clearing it when it cannot be reused."""
+        rewound = self.last_time is not None and current_time < self.last_time
+        self.last_time = current_time
+        if (self.zoom is not None and visible_key == self.visible_key and not rewound
+                and 1 / TRAIL_ZOOM_TOLERANCE <= zoom_level / self.zoom <= TRAIL_ZOOM_TOLERANCE
+                and self._covers(zoom_level, center_lat, center_lon)):
+            return
+        self.zoom = zoom_level
+        self.visible_key = visible_key
+        self.anchor = (center_lat, center_lon)
+        self.surface.fill((0, 0, 0, 0))
+        self.drawn[:] = 0
+
+    def extend(self, tracks, ends):
+        """Draw the segments of each track up to its point ``ends[i]`` that are not drawn yet.
+
+        The new points of all tracks are projected together, then each trail
+        is drawn with a single polyline.
+        """
+        tracks = np.asarray(tracks, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        # Restart from the last drawn point so the polyline stays connected
+        starts = np.maximum(self.drawn[tracks] - 1, 0)
+        self.drawn[tracks] = np.maximum(self.drawn[tracks], ends)
+        new = ends - starts >= 2
+        tracks, starts, counts = tracks[new], starts[new], (ends - starts)[new]
+        if not len(tracks):
+            return
+        # Indices of the new points in the store's columns, track after track
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        index = np.arange(bounds[-1]) + np.repeat(self.store.offsets[tracks] + starts - bounds[:-1], counts)
+        points = project_to_screen(self.store.lat[index], self.store.lon[index], self.zoom,
+                                   self.anchor[0], self.anchor[1], offset=self.margin)
+        # Consecutive fixes falling on the same pixel add nothing to a polyline
+        keep = np.ones(len(points), dtype=bool)
+        keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+        keep[bounds[:-1]] = True
+        kept = np.cumsum(keep)
+        bounds = np.concatenate([[0], kept[bounds[1:] - 1]])
+        points = points[keep]
+        for k, a, b in zip(tracks.tolist(), bounds[:-1].tolist(), bounds[1:].tolist()):
+            if b - a >= 2:
+                pygame.draw.lines(self.surface, self.colors[k], False, points[a:b], 2)
+
+    def blit(self, screen, zoom_level, center_lat, center_lon):
+        scale, left, top = self._placement(zoom_level, center_lat, center_lon)
+        if scale == 1:
+            screen.blit(self.surface, (left, top))
+            return
+        # Only the part of the surface that lands in the window is scaled
+        width, height = self.surface.get_size()
+        x0, y0 = max(0, math.floor(-left / scale)), max(0, math.floor(-top / scale))
+        x1 = min(width, math.ceil((WINDOW_WIDTH - left) / scale))
+        y1 = min(height, math.ceil((WINDOW_HEIGHT - top) / scale))
+        if x1 <= x0 or y1 <= y0:
+            return
+        part = self.surface.subsurface((x0, y0, x1 - x0, y1 - y0))
+        size = (round((x1 - x0) * scale), round((y1 - y0) * scale))
+        screen.blit(pygame.transform.scale(part, size), (round(left + x0 * scale), round(top + y0 * scale)))
 
 def prompt_manual_column_selection(df):
     col_names = df.columns.tolist()
@@ -82,22 +259,17 @@ def load_and_process_csv():
     if not file_path:
         sys.exit("No file selected.")
 
-    df = pd.read_csv(file_path)
-    x_col, y_col, t_col, id_col = prompt_manual_column_selection(df)
-    df = df.dropna(subset=[x_col, y_col, t_col])
-    df[t_col] = pd.to_datetime(df[t_col])
+    # Only the header is needed to pick the columns
+    header = pd.read_csv(file_path, nrows=0)
+    x_col, y_col, t_col, id_col = prompt_manual_column_selection(header)
 
     projection_input = simpledialog.askstring("Projection", "Enter projection (e.g., EPSG:4326)", initialvalue="EPSG:4326")
-    transformer = Transformer.from_crs(CRS(projection_input), CRS("EPSG:4326"), always_xy=True)
-    df['lon'], df['lat'] = zip(*df.apply(lambda row: transformer.transform(row[x_col], row[y_col]), axis=1))
-    df['timestamp'] = df[t_col]
 
-    if id_col:
-        df['id'] = df[id_col]
-    else:
-        df['id'] = 0
-
-    return df
+    # Parsed and reprojected missions are cached on disk, keyed by file, columns and CRS.
+    # On a cache miss, coordinates are reprojected by whole column chunks in this process.
+    columns = {'id': id_col, 'lon': x_col, 'lat': y_col, 'time': t_col, 'depth': None}
+    reproject = column_transform(projection_input, x_col, y_col)
+    return load_mission(file_path, columns, crs=projection_input, transform=reproject)
 
 def latlon_to_screen(lat, lon, zoom_level=8.0, center_lat=None, center_lon=None):
     if center_lat is None or center_lon is None:
@@ -109,6 +281,26 @@ def latlon_to_screen(lat, lon, zoom_level=8.0, center_lat=None, center_lon=None)
     
     return int(x), int(y)
 
+def project_to_screen(lats, lons, zoom_level, center_lat, center_lon, offset=(0, 0)):
+    """Vectorized latlon_to_screen: (N, 2) integer screen coordinates of whole arrays.
+
+    The projection is a single affine transform per axis; ``offset`` is added
+    to the result, e.g. the margin of an off-screen surface.
+    """
+    scale_x = WINDOW_WIDTH / 360 * zoom_level
+    scale_y = WINDOW_HEIGHT / 180 * zoom_level
+    points = np.empty((len(lats), 2), dtype=np.int64)
+    # Truncation toward zero, as int() in latlon_to_screen
+    points[:, 0] = (np.asarray(lons) - center_lon) * scale_x + (WINDOW_WIDTH // 2)
+    points[:, 1] = (center_lat - np.asarray(lats)) * scale_y + (WINDOW_HEIGHT // 2)
+    points += offset
+    return points
+
+def screen_to_latlon(x, y, zoom_level, center_lat, center_lon):
+    lon = (x - WINDOW_WIDTH // 2) / (WINDOW_WIDTH / 360) / zoom_level + center_lon
+    lat = center_lat - (y - WINDOW_HEIGHT // 2) / (WINDOW_HEIGHT / 180) / zoom_level
+    return lat, lon
+
 def load_background():
     file_path = filedialog.askopenfilename(
         title="Select Background Image/GIF", 
@@ -158,19 +350,8 @@ def draw_button(screen, text, x, y, width, height, color, font):
     label = font.render(text, True, (255, 255, 255))
     screen.blit(label, (x + (width - label.get_width()) // 2, y + (height - label.get_height()) // 2))
 
-def calculate_bounding_box(grouped_paths):
-    min_lat = float('inf')
-    max_lat = -float('inf')
-    min_lon = float('inf')
-    max_lon = -float('inf')
-    
-    for track_id, points in grouped_paths.items():
-        for point in points:
-            min_lat = min(min_lat, point.lat)
-            max_lat = max(max_lat, point.lat)
-            min_lon = min(min_lon, point.lon)
-            max_lon = max(max_lon, point.lon)
-    
+def calculate_bounding_box(store):
+    min_lon, min_lat, max_lon, max_lat = store.bounds()
     return min_lat, max_lat, min_lon, max_lon
 
 def calculate_active_center(current_positions):
@@ -188,7 +369,7 @@ def calculate_active_center(current_positions):
     
     return sum_lat / count, sum_lon / count
 
-def calculate_auto_zoom(current_positions, grouped_paths):
+def calculate_auto_zoom(current_positions, store):
     if not current_positions:
         return 1.0
     
@@ -250,19 +431,28 @@ def draw_grid(screen, font, zoom_level, center_lat, center_lon):
         lat += grid_spacing * 2  # Skip every other line
 
 def main():
-    df = load_and_process_csv()
-    grouped_paths = {}
+    # Hidden Tk root for the file and column dialogs
+    root = tk.Tk()
+    root.withdraw()
+
+    # Columnar store: one contiguous array per column, sliced per track
+    store = load_and_process_csv()
     colors = {}
     current_positions = {}
     color_palette = [(255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (0, 255, 255), (255, 0, 255)]
 
-    for i, (track_id, group) in enumerate(df.groupby("id")):
-        group = group.sort_values("timestamp")
-        grouped_paths[track_id] = list(group.itertuples(index=False))
+    for i, track_id in enumerate(store.ids):
         colors[track_id] = color_palette[i % len(color_palette)]
 
-    min_time = df['timestamp'].min()
-    max_time = df['timestamp'].max()
+    # Grid index over trail segments for click-to-identify
+    segment_index = SegmentIndex(store)
+    identified = None
+    # Playback cursor per track, advanced incrementally and repositioned on replay
+    cursors = PlaybackCursors(store)
+    # Trails drawn so far, extended incrementally each frame
+    trails = TrailCache(store, colors)
+
+    min_time, max_time = store.timestamps(store.time_range())
     current_time = min_time
     speed = DEFAULT_SPEED
 
@@ -307,18 +497,17 @@ def main():
         
         # Auto-adjust zoom if needed to keep all points visible
         if auto_zoom and current_positions:
-            zoom_level = calculate_auto_zoom(current_positions, grouped_paths)
+            zoom_level = calculate_auto_zoom(current_positions, store)
         
         # Draw the grid with labels on all sides
         draw_grid(screen, font, zoom_level, center_lat, center_lon)
 
         mouse_pos = pygame.mouse.get_pos()
-        geo_lon = (mouse_pos[0] - WINDOW_WIDTH // 2) / (WINDOW_WIDTH / 360) / zoom_level + center_lon
-        geo_lat = center_lat - (mouse_pos[1] - WINDOW_HEIGHT // 2) / (WINDOW_HEIGHT / 180) / zoom_level
+        geo_lat, geo_lon = screen_to_latlon(mouse_pos[0], mouse_pos[1], zoom_level, center_lat, center_lon)
         
         # Draw unified UI panel in top-left corner
         panel_width = 220
-        panel_height = 100 + len(selected_ids) * 20
+        panel_height = 100 + len(selected_ids) * 20 + (60 if identified else 0)
         panel_surface = pygame.Surface((panel_width, panel_height))
         panel_surface.fill(UI_BG_COLOR)
         screen.blit(panel_surface, (10, 10))
@@ -340,33 +529,41 @@ def main():
             id_label = small_font.render(str(sid), True, UI_TEXT_COLOR)
             screen.blit(id_label, (35, y_offset + 20 * (i + 1)))
 
+        # Last identified trail point
+        if identified:
+            y_offset += 20 * (len(selected_ids) + 1) + 5
+            hit_time = store.timestamps(identified.time)[0]
+            for i, text in enumerate([f"ID: {identified.track_id}",
+                                      f"Time: {hit_time.strftime('%Y-%m-%d %H:%M')}",
+                                      f"Depth: {identified.depth:.1f}"]):
+                screen.blit(small_font.render(text, True, UI_TEXT_COLOR), (20, y_offset + 18 * i))
+
         # Draw trails and points
-        for track_id, points in grouped_paths.items():
-            if hide_non_selected and track_id not in selected_ids:
-                continue
-            prev = None
-            for row in points:
-                if row.timestamp <= current_time:
-                    if show_trail and prev:
-                        px, py = latlon_to_screen(prev.lat, prev.lon, zoom_level, center_lat, center_lon)
-                        cx, cy = latlon_to_screen(row.lat, row.lon, zoom_level, center_lat, center_lon)
-                        pygame.draw.line(screen, colors[track_id], (px, py), (cx, cy), 2)
-                    current_positions[track_id] = row
-                    prev = row
-
-        for track_id, row in current_positions.items():
-            if hide_non_selected and track_id not in selected_ids:
-                continue
-            x, y = latlon_to_screen(row.lat, row.lon, zoom_level, center_lat, center_lon)
-            circle = pygame.draw.circle(screen, colors[track_id], (x, y), 5)
-            if track_id in selected_ids:
-                pygame.draw.circle(screen, (255, 255, 255), (x, y), 8, 2)
-            if circle.collidepoint(mouse_pos):
-                if pygame.mouse.get_pressed()[0]:
-                    if track_id in selected_ids:
-                        selected_ids.remove(track_id)
-                    else:
-                        selected_ids.add(track_id)
+        if show_trail:
+            visible_key = frozenset(selected_ids) if hide_non_selected else None
+            trails.set_view(zoom_level, center_lat, center_lon, visible_key, current_time.value)
+        # Points up to current_time form a prefix of each track's sorted timestamps
+        cursors.advance(current_time.value)
+        shown = cursors.started()
+        if hide_non_selected:
+            shown = shown[np.isin(shown, [store.index(track_id) for track_id in selected_ids])]
+        current = cursors.current(shown)
+        for k, lon, lat in zip(shown.tolist(), store.lon[current].tolist(), store.lat[current].tolist()):
+            current_positions[store.ids[k]] = Position(lon, lat)
+        if show_trail:
+            trails.extend(shown, cursors.ends[shown])
+            trails.blit(screen, zoom_level, center_lat, center_lon)
+
+        shown = [track_id for track_id in current_positions
+                 if not hide_non_selected or track_id in selected_ids]
+        if shown:
+            points = project_to_screen([current_positions[t].lat for t in shown],
+                                       [current_positions[t].lon for t in shown],
+                                       zoom_level, center_lat, center_lon)
+            for track_id, (x, y) in zip(shown, points.tolist()):
+                pygame.draw.circle(screen, colors[track_id], (x, y), 5)
+                if track_id in selected_ids:
+                    pygame.draw.circle(screen, (255, 255, 255), (x, y), 8, 2)
 
         draw_progress_bar(screen, current_time, min_time, max_time, font, speed)
 
@@ -382,6 +579,8 @@ def main():
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
+                if background_is_gif:
+                    background.close()
                 pygame.quit()
                 return
             elif event.type == pygame.MOUSEBUTTONDOWN:
@@ -401,6 +600,7 @@ def main():
                         paused = False
                     elif 110 <= y <= 110 + BUTTON_HEIGHT:
                         show_trail = not show_trail
+                        trails.invalidate()
                     elif 160 <= y <= 160 + BUTTON_HEIGHT:
                         if time_step_mode == 'hour': time_step_mode = 'day'
                         elif time_step_mode == 'day': time_step_mode = 'month'
@@ -410,7 +610,19 @@ def main():
                     elif 260 <= y <= 260 + BUTTON_HEIGHT:
                         auto_zoom = not auto_zoom
                         if auto_zoom and current_positions:
-                            zoom_level = calculate_auto_zoom(current_positions, grouped_paths)
+                            zoom_level = calculate_auto_zoom(current_positions, store)
+                else:
+                    # Click on a drawn trail: nearest segment within a few pixels toggles its drone
+                    click_lat, click_lon = screen_to_latlon(x, y, zoom_level, center_lat, center_lon)
+                    tolerance = CLICK_TOLERANCE / (WINDOW_WIDTH / 360) / zoom_level
+                    hit = segment_index.nearest(click_lon, click_lat, tolerance, before=current_time.value,
+                                                tracks=selected_ids if hide_non_selected else None)
+                    if hit:
+                        identified = hit
+                        if hit.track_id in selected_ids:
+                            selected_ids.remove(hit.track_id)
+                        else:
+                            selected_ids.add(hit.track_id)
 
             elif event.type == pygame.MOUSEWHEEL:
                 if not auto_zoom:  # Only allow manual zoom when auto-zoom is off
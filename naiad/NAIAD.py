@@ -5,25 +5,40 @@ Module principal du plugin NAIAD
 
 from qgis.core import (
     QgsVectorLayer, QgsProject, QgsField, QgsFields, QgsFeature,
-    QgsGeometry, QgsPointXY, QgsPoint, QgsRendererCategory, QgsCategorizedSymbolRenderer,
-    QgsMarkerSymbol, QgsLineSymbol, Qgis
+    QgsGeometry, QgsLineString,
+    QgsMarkerSymbol, QgsLineSymbol, QgsMessageLog, QgsApplication, Qgis
 )
-from qgis.PyQt.QtCore import Qt, QTimer, QVariant
+from qgis.PyQt.QtCore import Qt, QTimer, QVariant, QSettings
 from qgis.PyQt.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QSlider, QAction
 from qgis.PyQt.QtGui import QIcon
-from datetime import datetime, timedelta
-import pandas as pd
-from math import hypot
 import os
+import numpy as np
 from .NAIAD_dialog import NAIADDialog
+from .ingest import OperationAnnulee
+from .follow import CsvTail
+from .live_layers import LiveLayers, to_qdatetime
+from .telemetry import TelemetryReceiver
+from .playback import MissionClock, sample_index
+from .tasks import TacheMission, TacheTrajectoires, afficher_progression
+from .temporal import configurer_controleur, renderer_drones
+from .map_tools import OutilIdentification
+from .temporal_index import TemporalIndex
+from .simplification import ECHELLES_LOD, niveaux as simplification_lod
+from .geopackage import geopackage_path
+from .interpolation import SamplingPolicy, IMAGES_PAR_HEURE, METRES_PAR_SOMMET, BUDGET_IMAGES
 
 
 class CustomAnimationDialog(QDialog):
-    def __init__(self, df, iface, parent=None):
+    # Nombre de sommets au-delà duquel l'entité vivante d'un drone est figée
+    SOMMETS_PAR_ENTITE = 500
+    # Durée (s) de la lecture complète d'une mission à la vitesse 1.0
+    DUREE_LECTURE = 60.0
+
+    def __init__(self, store, iface, parent=None, track_paths=None):
         super().__init__(parent)
         self.setWindowTitle("NAIAD - Animation")
         self.iface = iface
-        self.df = df
+        self.store = store
         self.setMinimumWidth(400)
 
         # Configuration du timer pour l'animation (toutes les 100 ms)
@@ -33,19 +48,29 @@ class CustomAnimationDialog(QDialog):
 
         self.speed = 1.0
         self.paused = True
-        self.frame = 0
 
-        # Construction des trajectoires interpolées pour chaque drone
-        self.track_paths = self.build_paths(df)
-        self.total_frames = max(len(p) for p in self.track_paths.values())
+        # État des entités vivantes : dernier sommet émis, ligne en cours et son identifiant
+        self.emitted = {}
+        self.live_lines = {}
+        self.live_fids = {}
+
+        # Trajectoires interpolées pour chaque drone (éventuellement précalculées en tâche de fond)
+        self.track_paths = track_paths if track_paths is not None else self.build_paths(store)
+
+        # Horloge de mission : lecture en temps de mission, indépendante des frames
+        debut, fin = self.track_paths.time_range()
+        self.clock = MissionClock(debut, fin, self.DUREE_LECTURE)
+        # Index des durées de mission : seuls les drones actifs depuis l'image précédente sont visités
+        self.temporal_index = TemporalIndex(self.track_paths)
+        self.t_precedent = debut
         self.layer = self.create_layer()
 
         self.setup_ui()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
-        # Affichage de la frame courante et de l'heure
-        self.label_info = QLabel("Frame : 0 | Heure : -")
+        # Affichage de l'avancement et de l'heure de mission
+        self.label_info = QLabel("Avancement : 0 % | Heure : -")
         layout.addWidget(self.label_info)
 
         button_layout = QHBoxLayout()
@@ -72,57 +97,44 @@ class CustomAnimationDialog(QDialog):
 
     def update_speed(self, value):
         self.speed = value / 10.0
+        self.clock.speed = self.speed
 
     def toggle_play(self):
         self.paused = not self.paused
         if not self.paused:
+            self.clock.start()
             self.timer.start()
             self.btn_play.setText("⏸ Pause")
         else:
+            self.clock.pause()
             self.timer.stop()
             self.btn_play.setText("▶ Play")
 
     def reset_animation(self):
         # Lors du Replay, on efface le contenu de la couche pour recommencer
         self.layer.dataProvider().truncate()
-        self.frame = 0
+        self.emitted.clear()
+        self.live_lines.clear()
+        self.live_fids.clear()
+        self.clock.reset()
+        self.t_precedent = self.clock.time
+        self.clock.start()
         self.timer.start()
         self.paused = False
         self.btn_play.setText("⏸ Pause")
 
-    def build_paths(self, df):
-        paths = {}
-        # Regroupement par drone_id pour construire les trajectoires
-        for track_id, group in df.groupby('drone_id'):
-            path = []
-            group = group.sort_values('timestamp')
-            if len(group) >= 2:
-                for i in range(len(group) - 1):
-                    r1, r2 = group.iloc[i], group.iloc[i + 1]
-                    steps = self.calculate_steps(r1, r2)
-                    for s in range(steps):
-                        f = s / steps
-                        lon = r1['longitude'] + f * (r2['longitude'] - r1['longitude'])
-                        lat = r1['latitude'] + f * (r2['latitude'] - r1['latitude'])
-                        ts = r1['timestamp'] + (r2['timestamp'] - r1['timestamp']) * f
-                        path.append((lon, lat, ts))
-            else:
-                # Cas d'un seul point
-                r = group.iloc[0]
-                path.append((r['longitude'], r['latitude'], r['timestamp']))
-            paths[track_id] = path
-        return paths
-
-    def calculate_steps(self, row1, row2):
-        dx = row2['longitude'] - row1['longitude']
-        dy = row2['latitude'] - row1['latitude']
-        dist = hypot(dx, dy)
-        return max(5, min(50, int(dist * 100)))
+    def build_paths(self, store):
+        # Stockage columnar des échantillons interpolés de tous les drones (vectorisé)
+        return store.interpolated()
+
+    def format_time(self, t):
+        # Texte de l'heure, pour l'étiquette d'état seulement
+        return self.track_paths.timestamps(t)[0].isoformat()
 
     def create_layer(self):
         fields = QgsFields()
         fields.append(QgsField("drone_id", QVariant.String))
-        fields.append(QgsField("timestamp", QVariant.String))
+        fields.append(QgsField("timestamp", QVariant.DateTime))
         # Création d'une couche en mémoire de type LineString pour afficher l'animation
         layer = QgsVectorLayer("LineString?crs=EPSG:4326", "Lignes d'animation", "memory")
         pr = layer.dataProvider()
@@ -130,62 +142,114 @@ class CustomAnimationDialog(QDialog):
         layer.updateFields()
 
         # Attribution d'une couleur différente pour chaque drone
-        categories = []
-        palette = ["red", "blue", "green", "orange", "purple", "cyan", "magenta"]
-        for i, drone_id in enumerate(self.track_paths.keys()):
-            symbol = QgsLineSymbol.createSimple({"color": palette[i % len(palette)], "width": "1"})
-            category = QgsRendererCategory(str(drone_id), symbol, str(drone_id))
-            categories.append(category)
-        renderer = QgsCategorizedSymbolRenderer("drone_id", categories)
-        layer.setRenderer(renderer)
+        layer.setRenderer(renderer_drones(self.track_paths.ids))
 
         QgsProject.instance().addMapLayer(layer)
         return layer
 
     def update_frame(self):
-        # Pendant le mode Play, on conserve les trajectoires précédentes (aucun effacement)
-        features = []
-
-        # Pour chaque drone, on construit la trajectoire de l'origine jusqu'à la frame actuelle
-        for track_id, path in self.track_paths.items():
-            if self.frame < len(path):
-                points = [QgsPointXY(pt[0], pt[1]) for pt in path[:self.frame+1]]
-                if len(points) < 2:
-                    continue  # Moins de deux points : pas de ligne
+        # Une seule entité « vivante » par drone, prolongée avec les seuls nouveaux sommets
+        pr = self.layer.dataProvider()
+        nouvelles, ids_nouvelles = [], []
+        geometries, attributs = {}, {}
+        t = self.clock.tick()
+
+        # Drones en mission entre l'image précédente et t, puis position par recherche dichotomique
+        for k, _, _ in self.temporal_index.overlapping(self.t_precedent, t):
+            track_id = self.track_paths.ids[k]
+            lon, lat, _, times = self.track_paths.track(k)
+            fin = sample_index(times, t)
+            emis = self.emitted.get(track_id, 0)
+            if fin <= emis:
+                continue  # Aucun nouveau sommet pour ce drone
+
+            heure = to_qdatetime(times[fin])
+            ajout = QgsLineString(lon[emis + 1:fin + 1].tolist(), lat[emis + 1:fin + 1].tolist())
+
+            line = self.live_lines.get(track_id)
+            if line is None or line.numPoints() >= self.SOMMETS_PAR_ENTITE:
+                # Nouvelle entité (la précédente est figée), raccordée au dernier sommet émis
+                line = QgsLineString([float(lon[emis])], [float(lat[emis])])
+                self.live_lines[track_id] = line
+                self.live_fids.pop(track_id, None)
+            line.append(ajout)
+            fid = self.live_fids.get(track_id)
+            if fid is None:
+                # Entité pas encore dans la couche (nouvelle, ou ajout précédent refusé)
                 feat = QgsFeature()
-                feat.setGeometry(QgsGeometry.fromPolylineXY(points))
-                feat.setAttributes([track_id, path[self.frame][2].isoformat()])
-                features.append(feat)
-
-        self.layer.dataProvider().addFeatures(features)
+                feat.setGeometry(QgsGeometry(line.clone()))
+                feat.setAttributes([track_id, heure])
+                nouvelles.append(feat)
+                ids_nouvelles.append(track_id)
+            else:
+                geometries[fid] = QgsGeometry(line.clone())
+                attributs[fid] = {1: heure}
+            self.emitted[track_id] = fin
+
+        self.t_precedent = t
+
+        if nouvelles:
+            ok, ajoutees = pr.addFeatures(nouvelles)
+            if ok:
+                for track_id, feat in zip(ids_nouvelles, ajoutees):
+                    self.live_fids[track_id] = feat.id()
+        if geometries:
+            pr.changeGeometryValues(geometries)
+            pr.changeAttributeValues(attributs)
         self.layer.updateExtents()
 
         # Mise à jour de l'affichage de l'heure
-        if features:
-            current_time = features[0].attributes()[1]
-        else:
-            current_time = "-"
-        self.label_info.setText(f"Frame : {self.frame}/{self.total_frames} | Heure : {current_time}")
+        self.label_info.setText(
+            f"Avancement : {self.clock.progress:.0%} | Heure : {self.format_time(t)}")
 
         # Forcer le rafraîchissement de la couche sans modifier la vue (pas de changement de l'étendue)
         self.layer.triggerRepaint()
 
-        self.frame += int(self.speed)
-        if self.frame >= self.total_frames:
-            self.frame = self.total_frames - 1
+        if self.clock.finished:
+            self.clock.pause()
             self.timer.stop()
             self.btn_play.setText("▶ Play")
             self.paused = True
 
 
 class NAIAD:
+    # Quantité maximale lue par actualisation du suivi en direct (octets) : une
+    # tranche est convertie en entités dans le thread de l'interface
+    OCTETS_PAR_LECTURE = 2 * 1024 ** 2
+    # Cadence de transfert de la télémétrie réseau vers les couches (ms)
+    CADENCE_TELEMETRIE = 500
+    # Port d'écoute par défaut (réglage NAIAD/port_telemetrie)
+    PORT_TELEMETRIE = 5005
+
     def __init__(self, iface):
         self.iface = iface
         self.dialog = NAIADDialog()
         self.csv_path = None
+        # Tâches d'arrière-plan en cours (références conservées jusqu'à leur fin)
+        self.taches = []
+
+        # Suivi en direct : lecteur incrémental du CSV et couches alimentées
+        self.suivi = None
+        self.timer_suivi = QTimer()
+        self.timer_suivi.timeout.connect(self.actualiser_suivi)
+        # Rattrapage d'un gros fichier par tranches, le timer périodique étant suspendu
+        self.timer_rattrapage = QTimer()
+        self.timer_rattrapage.setSingleShot(True)
+        self.timer_rattrapage.setInterval(0)
+        self.timer_rattrapage.timeout.connect(self.actualiser_suivi)
+
+        # Télémétrie réseau : récepteur UDP/TCP d'arrière-plan vidé à cadence fixe
+        self.recepteur = None
+        self.couches_reseau = None
+        self.timer_telemetrie = QTimer()
+        self.timer_telemetrie.setInterval(self.CADENCE_TELEMETRIE)
+        self.timer_telemetrie.timeout.connect(self.vider_telemetrie)
 
         self.dialog.bouton_generer.clicked.connect(self.generer_trajectoires)
         self.dialog.bouton_animation.clicked.connect(self.lancer_animation)
+        self.dialog.case_suivi.toggled.connect(self.basculer_suivi)
+        self.dialog.intervalle_suivi.valueChanged.connect(
+            lambda secondes: self.timer_suivi.setInterval(secondes * 1000))
 
     def initGui(self):
         self.action = QAction(QIcon(":/plugins/naiad/icon.png"), "NAIAD", self.iface.mainWindow())
@@ -193,7 +257,25 @@ class NAIAD:
         self.iface.addToolBarIcon(self.action)
         self.iface.addPluginToMenu("&NAIAD", self.action)
 
+        self.action_telemetrie = QAction("Réception télémétrie (UDP/TCP)", self.iface.mainWindow())
+        self.action_telemetrie.setCheckable(True)
+        self.action_telemetrie.toggled.connect(self.basculer_telemetrie)
+        self.iface.addPluginToMenu("&NAIAD", self.action_telemetrie)
+
+        # Identification d'un drone par clic sur sa trajectoire
+        self.outil_identification = OutilIdentification(self.iface.mapCanvas(), self.iface)
+        self.action_identifier = QAction("Identifier un drone", self.iface.mainWindow())
+        self.action_identifier.setCheckable(True)
+        self.action_identifier.toggled.connect(self.basculer_identification)
+        self.outil_identification.setAction(self.action_identifier)
+        self.iface.addPluginToMenu("&NAIAD", self.action_identifier)
+
     def unload(self):
+        self.arreter_suivi()
+        self.arreter_telemetrie()
+        self.iface.mapCanvas().unsetMapTool(self.outil_identification)
+        self.iface.removePluginMenu("&NAIAD", self.action_identifier)
+        self.iface.removePluginMenu("&NAIAD", self.action_telemetrie)
         self.iface.removePluginMenu("&NAIAD", self.action)
         self.iface.removeToolBarIcon(self.action)
 
@@ -203,75 +285,264 @@ class NAIAD:
     def generer_trajectoires(self):
         try:
             self.csv_path = self.dialog.get_chemin_csv()
-            uri = f"file:///{self.csv_path}?type=csv&delimiter=,&xField=longitude&yField=latitude&zField=depth&crs=EPSG:4326"
-            couche_points = QgsVectorLayer(uri, "Points Drone", "delimitedtext")
-
-            if not couche_points.isValid():
-                raise ValueError("Fichier CSV invalide")
+            if self.dialog.case_suivi.isChecked():
+                self.demarrer_suivi()
+                self.iface.messageBar().pushMessage("Succès", "Suivi en direct démarré", level=Qgis.Success)
+                return
 
-            QgsProject.instance().addMapLayer(couche_points)
-            couche_lignes = self.creer_lignes(couche_points)
-            QgsProject.instance().addMapLayer(couche_lignes)
-            self.configurer_styles(couche_points, couche_lignes)
+            if not self.csv_path:
+                raise ValueError("Aucun fichier sélectionné")
 
-            self.iface.messageBar().pushMessage("Succès", "Trajectoires générées", level=Qgis.Success)
+            # Lecture du CSV et construction des lignes en tâche de fond
+            self.lancer_tache(TacheTrajectoires(
+                self.csv_path, self, self.trajectoires_generees, self.signaler_erreur,
+                geopackage=self.chemin_geopackage()))
 
         except Exception as e:
+            self.signaler_erreur(e)
+
+    def trajectoires_generees(self, tache):
+        self.signaler_validation(tache.rapport)
+        self.outil_identification.index = tache.index
+        QgsProject.instance().addMapLayer(tache.points)
+        # Détail complet et niveaux simplifiés regroupés, chacun visible à ses échelles
+        groupe = QgsProject.instance().layerTreeRoot().insertGroup(0, "Trajectoires")
+        for couche in [tache.lignes] + tache.niveaux:
+            QgsProject.instance().addMapLayer(couche, False)
+            groupe.addLayer(couche)
+        self.configurer_styles(tache.points, tache.lignes, tache.niveaux)
+        self.iface.messageBar().pushMessage("Succès", "Trajectoires générées", level=Qgis.Success)
+
+    def politique_echantillonnage(self):
+        # Réglages NAIAD/images_par_heure, NAIAD/metres_par_sommet et NAIAD/budget_images (0 : désactivé)
+        reglages = QSettings()
+        images = float(reglages.value("NAIAD/images_par_heure", IMAGES_PAR_HEURE))
+        metres = float(reglages.value("NAIAD/metres_par_sommet", METRES_PAR_SOMMET))
+        budget = int(reglages.value("NAIAD/budget_images", BUDGET_IMAGES))
+        return SamplingPolicy(images or None, metres or None, budget or None)
+
+    def chemin_geopackage(self):
+        # GeoPackage à côté du CSV si l'option est cochée, sinon couches en mémoire
+        if not self.dialog.case_geopackage.isChecked():
+            return None
+        return geopackage_path(self.csv_path)
+
+    def lancer_tache(self, tache):
+        # Chaque mission a sa propre tâche : plusieurs missions sont traitées en parallèle
+        self.taches.append(tache)
+        fin = lambda: self.taches.remove(tache) if tache in self.taches else None  # noqa: E731
+        tache.taskCompleted.connect(fin)
+        tache.taskTerminated.connect(fin)
+        afficher_progression(self.iface, tache)
+        QgsApplication.taskManager().addTask(tache)
+
+    def basculer_identification(self, actif):
+        if actif:
+            self.iface.mapCanvas().setMapTool(self.outil_identification)
+        else:
+            self.iface.mapCanvas().unsetMapTool(self.outil_identification)
+
+    def signaler_erreur(self, erreur):
+        self.iface.messageBar().pushMessage("Erreur", f"Erreur : {str(erreur)}", level=Qgis.Critical)
+
+    def signaler_validation(self, rapport):
+        # Rapport calculé dans la tâche : résumé dans le journal, alerte dans la barre de messages
+        if rapport is None or not rapport.problemes:
+            return
+        QgsMessageLog.logMessage(rapport.resume(), "NAIAD", Qgis.Warning)
+        self.iface.messageBar().pushMessage(
+            "Validation du fichier",
+            f"{len(rapport.problemes)} problème(s) dans {os.path.basename(rapport.path)} ; "
+            "les lignes en erreur sont ignorées (détail dans le journal NAIAD)", level=Qgis.Warning)
+
+    def demarrer_suivi(self):
+        # Couches mémoire alimentées par les seules lignes ajoutées au CSV
+        self.arreter_suivi()
+        if not self.csv_path:
+            raise ValueError("Aucun fichier sélectionné")
+        tail = CsvTail(self.csv_path)
+        couches = LiveLayers(os.path.basename(self.csv_path))
+        QgsProject.instance().addMapLayer(couches.points)
+        QgsProject.instance().addMapLayer(couches.lignes)
+        self.configurer_styles(couches.points, couches.lignes)
+
+        self.suivi = (tail, couches)
+        self.timer_suivi.start(self.dialog.intervalle_suivi.value() * 1000)
+        self.actualiser_suivi()
+
+    def actualiser_suivi(self):
+        if self.suivi is None:
+            return
+        tail, couches = self.suivi
+        try:
+            lot = tail.read_new(max_bytes=self.OCTETS_PAR_LECTURE)
+            if lot is not None:
+                couches.append(lot)
+        except Exception as e:
+            self.arreter_suivi()
+            self.iface.messageBar().pushMessage("Erreur", f"Suivi interrompu : {str(e)}", level=Qgis.Critical)
+            return
+        # Une seule lecture programmée à la fois : tranche suivante sans attendre
+        # l'intervalle, puis reprise du timer périodique une fois le retard rattrapé
+        if tail.pending:
+            self.timer_suivi.stop()
+            self.timer_rattrapage.start()
+        elif not self.timer_suivi.isActive():
+            self.timer_suivi.start()
+
+    def basculer_suivi(self, actif):
+        if not actif:
+            self.arreter_suivi()
+
+    def arreter_suivi(self):
+        self.timer_suivi.stop()
+        self.timer_rattrapage.stop()
+        self.suivi = None
+
+    def basculer_telemetrie(self, actif):
+        if not actif:
+            self.arreter_telemetrie()
+            return
+        try:
+            port = int(QSettings().value("NAIAD/port_telemetrie", self.PORT_TELEMETRIE))
+            self.recepteur = TelemetryReceiver(port=port)
+            self.recepteur.start()
+            self.couches_reseau = LiveLayers("réseau")
+            QgsProject.instance().addMapLayer(self.couches_reseau.points)
+            QgsProject.instance().addMapLayer(self.couches_reseau.lignes)
+            self.configurer_styles(self.couches_reseau.points, self.couches_reseau.lignes)
+            self.timer_telemetrie.start()
+            self.iface.messageBar().pushMessage(
+                "Succès", f"Réception télémétrie sur le port {port}", level=Qgis.Success)
+        except Exception as e:
+            self.arreter_telemetrie()
+            self.action_telemetrie.setChecked(False)
             self.iface.messageBar().pushMessage("Erreur", f"Erreur : {str(e)}", level=Qgis.Critical)
 
+    def vider_telemetrie(self):
+        # Toutes les positions reçues depuis le dernier passage, analysées en un lot
+        try:
+            lot = self.recepteur.drain()
+        except Exception as e:
+            QgsMessageLog.logMessage(f"Lot de télémétrie ignoré : {str(e)}", "NAIAD", Qgis.Warning)
+            return
+        if lot is not None:
+            self.couches_reseau.append(lot)
+            QgsMessageLog.logMessage(
+                f"{lot.n_points} positions ({self.recepteur.received} reçues, "
+                f"{self.recepteur.rejected} rejetées, {self.recepteur.dropped} perdues, "
+                f"{self.recepteur.rate:.0f} msg/s)", "NAIAD", Qgis.Info)
+
+    def arreter_telemetrie(self):
+        self.timer_telemetrie.stop()
+        if self.recepteur is not None:
+            self.recepteur.stop()
+        self.recepteur = None
+        self.couches_reseau = None
+
     def lancer_animation(self):
         try:
             if not self.csv_path:
                 raise ValueError("Aucun fichier CSV chargé")
 
-            df = pd.read_csv(self.csv_path)
-            df = df.dropna(subset=['longitude', 'latitude', 'timestamp'])
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            if 'drone_id' not in df.columns:
-                df['drone_id'] = 0
-
-            self.dialog_animation = CustomAnimationDialog(df, self.iface)
-            self.dialog_animation.show()
+            # Mission analysée une seule fois (cache disque) et interpolée en tâche de fond
+            self.lancer_tache(TacheMission(
+                self.csv_path, self.ouvrir_animation, self.signaler_erreur,
+                temporel=self.dialog.case_temporel.isChecked(), geopackage=self.chemin_geopackage(),
+                politique=self.politique_echantillonnage()))
 
         except Exception as e:
-            self.iface.messageBar().pushMessage("Erreur", f"Erreur : {str(e)}", level=Qgis.Critical)
-
-    def creer_lignes(self, couche_points):
-        couche = QgsVectorLayer("LineStringZ?crs=EPSG:4326", "Trajectoires", "memory")
+            self.signaler_erreur(e)
+
+    def ouvrir_animation(self, tache):
+        self.signaler_validation(tache.rapport)
+        self.outil_identification.index = tache.index
+        if tache.segments is not None:
+            # Couche statique filtrée par le contrôleur temporel du canevas
+            QgsProject.instance().addMapLayer(tache.segments)
+            debut, fin = tache.track_paths.time_range()
+            controleur = configurer_controleur(
+                self.iface.mapCanvas(), debut, fin, CustomAnimationDialog.DUREE_LECTURE)
+            controleur.playForward()
+            return
+        self.dialog_animation = CustomAnimationDialog(
+            tache.store, self.iface, track_paths=tache.track_paths)
+        self.dialog_animation.show()
+
+    def couche_lignes(self, store, nom="Trajectoires", sommets=None, resume=None):
+        # Une ligne par drone d'au moins deux positions, lue dans les tableaux du TrajectoryStore
+        # sommets : rang du drone -> indices des sommets retenus (niveau de détail)
+        # resume : drone_id (texte) -> (longueur m, vitesse moyenne, vitesse max m/s), voir resume_cinematique
+        couche = QgsVectorLayer("LineStringZ?crs=EPSG:4326", nom, "memory")
         provider = couche.dataProvider()
         provider.addAttributes([
             QgsField("drone_id", QVariant.String),
             QgsField("start", QVariant.DateTime),
-            QgsField("end", QVariant.DateTime)
+            QgsField("end", QVariant.DateTime),
+            QgsField("length_m", QVariant.Double),
+            QgsField("mean_speed", QVariant.Double),
+            QgsField("max_speed", QVariant.Double)
         ])
         couche.updateFields()
 
         features = []
-        drones = set(f['drone_id'] for f in couche_points.getFeatures())
-        for drone_id in drones:
-            points = sorted(
-                [f for f in couche_points.getFeatures() if f['drone_id'] == drone_id],
-                key=lambda x: x['timestamp']
-            )
-            if len(points) < 2:
+        for k, track_id in enumerate(store.ids):
+            xs, ys, zs, instants = store.track(k)
+            if len(instants) < 2:
                 continue
-
+            if sommets is not None:
+                garder = sommets[k]
+                xs, ys, zs = xs[garder], ys[garder], zs[garder]
             line = QgsFeature()
-            line.setGeometry(QgsGeometry.fromPolyline([
-                QgsPoint(
-                    p.geometry().asPoint().x(),
-                    p.geometry().asPoint().y(),
-                    p['depth']
-                ) for p in points
-            ]))
-            line.setAttributes([drone_id, points[0]['timestamp'], points[-1]['timestamp']])
+            line.setGeometry(QgsGeometry(QgsLineString(xs.tolist(), ys.tolist(), zs.tolist())))
+            cinematique = (resume or {}).get(str(track_id), (None, None, None))
+            line.setAttributes([str(track_id), to_qdatetime(instants[0]), to_qdatetime(instants[-1]), *cinematique])
             features.append(line)
 
         provider.addFeatures(features)
         couche.updateExtents()
         return couche
 
-    def configurer_styles(self, points, lines):
+    def resume_cinematique(self, store):
+        # Longueur géodésique et vitesses de chaque drone, NaN -> NULL
+        colonnes = [np.where(np.isnan(v), None, v).tolist() for v in store.summary()]
+        return {str(track_id): valeurs for track_id, *valeurs in zip(store.ids, *colonnes)}
+
+    def creer_niveaux(self, store, couche_detail, feedback=None, resume=None):
+        # Douglas–Peucker (SED, profondeur et temps compris) par drone, niveaux emboîtés
+        par_niveau = [{} for _ in ECHELLES_LOD]
+        for k in range(len(store)):
+            if feedback is not None:
+                if feedback.isCanceled():
+                    raise OperationAnnulee("Opération annulée")
+                feedback.setProgress(100 * k / max(len(store), 1))
+            xs, ys, zs, instants = store.track(k)
+            if len(instants) < 2:
+                continue
+            indices = simplification_lod(
+                np.asarray(xs), np.asarray(ys), np.asarray(zs, dtype=np.float64),
+                (instants // 1_000_000).astype(np.float64))
+            for sommets, garder in zip(par_niveau, indices):
+                sommets[k] = garder
+
+        niveaux = [self.couche_lignes(store, self.nom_niveau(echelle), sommets, resume)
+                   for echelle, sommets in zip(ECHELLES_LOD, par_niveau)]
+        self.regler_echelles(couche_detail, niveaux)
+        return niveaux
+
+    def nom_niveau(self, echelle):
+        return f"Trajectoires 1:{echelle:,}".replace(",", " ")
+
+    def regler_echelles(self, couche_detail, niveaux):
+        # Couches simplifiées visibles chacune sur sa plage d'échelles ; détail complet au plus près
+        couche_detail.setScaleBasedVisibility(True)
+        couche_detail.setMinimumScale(ECHELLES_LOD[0])
+        for k, (echelle, couche) in enumerate(zip(ECHELLES_LOD, niveaux)):
+            couche.setScaleBasedVisibility(True)
+            couche.setMaximumScale(echelle)
+            couche.setMinimumScale(ECHELLES_LOD[k + 1] if k + 1 < len(ECHELLES_LOD) else 0)
+
+    def configurer_styles(self, points, lines, niveaux=()):
         point_symbol = QgsMarkerSymbol.createSimple({
             'name': 'circle', 'color': '30,144,255', 'size': '3'
         })
@@ -281,6 +552,9 @@ class NAIAD:
             'color': '255,50,100', 'width': '0.8'
         })
         lines.renderer().setSymbol(line_symbol)
+        for niveau in niveaux:
+            niveau.renderer().setSymbol(line_symbol.clone())
+            niveau.triggerRepaint()
 
         points.triggerRepaint()
         lines.triggerRepaint()
@@ -6,9 +6,13 @@ Auteur : YIN Ruohan (2025)
 """
 
 import os
-import csv
+from qgis.core import QgsApplication
 from qgis.PyQt import uic, QtWidgets, QtCore
-from qgis.PyQt.QtWidgets import QFileDialog, QMessageBox, QTableWidgetItem
+from qgis.PyQt.QtWidgets import QFileDialog, QMessageBox
+
+from .row_index import RowIndex
+from .table_model import ModeleTableCsv
+from .tasks import TacheCalcul
 
 FORM_CLASS, _ = uic.loadUiType(os.path.join(
     os.path.dirname(__file__), 'NAIAD_dialog_base.ui'))
@@ -23,18 +27,22 @@ class NAIADDialog(QtWidgets.QDialog, FORM_CLASS):
         self.bouton_csv = self.findChild(QtWidgets.QPushButton, "bouton_csv")
         self.bouton_generer = self.findChild(QtWidgets.QPushButton, "bouton_generer")
         self.bouton_tableau = self.findChild(QtWidgets.QPushButton, "bouton_tableau")
-        self.tableau_donnees = self.findChild(QtWidgets.QTableWidget, "tableau_donnees")
+        self.tableau_donnees = self.findChild(QtWidgets.QTableView, "tableau_donnees")
+        self.filtre_tableau = self.findChild(QtWidgets.QLineEdit, "filtre_tableau")
 
         self._verifier_widgets()
         self._initialiser_interface()
 
         self.chemin_fichier = ""
+        self.modele = None
+        self.tache_index = None
+        self._generation_index = 0
 
     def _verifier_widgets(self):
         required = {
             self.label_chemin, self.bouton_csv,
             self.bouton_generer, self.bouton_tableau,
-            self.tableau_donnees
+            self.tableau_donnees, self.filtre_tableau
         }
         if None in required:
             missing = [w.objectName() for w in required if w is None]
@@ -45,6 +53,10 @@ class NAIADDialog(QtWidgets.QDialog, FORM_CLASS):
         self.bouton_csv.clicked.connect(self.importer_csv)
         self.bouton_generer.clicked.connect(self.accept)
         self.bouton_tableau.clicked.connect(self.afficher_tableau)
+        self.filtre_tableau.returnPressed.connect(self.filtrer_tableau)
+        # Tri au clic sur l'en-tête, aucun tri initial
+        self.tableau_donnees.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.tableau_donnees.setSortingEnabled(True)
 
     def importer_csv(self):
         try:
@@ -53,40 +65,47 @@ class NAIADDialog(QtWidgets.QDialog, FORM_CLASS):
                 QtCore.QDir.homePath(), "CSV (*.csv);;All Files (*)"
             )
             if fichier:
-                self._valider_fichier(fichier)
                 self.chemin_fichier = fichier
                 self.label_chemin.setText(os.path.basename(fichier))
                 self.label_chemin.setToolTip(fichier)
         except Exception as e:
             self._gerer_erreur(e)
 
-    def _valider_fichier(self, chemin):
-        with open(chemin, 'r', encoding='utf-8') as f:
-            lecteur = csv.DictReader(f)
-            required = {'drone_id', 'longitude', 'latitude', 'depth', 'timestamp'}
-            if not required.issubset(lecteur.fieldnames):
-                manquants = required - set(lecteur.fieldnames)
-                raise ValueError(f"Champs manquants: {', '.join(manquants)}")
-
     def afficher_tableau(self):
         try:
             if not self.chemin_fichier:
                 raise ValueError("Aucun fichier sélectionné")
 
-            self.tableau_donnees.clear()
-            with open(self.chemin_fichier, 'r', encoding='utf-8') as f:
-                lecteur = csv.reader(f)
-                headers = next(lecteur)
-                data = list(lecteur)
-                self.tableau_donnees.setRowCount(len(data))
-                self.tableau_donnees.setColumnCount(len(headers))
-                self.tableau_donnees.setHorizontalHeaderLabels(headers)
-                for row_idx, row in enumerate(data):
-                    for col_idx, value in enumerate(row):
-                        self.tableau_donnees.setItem(row_idx, col_idx, QTableWidgetItem(value))
+            # Index des lignes construit hors du thread de l'interface ; la vue ne lit
+            # ensuite que les lignes affichées
+            chemin = self.chemin_fichier
+            self._generation_index += 1
+            generation = self._generation_index
+
+            def termine(tache):
+                # Seul l'index de la demande la plus récente est affiché
+                if generation == self._generation_index:
+                    self._installer_modele(tache.resultat)
+
+            self.tache_index = TacheCalcul(f"NAIAD - index de {os.path.basename(chemin)}",
+                                           lambda: RowIndex(chemin), termine, self._gerer_erreur)
+            QgsApplication.taskManager().addTask(self.tache_index)
         except Exception as e:
             self._gerer_erreur(e)
 
+    def _installer_modele(self, index):
+        if self.modele is not None:
+            self.modele.index.close()
+        self.modele = ModeleTableCsv(index, self, on_error=self._gerer_erreur)
+        self.tableau_donnees.horizontalHeader().setSortIndicator(-1, QtCore.Qt.AscendingOrder)
+        self.tableau_donnees.setModel(self.modele)
+        if self.filtre_tableau.text():
+            self.filtrer_tableau()
+
+    def filtrer_tableau(self):
+        if self.modele is not None:
+            self.modele.filtrer(self.filtre_tableau.text())
+
     def get_chemin_csv(self):
         return self.chemin_fichier
 
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+Cache disque des missions NAIAD déjà analysées
+
+Chaque entrée est un répertoire de tableaux ``.npy`` (un par colonne du
+TrajectoryStore) accompagné d'un ``meta.json`` ; le chargement se fait par
+projection mémoire (``mmap_mode='r'``) et ne coûte donc que quelques
+millisecondes quelle que soit la taille de la mission. La clé combine le
+chemin du fichier, sa date de modification et sa taille (ou un hachage de son
+contenu), la correspondance des colonnes et le SCR source. Le cache est
+borné en taille : les entrées les moins récemment utilisées sont évincées.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .trajectory_store import TrajectoryStore
+
+# Répertoire par défaut, surchargeable par la variable d'environnement NAIAD_CACHE_DIR
+REPERTOIRE_DEFAUT = os.environ.get(
+    "NAIAD_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "naiad"))
+# Taille maximale par défaut du cache (octets)
+TAILLE_MAX_DEFAUT = 2 * 1024 ** 3
+
+_TABLEAUX = ("lon", "lat", "depth", "times", "offsets")
+
+
+def file_digest(path, bloc=1 << 20):
+    """Hachage SHA-1 du contenu d'un fichier, lu par blocs."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for morceau in iter(lambda: f.read(bloc), b""):
+            h.update(morceau)
+    return h.hexdigest()
+
+
+def write_meta(directory, ids, tz):
+    """Écrit les métadonnées (identifiants des drones, fuseau) d'une entrée."""
+    meta = {"ids": list(ids), "tz": None if tz is None else str(tz)}
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def write_store(directory, store):
+    """Écrit les tableaux et métadonnées de ``store`` dans ``directory``."""
+    for nom in _TABLEAUX:
+        np.save(os.path.join(directory, nom + ".npy"), getattr(store, nom))
+    write_meta(directory, store.ids, store.tz)
+
+
+def read_store(directory):
+    """TrajectoryStore projeté en mémoire depuis ``directory``."""
+    with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    tableaux = [np.load(os.path.join(directory, nom + ".npy"), mmap_mode="r") for nom in _TABLEAUX]
+    return TrajectoryStore(meta["ids"], *tableaux, tz=meta["tz"])
+
+
+class MissionCache:
+    """Cache LRU borné en taille des trajectoires analysées."""
+
+    def __init__(self, directory=None, max_bytes=TAILLE_MAX_DEFAUT):
+        self.directory = directory or REPERTOIRE_DEFAUT
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, path, columns=None, crs=None, content_hash=False):
+        """
+        Clé d'une mission.
+
+        Par défaut le fichier est identifié par (chemin, mtime, taille) ; avec
+        ``content_hash=True`` par le hachage de son contenu, ce qui survit à
+        une copie ou un renommage.
+        """
+        if content_hash:
+            source = {"sha1": file_digest(path)}
+        else:
+            st = os.stat(path)
+            source = {"path": os.path.abspath(path), "mtime": st.st_mtime_ns, "size": st.st_size}
+        description = {
+            "source": source,
+            "columns": sorted((columns or {}).items()),
+            "crs": crs,
+        }
+        return hashlib.sha1(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key)
+
+    def load(self, key):
+        """TrajectoryStore projeté en mémoire depuis le cache, ou None."""
+        entree = self._entry(key)
+        try:
+            store = read_store(entree)
+        except (OSError, ValueError):
+            return None
+        os.utime(entree)  # Marque l'entrée comme récemment utilisée
+        return store
+
+    def save(self, key, store):
+        """Écrit ``store`` dans le cache puis applique la borne de taille."""
+        return self.build(key, lambda directory: write_store(directory, store))
+
+    def build(self, key, writer):
+        """
+        Crée l'entrée ``key`` de façon atomique.
+
+        ``writer(directory)`` écrit l'entrée dans un répertoire temporaire du
+        cache, renommé ensuite en entrée définitive. Retourne le store projeté
+        en mémoire depuis cette entrée.
+        """
+        temporaire = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            writer(temporaire)
+            entree = self._entry(key)
+            shutil.rmtree(entree, ignore_errors=True)
+            os.replace(temporaire, entree)
+        except BaseException:
+            shutil.rmtree(temporaire, ignore_errors=True)
+            raise
+        store = read_store(entree)
+        self.evict(keep=key)
+        return store
+
+    def evict(self, keep=None):
+        """
+        Supprime les entrées les moins récemment utilisées au-delà de ``max_bytes``.
+
+        L'entrée ``keep`` n'est jamais supprimée, même si elle dépasse seule la borne.
+        """
+        entrees = []
+        for nom in os.listdir(self.directory):
+            chemin = os.path.join(self.directory, nom)
+            if nom.startswith(".") or nom == keep or not os.path.isdir(chemin):
+                continue
+            taille = sum(e.stat().st_size for e in os.scandir(chemin) if e.is_file())
+            entrees.append((os.stat(chemin).st_mtime_ns, taille, chemin))
+
+        total = sum(e[1] for e in entrees)
+        for _, taille, chemin in sorted(entrees):
+            if total <= self.max_bytes:
+                break
+            try:
+                shutil.rmtree(chemin)
+            except OSError:
+                continue  # Entrée encore projetée en mémoire (Windows)
+            total -= taille
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Traitement par lots des missions NAIAD, sans QGIS
+
+    python -m naiad.cli missions/*.csv -o sorties -f gpkg geojson parquet
+
+Chaque mission est lue par le même code que le plugin (``load_mission`` :
+validation, typage, tri, cache disque), puis convertie dans un processus du
+pool en trois tables : trajectoires (une ligne 3D par drone), segments
+(paire d'échantillons consécutifs, avec leur cinématique) et résumé par
+drone. Les tables sont écrites dans les formats demandés sous
+``<sortie>/<mission>`` (nom du fichier, précédé de ses dossiers parents si
+plusieurs missions portent le même nom, voir mission_names) ; le résumé de toutes les missions est rassemblé dans
+``<sortie>/summary.csv``. Le code de sortie est non nul si une mission a
+échoué.
+
+Le format Parquet (GeoParquet, géométries WKB) nécessite pyarrow.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .geopackage import (
+    GeoPackageWriter, geometry_blob, iso_datetimes, linestring_wkb, segment_blobs, segment_envelopes
+)
+from .ingest import load_mission
+
+FORMATS = ("gpkg", "geojson", "parquet")
+# Colonnes d'instants (int64 ns) des tables, converties selon le format
+COLONNES_TEMPS = ("start", "end")
+# Index attributaires des tables GeoPackage
+INDEX_LIGNES = ("drone_id", "start", "end")
+
+# Tables d'une mission : store d'origine, résumé par drone (index = rang du
+# drone dans le store) et segments (index = échantillon de départ)
+MissionTables = namedtuple("MissionTables", ["store", "summary", "segments"])
+
+
+def mission_tables(store):
+    """Résumé par drone et table des segments d'un TrajectoryStore, en une passe vectorisée."""
+    cinematique = store.kinematics()
+    total, moyenne, maximum = store.summary(cinematique)
+    offsets = store.offsets
+    premiers, derniers = offsets[:-1], offsets[1:] - 1
+    summary = pd.DataFrame({
+        "drone_id": [str(i) for i in store.ids],
+        "n_points": np.diff(offsets),
+        "start": store.times[premiers],
+        "end": store.times[derniers],
+        "duration_s": (store.times[derniers] - store.times[premiers]) / 1e9,
+        "length_m": total,
+        "mean_speed": moyenne,
+        "max_speed": maximum,
+        "min_depth": np.minimum.reduceat(store.depth, premiers),
+        "max_depth": np.maximum.reduceat(store.depth, premiers),
+    })
+
+    dernier = np.zeros(store.n_points, dtype=bool)
+    dernier[derniers] = True
+    a = np.flatnonzero(~dernier)
+    drone = np.repeat(np.arange(len(store)), np.diff(offsets))
+    segments = pd.DataFrame({
+        "drone_id": summary["drone_id"].to_numpy()[drone[a]],
+        "start": store.times[a],
+        "end": store.times[a + 1],
+        "length_m": cinematique.length[a],
+        "speed": cinematique.speed[a],
+        "heading": cinematique.heading[a],
+        "vertical_rate": cinematique.vertical_rate[a],
+        "cumul_m": cinematique.cumulative[a],
+    }, index=a)
+    return MissionTables(store, summary, segments)
+
+
+def _lignes(tables):
+    # Drones à au moins deux positions et leurs sommets (lon, lat, profondeur)
+    lignes = tables.summary[tables.summary["n_points"] >= 2]
+    s = tables.store
+    sommets = [(s.lon[a:b], s.lat[a:b], s.depth[a:b]) for a, b in zip(
+        s.offsets[:-1][lignes.index], s.offsets[1:][lignes.index])]
+    return lignes, sommets
+
+
+def _segments_geometrie(tables, header):
+    s, a = tables.store, tables.segments.index.to_numpy()
+    return segment_blobs(s.lon[a], s.lat[a], s.lon[a + 1], s.lat[a + 1],
+                         s.depth[a], s.depth[a + 1], header=header)
+
+
+def _colonnes(df, temps):
+    """Champs (nom, type SQL) et valeurs par colonne ; ``temps`` convertit les instants ns."""
+    champs, valeurs = [], []
+    for nom in df.columns:
+        colonne = df[nom].to_numpy()
+        if nom in COLONNES_TEMPS:
+            champs.append((nom, "DATETIME"))
+            valeurs.append(temps(colonne))
+        elif colonne.dtype.kind == "f":
+            champs.append((nom, "DOUBLE"))
+            valeurs.append(np.where(np.isnan(colonne), None, colonne).tolist())
+        elif colonne.dtype.kind in "iu":
+            champs.append((nom, "INTEGER"))
+            valeurs.append(colonne.tolist())
+        else:
+            champs.append((nom, "TEXT"))
+            valeurs.append(colonne.tolist())
+    return champs, valeurs
+
+
+def write_gpkg(prefix, tables):
+    """Tables ``trajectoires``, ``segments`` (index R-tree et attributaires) et ``resume``."""
+    lignes, sommets = _lignes(tables)
+    segments = tables.segments
+    s, a = tables.store, segments.index.to_numpy()
+    with GeoPackageWriter(prefix + ".gpkg") as ecrivain:
+        emprises = [(x.min(), x.max(), y.min(), y.max()) for x, y, _ in sommets]
+        champs, valeurs = _colonnes(lignes, iso_datetimes)
+        ecrivain.write_table(
+            "trajectoires", "LINESTRING", champs,
+            [geometry_blob(linestring_wkb(x, y, z), e) for (x, y, z), e in zip(sommets, emprises)],
+            emprises, valeurs, z=True, indexes=INDEX_LIGNES)
+        champs, valeurs = _colonnes(segments, iso_datetimes)
+        ecrivain.write_table(
+            "segments", "LINESTRING", champs, _segments_geometrie(tables, True),
+            segment_envelopes(s.lon[a], s.lat[a], s.lon[a + 1], s.lat[a + 1]),
+            valeurs, z=True, indexes=INDEX_LIGNES)
+        ecrivain.write_attributes("resume", *_colonnes(tables.summary, iso_datetimes))
+
+
+def _ecrire_geojson(chemin, df, coordonnees):
+    champs, valeurs = _colonnes(df, iso_datetimes)
+    noms = [nom for nom, _ in champs]
+    # Écriture entité par entité : la collection n'est jamais construite en mémoire
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write('{"type": "FeatureCollection", "features": [\n')
+        for k, (proprietes, points) in enumerate(zip(zip(*valeurs), coordonnees)):
+            entite = {"type": "Feature", "geometry": {"type": "LineString", "coordinates": points},
+                      "properties": dict(zip(noms, proprietes))}
+            f.write((",\n" if k else "") + json.dumps(entite))
+        f.write("\n]}\n")
+
+
+def write_geojson(prefix, tables):
+    """Fichiers ``<mission>_trajectoires.geojson`` et ``<mission>_segments.geojson``."""
+    lignes, sommets = _lignes(tables)
+    _ecrire_geojson(prefix + "_trajectoires.geojson", lignes,
+                    (np.column_stack(xyz).tolist() for xyz in sommets))
+    s, a = tables.store, tables.segments.index.to_numpy()
+    extremites = np.stack([np.column_stack([s.lon[a], s.lat[a], s.depth[a]]),
+                           np.column_stack([s.lon[a + 1], s.lat[a + 1], s.depth[a + 1]])], axis=1)
+    _ecrire_geojson(prefix + "_segments.geojson", tables.segments, extremites.tolist())
+
+
+def _ecrire_parquet(chemin, df, wkb=None):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    df = df.reset_index(drop=True)
+    for nom in COLONNES_TEMPS:
+        if nom in df.columns:
+            df[nom] = pd.to_datetime(df[nom], unit="ns", utc=True)
+    if wkb is not None:
+        df["geometry"] = wkb
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if wkb is not None:
+        # Métadonnées GeoParquet ; sans « crs », les coordonnées sont en OGC:CRS84 (lon/lat)
+        geo = {"version": "1.0.0", "primary_column": "geometry",
+               "columns": {"geometry": {"encoding": "WKB", "geometry_types": ["LineString Z"]}}}
+        table = table.replace_schema_metadata(dict(table.schema.metadata or {}, geo=json.dumps(geo)))
+    pq.write_table(table, chemin)
+
+
+def write_parquet(prefix, tables):
+    """Fichiers ``<mission>_trajectoires``, ``_segments`` et ``_resume.parquet``."""
+    lignes, sommets = _lignes(tables)
+    _ecrire_parquet(prefix + "_trajectoires.parquet", lignes,
+                    [linestring_wkb(x, y, z) for x, y, z in sommets])
+    _ecrire_parquet(prefix + "_segments.parquet", tables.segments, _segments_geometrie(tables, False))
+    _ecrire_parquet(prefix + "_resume.parquet", tables.summary)
+
+
+ECRITURES = {"gpkg": write_gpkg, "geojson": write_geojson, "parquet": write_parquet}
+
+
+def mission_names(paths):
+    """
+    Nom de sortie de chaque mission : nom du fichier sans extension, précédé
+    des dossiers parents nécessaires pour distinguer les fichiers homonymes
+    (``a/run.csv``, ``b/run.csv`` -> ``a_run``, ``b_run``). Un même fichier
+    donné plusieurs fois reçoit un suffixe numérique.
+    """
+    composants = []
+    for path in paths:
+        parties = os.path.normpath(os.path.abspath(path)).split(os.sep)
+        composants.append([p for p in parties[:-1] if p] + [os.path.splitext(parties[-1])[0]])
+    profondeurs = [1] * len(paths)
+    while True:
+        noms = ["_".join(c[-k:]) for c, k in zip(composants, profondeurs)]
+        # Fichiers distincts partageant chaque nom
+        fichiers = {}
+        for nom, c in zip(noms, composants):
+            fichiers.setdefault(nom, set()).add(tuple(c))
+        allonger = [i for i, nom in enumerate(noms)
+                    if len(fichiers[nom]) > 1 and profondeurs[i] < len(composants[i])]
+        if not allonger:
+            break
+        for i in allonger:
+            profondeurs[i] += 1
+    comptes = Counter(noms)
+    vus = Counter()
+    for i, nom in enumerate(noms):
+        if comptes[nom] > 1:
+            vus[nom] += 1
+            noms[i] = f"{nom}_{vus[nom]}"
+    return noms
+
+
+def process_mission(path, output, formats, cache=True, name=None):
+    """
+    Convertit une mission (exécuté dans un processus du pool) ; retourne son résumé par drone.
+
+    ``name`` : nom des fichiers de sortie et de la mission dans le résumé
+    (défaut : nom du fichier sans extension).
+    """
+    store = load_mission(path, cache=None if cache else False)
+    nom = name or os.path.splitext(os.path.basename(path))[0]
+    tables = mission_tables(store)
+    for format_sortie in formats:
+        ECRITURES[format_sortie](os.path.join(output, nom), tables)
+    resume = tables.summary.copy()
+    resume.insert(0, "mission", nom)
+    return resume
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m naiad.cli",
+        description="Convertit des missions CSV NAIAD en trajectoires, segments et statistiques.")
+    parser.add_argument("missions", nargs="+", help="fichiers CSV de mission")
+    parser.add_argument("-o", "--output", default=".", help="dossier de sortie (défaut : dossier courant)")
+    parser.add_argument("-f", "--formats", nargs="+", choices=FORMATS, default=["gpkg"],
+                        help="formats écrits (défaut : gpkg)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="nombre de processus (défaut : nombre de cœurs)")
+    parser.add_argument("--no-cache", action="store_true", help="ne pas utiliser le cache disque des missions")
+    args = parser.parse_args(argv)
+
+    if "parquet" in args.formats:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            parser.error("le format parquet nécessite pyarrow (pip install pyarrow)")
+    os.makedirs(args.output, exist_ok=True)
+
+    resumes, echecs = [], 0
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        taches = {pool.submit(process_mission, path, args.output, args.formats, not args.no_cache, nom): path
+                  for path, nom in zip(args.missions, mission_names(args.missions))}
+        for tache in as_completed(taches):
+            path = taches[tache]
+            try:
+                resume = tache.result()
+            except Exception as e:
+                echecs += 1
+                print(f"{path} : échec ({e})", file=sys.stderr)
+                continue
+            resumes.append(resume)
+            print(f"{path} : {len(resume)} drone(s), {int(resume['n_points'].sum())} positions")
+
+    if resumes:
+        resume = pd.concat(resumes, ignore_index=True).sort_values(["mission", "drone_id"], kind="stable")
+        for nom in COLONNES_TEMPS:
+            resume[nom] = iso_datetimes(resume[nom].to_numpy())
+        resume.to_csv(os.path.join(args.output, "summary.csv"), index=False)
+    print(f"{len(resumes)} mission(s) convertie(s), {echecs} échec(s)")
+    return 1 if echecs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
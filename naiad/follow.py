@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Suivi d'un fichier CSV de télémétrie en cours d'écriture
+
+CsvTail mémorise la position (en octets) déjà lue et, à chaque appel, n'analyse
+que les lignes complètes ajoutées depuis ; une ligne en cours d'écriture est
+conservée jusqu'à l'appel suivant. Le coût d'une lecture est donc
+proportionnel aux nouvelles données et non à la taille du fichier.
+"""
+
+import csv
+import io
+import os
+
+import pandas as pd
+
+from .ingest import parse_chunk, read_dtypes
+
+
+class CsvTail:
+    """Lecteur incrémental des lignes ajoutées à la fin d'un fichier CSV."""
+
+    def __init__(self, path, columns=None, transform=None):
+        self.path = path
+        self.columns = columns
+        self.transform = transform
+        with open(path, "rb") as f:
+            entete = f.readline()
+        self.header = next(csv.reader([entete.decode("utf-8")]))
+        self.debut = len(entete)
+        self.offset = self.debut
+        self._reste = b""
+
+    def skip_existing(self):
+        """Place la lecture à la fin actuelle du fichier (seules les lignes futures seront lues)."""
+        self.offset = os.path.getsize(self.path)
+        self._reste = b""
+
+    def read_new(self, max_bytes=None):
+        """
+        TrajectoryStore des lignes complètes ajoutées depuis l'appel précédent,
+        ou None s'il n'y en a aucune.
+
+        ``max_bytes`` borne la quantité lue par appel (le reste sera lu aux
+        appels suivants). Un fichier tronqué ou remplacé est relu depuis le début.
+        """
+        taille = os.path.getsize(self.path)
+        if taille < self.offset:
+            self.offset, self._reste = self.debut, b""
+        a_lire = taille - self.offset
+        if max_bytes is not None:
+            a_lire = min(a_lire, max_bytes)
+        if a_lire <= 0:
+            return None
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            donnees = self._reste + f.read(a_lire)
+        self.offset += a_lire
+
+        fin = donnees.rfind(b"\n") + 1
+        donnees, self._reste = donnees[:fin], donnees[fin:]
+        if not donnees.strip():
+            return None
+
+        bloc = pd.read_csv(io.BytesIO(donnees), header=None, names=self.header,
+                           dtype=read_dtypes(self.columns))
+        store = parse_chunk(bloc, self.columns, self.transform)
+        return store if store.n_points else None
+
+    @property
+    def pending(self):
+        """Vrai s'il reste des octets déjà écrits mais pas encore lus."""
+        return os.path.getsize(self.path) > self.offset
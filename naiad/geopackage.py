@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Écriture des couches NAIAD dans un GeoPackage
+
+GeoPackageWriter écrit directement le fichier SQLite (format OGC GeoPackage
+1.2) : chaque table est remplacée en une seule transaction, les entités sont
+insérées par lots, puis l'index spatial R-tree et les index attributaires
+(``drone_id``, instants) sont construits en bloc, une fois les données en
+place. Les triggers R-tree de la norme sont créés ensuite, pour que les
+éditions ultérieures (QGIS, GDAL) maintiennent l'index.
+
+Le fichier est placé à côté du CSV (``geopackage_path``) ; ``is_current``
+indique s'il peut être rouvert tel quel lors d'une session ultérieure. Les
+paramètres de calcul d'une table (colonnes lues, échantillonnage…) sont
+enregistrés avec elle dans ``naiad_parametres``, si bien qu'une table
+calculée avec d'autres réglages n'est pas réutilisée.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+from .ingest import OperationAnnulee
+
+# Nombre d'entités insérées par appel à executemany
+TAILLE_LOT = 50_000
+# Cache de pages SQLite pendant l'écriture (octets)
+TAILLE_CACHE = 256 * 1024 ** 2
+
+# Identifiant d'application « GPKG » et version 1.2.0 de la norme
+APPLICATION_ID = 0x47504B47
+USER_VERSION = 10200
+
+WGS84 = (
+    'GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,298.257223563,'
+    'AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,'
+    'AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,'
+    'AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]]'
+)
+
+# Table des paramètres de calcul de chaque table d'entités (hors norme GeoPackage)
+TABLE_PARAMETRES = "naiad_parametres"
+
+# Codes WKB ISO des géométries écrites (la variante Z ajoute 1000)
+TYPES_WKB = {"POINT": 1, "LINESTRING": 2}
+
+_TABLES_NORME = """
+CREATE TABLE IF NOT EXISTS gpkg_spatial_ref_sys (
+    srs_name TEXT NOT NULL, srs_id INTEGER PRIMARY KEY, organization TEXT NOT NULL,
+    organization_coordsys_id INTEGER NOT NULL, definition TEXT NOT NULL, description TEXT);
+CREATE TABLE IF NOT EXISTS gpkg_contents (
+    table_name TEXT NOT NULL PRIMARY KEY, data_type TEXT NOT NULL, identifier TEXT UNIQUE,
+    description TEXT DEFAULT '',
+    last_change DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    min_x DOUBLE, min_y DOUBLE, max_x DOUBLE, max_y DOUBLE, srs_id INTEGER,
+    CONSTRAINT fk_gc_r_srs_id FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id));
+CREATE TABLE IF NOT EXISTS gpkg_geometry_columns (
+    table_name TEXT NOT NULL, column_name TEXT NOT NULL, geometry_type_name TEXT NOT NULL,
+    srs_id INTEGER NOT NULL, z TINYINT NOT NULL, m TINYINT NOT NULL,
+    CONSTRAINT pk_geom_cols PRIMARY KEY (table_name, column_name),
+    CONSTRAINT fk_gc_tn FOREIGN KEY (table_name) REFERENCES gpkg_contents(table_name),
+    CONSTRAINT fk_gc_srs FOREIGN KEY (srs_id) REFERENCES gpkg_spatial_ref_sys(srs_id));
+CREATE TABLE IF NOT EXISTS gpkg_extensions (
+    table_name TEXT, column_name TEXT, extension_name TEXT NOT NULL,
+    definition TEXT NOT NULL, scope TEXT NOT NULL,
+    CONSTRAINT ge_tce UNIQUE (table_name, column_name, extension_name));
+"""
+
+# Triggers de maintenance de l'index R-tree (GeoPackage 1.2, annexe F.3)
+_TRIGGERS_RTREE = """
+CREATE TRIGGER "rtree_{t}_geom_insert" AFTER INSERT ON "{t}"
+WHEN (new.geom NOT NULL AND NOT ST_IsEmpty(NEW.geom))
+BEGIN
+  INSERT OR REPLACE INTO "rtree_{t}_geom" VALUES (NEW.fid,
+    ST_MinX(NEW.geom), ST_MaxX(NEW.geom), ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+END;
+CREATE TRIGGER "rtree_{t}_geom_update1" AFTER UPDATE OF geom ON "{t}"
+WHEN OLD.fid = NEW.fid AND (NEW.geom NOTNULL AND NOT ST_IsEmpty(NEW.geom))
+BEGIN
+  INSERT OR REPLACE INTO "rtree_{t}_geom" VALUES (NEW.fid,
+    ST_MinX(NEW.geom), ST_MaxX(NEW.geom), ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+END;
+CREATE TRIGGER "rtree_{t}_geom_update2" AFTER UPDATE OF geom ON "{t}"
+WHEN OLD.fid = NEW.fid AND (NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id = OLD.fid;
+END;
+CREATE TRIGGER "rtree_{t}_geom_update3" AFTER UPDATE ON "{t}"
+WHEN OLD.fid != NEW.fid AND (NEW.geom NOTNULL AND NOT ST_IsEmpty(NEW.geom))
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id = OLD.fid;
+  INSERT OR REPLACE INTO "rtree_{t}_geom" VALUES (NEW.fid,
+    ST_MinX(NEW.geom), ST_MaxX(NEW.geom), ST_MinY(NEW.geom), ST_MaxY(NEW.geom));
+END;
+CREATE TRIGGER "rtree_{t}_geom_update4" AFTER UPDATE ON "{t}"
+WHEN OLD.fid != NEW.fid AND (NEW.geom ISNULL OR ST_IsEmpty(NEW.geom))
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id IN (OLD.fid, NEW.fid);
+END;
+CREATE TRIGGER "rtree_{t}_geom_delete" AFTER DELETE ON "{t}"
+WHEN old.geom NOT NULL
+BEGIN
+  DELETE FROM "rtree_{t}_geom" WHERE id = OLD.fid;
+END;
+"""
+
+
+def geopackage_path(source):
+    """GeoPackage associé à un fichier de mission (même nom, extension .gpkg)."""
+    return os.path.splitext(source)[0] + ".gpkg"
+
+
+def _requete(path, sql):
+    # Lignes d'une requête en lecture seule (aucune si le fichier ou la table est absent ou illisible)
+    if not os.path.exists(path):
+        return []
+    try:
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return con.execute(sql).fetchall()
+        finally:
+            con.close()
+    except sqlite3.Error:
+        return []
+
+
+def _dernieres_ecritures(path):
+    # Table d'entités -> instant de sa dernière écriture (s depuis l'époque)
+    lignes = _requete(path, "SELECT table_name, last_change FROM gpkg_contents WHERE data_type = 'features'")
+    return {table: datetime.fromisoformat(instant.replace("Z", "+00:00")).timestamp()
+            for table, instant in lignes}
+
+
+def _texte_parametres(parameters):
+    # Forme canonique des paramètres, comparée telle quelle par is_current
+    return json.dumps(parameters, sort_keys=True)
+
+
+def list_tables(path):
+    """Tables d'entités déclarées dans le GeoPackage (liste vide si le fichier est absent ou illisible)."""
+    return list(_dernieres_ecritures(path))
+
+
+def is_current(path, source, tables, parameters=None):
+    """
+    Vrai si chacune des ``tables`` existe et a été écrite après la dernière
+    modification de ``source`` et, si ``parameters`` est donné, avec ces
+    mêmes paramètres de calcul (voir GeoPackageWriter.write_table).
+    """
+    ecritures = _dernieres_ecritures(path)
+    modification = os.path.getmtime(source)
+    if not all(table in ecritures and ecritures[table] >= modification for table in tables):
+        return False
+    if parameters is None:
+        return True
+    enregistres = dict(_requete(path, f"SELECT table_name, parametres FROM {TABLE_PARAMETRES}"))
+    attendus = _texte_parametres(parameters)
+    return all(enregistres.get(table) == attendus for table in tables)
+
+
+def geometry_blob(wkb, envelope, srs_id=4326):
+    """Géométrie GeoPackage : en-tête (emprise xy [minx, maxx, miny, maxy]) suivi du WKB."""
+    entete = np.zeros(1, dtype=[("magic", "S2"), ("version", "u1"), ("flags", "u1"),
+                                ("srs_id", "<i4"), ("envelope", "<f8", 4)])
+    entete["magic"] = b"GP"
+    entete["flags"] = 0b011  # petit-boutiste, emprise xy
+    entete["srs_id"] = srs_id
+    entete["envelope"] = envelope
+    return entete.tobytes() + bytes(wkb)
+
+
+def point_blobs(x, y, z=None, srs_id=4326):
+    """Géométries GeoPackage (Point ou PointZ, sans emprise) de tableaux de coordonnées."""
+    x = np.asarray(x, dtype=np.float64)
+    champs = [("magic", "S2"), ("version", "u1"), ("flags", "u1"), ("srs_id", "<i4"),
+              ("order", "u1"), ("type", "<u4"), ("x", "<f8"), ("y", "<f8")]
+    if z is not None:
+        champs.append(("z", "<f8"))
+    blobs = np.zeros(len(x), dtype=champs)
+    blobs["magic"] = b"GP"
+    blobs["flags"] = 0b001
+    blobs["srs_id"] = srs_id
+    blobs["order"] = 1
+    blobs["type"] = TYPES_WKB["POINT"] + (1000 if z is not None else 0)
+    blobs["x"] = x
+    blobs["y"] = y
+    if z is not None:
+        blobs["z"] = z
+    return blobs.view(np.dtype((np.void, blobs.dtype.itemsize))).tolist()
+
+
+def linestring_wkb(x, y, z=None):
+    """WKB ISO d'une LineString (LineStringZ si ``z`` est fourni)."""
+    colonnes = [x, y] if z is None else [x, y, z]
+    entete = np.array([(1, TYPES_WKB["LINESTRING"] + (0 if z is None else 1000), len(x))],
+                      dtype=[("order", "u1"), ("type", "<u4"), ("count", "<u4")])
+    return entete.tobytes() + np.column_stack(colonnes).astype("<f8").tobytes()
+
+
+def segment_envelopes(x0, y0, x1, y1):
+    """Emprises [minx, maxx, miny, maxy] de segments (x0, y0) -> (x1, y1)."""
+    return np.column_stack([np.minimum(x0, x1), np.maximum(x0, x1), np.minimum(y0, y1), np.maximum(y0, y1)])
+
+
+def segment_blobs(x0, y0, x1, y1, z0=None, z1=None, srs_id=4326, header=True):
+    """
+    Segments à deux sommets (LineString, ou LineStringZ avec ``z0``/``z1``) en
+    géométries GeoPackage avec emprise, ou en WKB seul si ``header`` est faux.
+    """
+    x0 = np.asarray(x0, dtype=np.float64)
+    dimension = 2 if z0 is None else 3
+    champs = []
+    if header:
+        champs += [("magic", "S2"), ("version", "u1"), ("flags", "u1"), ("srs_id", "<i4"),
+                   ("envelope", "<f8", 4)]
+    champs += [("order", "u1"), ("type", "<u4"), ("count", "<u4"),
+               ("p0", "<f8", dimension), ("p1", "<f8", dimension)]
+    blobs = np.zeros(len(x0), dtype=champs)
+    if header:
+        blobs["magic"] = b"GP"
+        blobs["flags"] = 0b011
+        blobs["srs_id"] = srs_id
+        blobs["envelope"] = segment_envelopes(x0, y0, x1, y1)
+    blobs["order"] = 1
+    blobs["type"] = TYPES_WKB["LINESTRING"] + (0 if z0 is None else 1000)
+    blobs["count"] = 2
+    blobs["p0"] = np.column_stack([x0, y0] if z0 is None else [x0, y0, z0])
+    blobs["p1"] = np.column_stack([x1, y1] if z0 is None else [x1, y1, z1])
+    return blobs.view(np.dtype((np.void, blobs.dtype.itemsize))).tolist()
+
+
+def iso_datetimes(times):
+    """Instants (ns depuis l'époque, UTC) au format DATETIME du GeoPackage."""
+    texte = np.datetime_as_string(np.asarray(times, dtype=np.int64).astype("datetime64[ns]"), unit="ms")
+    return [t + "Z" for t in texte.tolist()]
+
+
+class GeoPackageWriter:
+    """Écrit des tables d'entités dans un GeoPackage (créé au besoin)."""
+
+    def __init__(self, path, srs_id=4326):
+        self.path = path
+        self.srs_id = srs_id
+        # Transactions gérées explicitement (BEGIN/COMMIT)
+        self.con = sqlite3.connect(path, isolation_level=None)
+        # Cache de pages large : l'insertion dans le R-tree relit sans cesse ses nœuds
+        self.con.execute(f"PRAGMA cache_size = {-TAILLE_CACHE // 1024}")
+        self.con.execute(f"PRAGMA application_id = {APPLICATION_ID}")
+        self.con.execute(f"PRAGMA user_version = {USER_VERSION}")
+        self.con.executescript(_TABLES_NORME)
+        self.con.executemany(
+            "INSERT OR IGNORE INTO gpkg_spatial_ref_sys VALUES (?, ?, ?, ?, ?, ?)", [
+                ("Undefined cartesian SRS", -1, "NONE", -1, "undefined", "undefined cartesian coordinate reference system"),
+                ("Undefined geographic SRS", 0, "NONE", 0, "undefined", "undefined geographic coordinate reference system"),
+                ("WGS 84 geodetic", 4326, "EPSG", 4326, WGS84, "longitude/latitude coordinates in decimal degrees on the WGS 84 spheroid"),
+            ])
+        self.con.execute(f"CREATE TABLE IF NOT EXISTS {TABLE_PARAMETRES} "
+                         "(table_name TEXT NOT NULL PRIMARY KEY, parametres TEXT NOT NULL)")
+
+    def close(self):
+        if self.con is not None:
+            self.con.close()
+            self.con = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write_table(self, table, geometry_type, fields, geometries, envelopes, attributes,
+                    z=False, indexes=(), feedback=None, parameters=None):
+        """
+        Remplace la table ``table`` en une transaction.
+
+        ``fields`` : liste de (nom, type SQL) ; ``geometries`` : géométries
+        GeoPackage (voir geometry_blob, point_blobs) ; ``envelopes`` : tableau
+        (n, 4) des emprises [minx, maxx, miny, maxy] ; ``attributes`` : une
+        séquence de valeurs par champ. ``indexes`` : champs à indexer.
+        ``parameters`` (valeurs JSON) : paramètres de calcul enregistrés avec
+        la table, comparés par is_current.
+        """
+        envelopes = np.asarray(envelopes, dtype=np.float64).reshape(-1, 4)
+        n = len(envelopes)
+        rtree = f"rtree_{table}_geom"
+        colonnes = ", ".join(f'"{nom}" {type_sql}' for nom, type_sql in fields)
+        marques = ", ".join("?" * (len(fields) + 2))
+        con = self.con
+        con.execute("BEGIN")
+        try:
+            self._supprimer(table)
+            con.execute(f'CREATE TABLE "{table}" (fid INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, '
+                        f'geom {geometry_type}{", " + colonnes if fields else ""})')
+            self._inserer(f'INSERT INTO "{table}" VALUES ({marques})',
+                          zip(range(1, n + 1), geometries, *attributes), n, feedback, 0, 30)
+            # Index spatial rempli depuis les emprises connues (sans triggers), triggers ensuite
+            con.execute(f'CREATE VIRTUAL TABLE "{rtree}" USING rtree(id, minx, maxx, miny, maxy)')
+            self._inserer(f'INSERT INTO "{rtree}" VALUES (?, ?, ?, ?, ?)',
+                          zip(range(1, n + 1), *envelopes.T.tolist()), n, feedback, 30, 95)
+            for trigger in _TRIGGERS_RTREE.format(t=table).split("END;")[:-1]:
+                con.execute(trigger + "END;")
+            for nom in indexes:
+                con.execute(f'CREATE INDEX "idx_{table}_{nom}" ON "{table}" ("{nom}")')
+
+            emprise = (envelopes[:, 0].min(), envelopes[:, 2].min(),
+                       envelopes[:, 1].max(), envelopes[:, 3].max()) if n else (None,) * 4
+            con.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier, "
+                        "min_x, min_y, max_x, max_y, srs_id) VALUES (?, 'features', ?, ?, ?, ?, ?, ?)",
+                        (table, table, *[None if v is None else float(v) for v in emprise], self.srs_id))
+            con.execute("INSERT INTO gpkg_geometry_columns VALUES (?, 'geom', ?, ?, ?, 0)",
+                        (table, geometry_type, self.srs_id, int(z)))
+            con.execute("INSERT INTO gpkg_extensions VALUES (?, 'geom', 'gpkg_rtree_index', "
+                        "'http://www.geopackage.org/spec120/#extension_rtree', 'write-only')", (table,))
+            if parameters is not None:
+                con.execute(f"INSERT INTO {TABLE_PARAMETRES} VALUES (?, ?)", (table, _texte_parametres(parameters)))
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+        if feedback is not None:
+            feedback.setProgress(100)
+
+    def write_attributes(self, table, fields, attributes):
+        """Remplace la table attributaire (sans géométrie) ``table`` en une transaction."""
+        n = len(attributes[0]) if attributes else 0
+        colonnes = ", ".join(f'"{nom}" {type_sql}' for nom, type_sql in fields)
+        marques = ", ".join("?" * (len(fields) + 1))
+        con = self.con
+        con.execute("BEGIN")
+        try:
+            self._supprimer(table)
+            con.execute(f'CREATE TABLE "{table}" (fid INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL, {colonnes})')
+            self._inserer(f'INSERT INTO "{table}" VALUES ({marques})',
+                          zip(range(1, n + 1), *attributes), n, None, 0, 100)
+            con.execute("INSERT INTO gpkg_contents (table_name, data_type, identifier) "
+                        "VALUES (?, 'attributes', ?)", (table, table))
+            con.execute("COMMIT")
+        except BaseException:
+            con.execute("ROLLBACK")
+            raise
+
+    def _inserer(self, sql, lignes, n, feedback, debut, fin):
+        # Insertion par lots de TAILLE_LOT, avancement ramené dans [debut, fin]
+        for a in range(0, n, TAILLE_LOT):
+            if feedback is not None:
+                if feedback.isCanceled():
+                    raise OperationAnnulee("Opération annulée")
+                feedback.setProgress(debut + (fin - debut) * a / n)
+            self.con.executemany(sql, (next(lignes) for _ in range(min(TAILLE_LOT, n - a))))
+
+    def _supprimer(self, table):
+        con = self.con
+        for (nom,) in con.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ?",
+                                  (table,)).fetchall():
+            con.execute(f'DROP TRIGGER "{nom}"')
+        con.execute(f'DROP TABLE IF EXISTS "rtree_{table}_geom"')
+        con.execute(f'DROP TABLE IF EXISTS "{table}"')
+        for meta in ("gpkg_extensions", "gpkg_geometry_columns", "gpkg_contents", TABLE_PARAMETRES):
+            con.execute(f"DELETE FROM {meta} WHERE table_name = ?", (table,))
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture des fichiers de mission NAIAD en TrajectoryStore
+
+``stream_mission`` lit le CSV par blocs de taille bornée : chaque bloc est
+validé et typé, trié par drone puis par temps et déversé sur disque (une
+« série » triée par bloc). Les séries sont ensuite fusionnées drone par drone
+dans des tableaux projetés en mémoire, si bien que la mémoire occupée ne
+dépend que de la taille d'un bloc et de la plus longue trajectoire, et non de
+la taille du fichier.
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from .cache import MissionCache, read_store, write_meta
+from .trajectory_store import TrajectoryStore
+
+# Correspondance par défaut rôle -> nom de colonne du CSV
+COLONNES_DEFAUT = {
+    "id": "drone_id",
+    "lon": "longitude",
+    "lat": "latitude",
+    "time": "timestamp",
+    "depth": "depth",
+}
+
+# Nombre de lignes lues par bloc lors de l'ingestion en flux
+TAILLE_BLOC = 500_000
+
+# Bornes des coordonnées (valeur absolue maximale) ; au-delà, la ligne est écartée
+BORNES = {"lon": 180.0, "lat": 90.0}
+
+_CHIFFRES = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+
+
+class OperationAnnulee(Exception):
+    """Levée lorsqu'une ingestion est annulée via son objet de suivi."""
+
+
+def _suivre(feedback, pourcentage):
+    """Publie l'avancement sur ``feedback`` et vérifie l'annulation."""
+    if feedback is None:
+        return
+    if feedback.isCanceled():
+        raise OperationAnnulee("Opération annulée")
+    feedback.setProgress(pourcentage)
+
+
+# Enregistrement d'une série triée déversée sur disque
+_SERIE = np.dtype([
+    ("code", np.int64), ("time", np.int64),
+    ("lon", np.float64), ("lat", np.float64), ("depth", np.float64),
+])
+
+
+def _parse_iso_rapide(valeurs):
+    """
+    Horodatages ``AAAA-MM-JJTHH:MM:SS[Z]`` convertis en ns par arithmétique sur
+    les octets ; retourne (ns, masque des valeurs reconnues). Les autres formats
+    sont laissés à pandas.
+    """
+    n = len(valeurs)
+    ns = np.zeros(n, dtype=np.int64)
+    try:
+        octets = np.asarray(valeurs, dtype="S32").view(np.uint8).reshape(n, 32)
+    except (UnicodeEncodeError, ValueError):
+        return ns, np.zeros(n, dtype=bool)
+    longueur = np.where(octets == 0, np.arange(32), 32).min(axis=1)
+    chiffres = octets[:, _CHIFFRES].astype(np.int64) - ord("0")
+    ok = (((longueur == 19) | ((longueur == 20) & (octets[:, 19] == ord("Z"))))
+          & (octets[:, 4] == ord("-")) & (octets[:, 7] == ord("-"))
+          & ((octets[:, 10] == ord("T")) | (octets[:, 10] == ord(" ")))
+          & (octets[:, 13] == ord(":")) & (octets[:, 16] == ord(":"))
+          & ((chiffres >= 0) & (chiffres <= 9)).all(axis=1))
+    c = chiffres
+    annee = c[:, 0] * 1000 + c[:, 1] * 100 + c[:, 2] * 10 + c[:, 3]
+    mois, jour = c[:, 4] * 10 + c[:, 5], c[:, 6] * 10 + c[:, 7]
+    heure, minute, seconde = c[:, 8] * 10 + c[:, 9], c[:, 10] * 10 + c[:, 11], c[:, 12] * 10 + c[:, 13]
+    ok &= (mois >= 1) & (mois <= 12) & (jour >= 1) & (heure <= 23) & (minute <= 59) & (seconde <= 60)
+    # Jours depuis l'époque (calendrier grégorien proleptique), jour du mois vérifié
+    dates = np.where(ok, annee - 1970, 0).astype("datetime64[Y]").astype("datetime64[M]") \
+        + np.where(ok, mois - 1, 0).astype("timedelta64[M]")
+    jours = dates.astype("datetime64[D]").astype(np.int64) + jour - 1
+    fin_de_mois = (dates + np.timedelta64(1, "M")).astype("datetime64[D]").astype(np.int64)
+    ok &= jours < fin_de_mois
+    secondes = jours * 86400 + heure * 3600 + minute * 60 + seconde
+    ns[ok] = secondes[ok] * 1_000_000_000
+    return ns, ok
+
+
+def parse_timestamps(valeurs):
+    """
+    Instants en ns (UTC) et masque des valeurs lisibles.
+
+    Seul analyseur d'horodatages du chargement et de la validation : une
+    valeur illisible ici est signalée par validate_mission et écartée à
+    l'ingestion. Les horodatages sans fuseau sont lus comme UTC.
+    """
+    valeurs = np.asarray(valeurs, dtype=object)
+    ns, ok = _parse_iso_rapide(valeurs)
+    autres = np.flatnonzero(~ok)
+    if len(autres):
+        dates = pd.to_datetime(pd.Series(valeurs[autres]), errors="coerce", utc=True, format="mixed")
+        lisibles = dates.notna().to_numpy()
+        ns[autres[lisibles]] = dates[lisibles].dt.as_unit("ns").array.asi8
+        ok[autres[lisibles]] = True
+    return ns, ok
+
+
+def valid_rows(ids, lon, lat, lisibles):
+    """
+    Masque des lignes conservées à l'ingestion : identifiant présent,
+    coordonnées numériques dans BORNES et horodatage lisible.
+    """
+    with np.errstate(invalid="ignore"):
+        return (~pd.isna(ids) & (np.abs(lon) <= BORNES["lon"]) & (np.abs(lat) <= BORNES["lat"])
+                & lisibles)
+
+
+def _fuseau(valeurs, lisibles):
+    # Fuseau des instants : UTC si la première valeur lisible en porte un, sinon aucun
+    premiere = np.flatnonzero(lisibles)
+    if not len(premiere):
+        return None
+    return "UTC" if pd.Timestamp(valeurs[premiere[0]]).tz is not None else None
+
+
+def read_dtypes(columns=None):
+    """
+    Types imposés à la lecture CSV : les identifiants de drones sont lus comme
+    texte, pour que tous les blocs d'un fichier les typent de la même façon.
+    """
+    return {dict(COLONNES_DEFAUT, **(columns or {}))["id"]: str}
+
+
+def read_mission(path, columns=None, transform=None):
+    """
+    Lit, type et trie une mission CSV (mêmes règles que parse_chunk).
+
+    :param columns: correspondance rôle -> colonne (voir COLONNES_DEFAUT) ;
+        une colonne ``id`` ou ``depth`` absente vaut 0
+    :param transform: fonction optionnelle ``transform(df) -> (lon, lat)``
+        appliquée aux lignes valides pour reprojeter en EPSG:4326
+    """
+    return parse_chunk(pd.read_csv(path, dtype=read_dtypes(columns)), columns, transform)
+
+
+def _typer_bloc(bloc, columns, transform):
+    """
+    Valide et type un bloc ; les lignes écartées sont exactement celles que
+    validate_mission signale en erreur (voir valid_rows).
+    """
+    x_col, y_col, t_col = columns["lon"], columns["lat"], columns["time"]
+    n = len(bloc)
+    if columns["id"] in bloc.columns:
+        ids = bloc[columns["id"]].to_numpy(dtype=object)
+        # Identifiants toujours textuels : 7 et "7" désignent le même drone
+        ids = np.where(pd.isna(ids), None, ids.astype(str)).astype(object)
+    else:
+        ids = np.zeros(n, dtype=np.int64)
+    x = pd.to_numeric(bloc[x_col], errors="coerce").to_numpy(dtype=np.float64)
+    y = pd.to_numeric(bloc[y_col], errors="coerce").to_numpy(dtype=np.float64)
+    valeurs = bloc[t_col].to_numpy(dtype=object)
+    times, lisibles = parse_timestamps(valeurs)
+    tz = _fuseau(valeurs, lisibles)
+
+    lisibles &= ~np.isnan(x) & ~np.isnan(y)
+    if transform is not None and lisibles.any():
+        lon, lat = np.full(n, np.nan), np.full(n, np.nan)
+        a_projeter = bloc[lisibles].assign(**{x_col: x[lisibles], y_col: y[lisibles]})
+        projete = transform(a_projeter)
+        lon[lisibles], lat[lisibles] = (np.asarray(v, dtype=np.float64) for v in projete)
+    else:
+        lon, lat = x, y
+    gardees = valid_rows(ids, lon, lat, lisibles)
+
+    if columns["depth"] in bloc.columns:
+        depth = pd.to_numeric(bloc[columns["depth"]], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64)
+    else:
+        depth = np.zeros(n)
+    return ids[gardees], lon[gardees], lat[gardees], depth[gardees], times[gardees], tz
+
+
+def parse_chunk(bloc, columns=None, transform=None):
+    """Valide et type un bloc de lignes CSV déjà lu en DataFrame, trié en TrajectoryStore."""
+    columns = dict(COLONNES_DEFAUT, **(columns or {}))
+    ids, lon, lat, depth, times, tz = _typer_bloc(bloc, columns, transform)
+    return TrajectoryStore.from_arrays(ids, lon, lat, depth, times, tz)
+
+
+def _deverser_bloc(bloc, columns, transform, codes, chemin):
+    """Type un bloc, le trie par (drone, temps) et l'écrit sur disque ; retourne son fuseau."""
+    # Identifiants textuels et sans valeur manquante (voir _typer_bloc) : np.unique peut les trier
+    ids, lon, lat, depth, times, tz = _typer_bloc(bloc, columns, transform)
+    valeurs, inverse = np.unique(ids, return_inverse=True)
+    table = np.array([codes.setdefault(v, len(codes)) for v in valeurs.tolist()], dtype=np.int64)
+    serie = np.empty(len(ids), dtype=_SERIE)
+    serie["code"], serie["time"] = table[inverse.ravel()], times
+    serie["lon"], serie["lat"], serie["depth"] = lon, lat, depth
+    np.save(chemin, serie[np.lexsort((serie["time"], serie["code"]))])
+    return tz
+
+
+def stream_mission(path, directory, columns=None, transform=None, chunksize=TAILLE_BLOC,
+                   feedback=None):
+    """
+    Ingère une mission par blocs et l'écrit dans ``directory`` (format du cache).
+
+    ``feedback`` (optionnel, par exemple une QgsTask) reçoit l'avancement via
+    ``setProgress`` et peut interrompre l'ingestion via ``isCanceled`` :
+    OperationAnnulee est alors levée. Retourne le TrajectoryStore projeté en
+    mémoire depuis ``directory``.
+    """
+    columns = dict(COLONNES_DEFAUT, **(columns or {}))
+    series_dir = os.path.join(directory, "series")
+    os.makedirs(series_dir, exist_ok=True)
+    codes = {}
+    series = []
+    tz = None
+    taille = max(os.path.getsize(path), 1)
+
+    try:
+        # 1. Blocs validés, triés par (drone, temps) et déversés sur disque
+        with open(path, "rb") as fichier:
+            for i, bloc in enumerate(pd.read_csv(fichier, chunksize=chunksize, dtype=read_dtypes(columns))):
+                chemin = os.path.join(series_dir, f"{i}.npy")
+                tz = _deverser_bloc(bloc, columns, transform, codes, chemin) or tz
+                series.append(chemin)
+                _suivre(feedback, 80 * fichier.tell() / taille)
+
+        # 2. Fusion drone par drone dans les tableaux définitifs
+        series = [np.load(chemin, mmap_mode="r") for chemin in series]
+        bornes = [np.searchsorted(serie["code"], np.arange(len(codes) + 1)) for serie in series]
+        n = sum(len(serie) for serie in series)
+        ordre = sorted(codes)
+        sorties = {
+            nom: np.lib.format.open_memmap(os.path.join(directory, nom + ".npy"), mode="w+",
+                                           dtype=np.int64 if nom == "times" else np.float64, shape=(n,))
+            for nom in ("lon", "lat", "depth", "times")
+        }
+        offsets = np.zeros(len(ordre) + 1, dtype=np.int64)
+        position = 0
+        for k, valeur in enumerate(ordre):
+            _suivre(feedback, 80 + 20 * k / len(ordre))
+            code = codes[valeur]
+            morceaux = [serie[b[code]:b[code + 1]] for serie, b in zip(series, bornes)]
+            trajectoire = np.concatenate(morceaux)
+            # Tri stable : à instant égal, l'ordre du fichier est conservé
+            trajectoire = trajectoire[np.argsort(trajectoire["time"], kind="stable")]
+            fin = position + len(trajectoire)
+            sorties["lon"][position:fin] = trajectoire["lon"]
+            sorties["lat"][position:fin] = trajectoire["lat"]
+            sorties["depth"][position:fin] = trajectoire["depth"]
+            sorties["times"][position:fin] = trajectoire["time"]
+            position = offsets[k + 1] = fin
+
+        for tableau in sorties.values():
+            tableau.flush()
+        del sorties, series
+        np.save(os.path.join(directory, "offsets.npy"), offsets)
+        write_meta(directory, ordre, tz)
+    finally:
+        shutil.rmtree(series_dir, ignore_errors=True)
+    return read_store(directory)
+
+
+def load_mission(path, columns=None, crs=None, transform=None, cache=None, feedback=None):
+    """
+    Charge une mission depuis le cache disque, ou l'ingère en flux (stream_mission)
+    directement dans une nouvelle entrée du cache.
+
+    ``crs`` identifie la projection appliquée par ``transform`` dans la clé
+    du cache. ``cache=False`` désactive le cache. ``feedback`` : voir stream_mission.
+    """
+    if cache is False:
+        return read_mission(path, columns, transform)
+    cache = cache or MissionCache()
+    key = cache.key(path, dict(COLONNES_DEFAUT, **(columns or {})), crs)
+    store = cache.load(key)
+    if store is None:
+        store = cache.build(key, lambda directory: stream_mission(
+            path, directory, columns, transform, feedback=feedback))
+    return store
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur d'interpolation vectorisé des trajectoires NAIAD
+
+Toutes les positions interpolées (lon, lat, profondeur, temps) de tous les
+segments de tous les drones sont calculées par opérations NumPy groupées,
+sans boucle Python par point. Le nombre d'échantillons par segment suit une
+SamplingPolicy (densité temporelle ou spatiale, budget global), si bien que
+la mémoire et le coût de l'animation restent bornés.
+"""
+
+import numpy as np
+
+from .kinematics import geodesic_inverse
+
+# Politique par défaut : un échantillon toutes les 10 s de mission ou tous les
+# 50 m parcourus, au plus 500 000 échantillons pour toute la mission
+IMAGES_PAR_HEURE = 360
+METRES_PAR_SOMMET = 50.0
+BUDGET_IMAGES = 500_000
+
+
+class SamplingPolicy:
+    """
+    Densité d'échantillonnage des segments interpolés.
+
+    ``frames_per_hour`` : N échantillons par heure de mission ;
+    ``metres_per_vertex`` : un échantillon tous les M mètres (géodésiques).
+    Chaque segment reçoit le plus grand des deux nombres d'étapes demandés,
+    borné par ``min_steps``/``max_steps``. ``frame_budget`` plafonne ensuite le
+    total des échantillons : les étapes au-delà de la première de chaque
+    segment sont réduites proportionnellement.
+    """
+
+    def __init__(self, frames_per_hour=IMAGES_PAR_HEURE, metres_per_vertex=METRES_PAR_SOMMET,
+                 frame_budget=BUDGET_IMAGES, min_steps=1, max_steps=None):
+        self.frames_per_hour = frames_per_hour
+        self.metres_per_vertex = metres_per_vertex
+        self.frame_budget = frame_budget
+        self.min_steps = min_steps
+        self.max_steps = max_steps
+
+    def steps(self, lengths, durations):
+        """Nombre d'étapes de segments de ``lengths`` mètres et ``durations`` ns."""
+        steps = np.full(len(lengths), max(self.min_steps, 1), dtype=np.int64)
+        if self.frames_per_hour:
+            par_temps = np.ceil(np.asarray(durations) / 3.6e12 * self.frames_per_hour)
+            steps = np.maximum(steps, par_temps.astype(np.int64))
+        if self.metres_per_vertex:
+            par_distance = np.ceil(np.asarray(lengths) / self.metres_per_vertex)
+            steps = np.maximum(steps, par_distance.astype(np.int64))
+        if self.max_steps is not None:
+            steps = np.minimum(steps, self.max_steps)
+        if self.frame_budget is not None:
+            # Chaque segment garde au moins son échantillon de départ
+            supplementaires = steps - 1
+            disponibles = max(self.frame_budget - len(steps), 0)
+            total = int(supplementaires.sum())
+            if total > disponibles:
+                steps = 1 + supplementaires * disponibles // total
+        return steps
+
+
+def interpolate_segments(lon, lat, depth, times, offsets, policy=None):
+    """
+    Interpole l'ensemble des segments de toutes les trajectoires en une passe.
+
+    Les tableaux d'entrée sont triés par drone puis par temps, ``offsets``
+    délimitant chaque drone. Chaque segment (i, i+1) d'un même drone produit
+    ``steps`` échantillons aux fractions s/steps (s = 0..steps-1), ``steps``
+    étant fixé par ``policy`` (SamplingPolicy, politique par défaut si
+    None). Le dernier point de chaque drone est ensuite émis tel quel, si
+    bien que les échantillons vont jusqu'à la fin de la mission ; un drone à
+    point unique produit ce seul point.
+
+    Retourne (lon, lat, depth, times, offsets) des échantillons interpolés.
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n = len(lon)
+    longueurs = np.diff(offsets)
+
+    # Chaque point débute un segment ; le dernier de chaque drone forme un
+    # segment dégénéré i -> i, échantillonné une fois (position finale)
+    dernier = np.zeros(n, dtype=bool)
+    dernier[offsets[1:][longueurs > 0] - 1] = True
+    a = np.arange(n)
+    b = np.where(dernier, a, a + 1)
+
+    dlon = lon[b] - lon[a]
+    dlat = lat[b] - lat[a]
+    if policy is None:
+        policy = SamplingPolicy()
+    longueurs_m, _ = geodesic_inverse(lon[a], lat[a], lon[b], lat[b])
+    steps = policy.steps(longueurs_m, times[b] - times[a])
+    steps[a == b] = 1
+
+    seg = np.repeat(np.arange(len(a)), steps)
+    debut = np.cumsum(steps) - steps
+    f = (np.arange(len(seg)) - debut[seg]) / steps[seg]
+
+    out_lon = lon[a][seg] + f * dlon[seg]
+    out_lat = lat[a][seg] + f * dlat[seg]
+    out_depth = depth[a][seg] + f * (depth[b] - depth[a])[seg]
+    out_times = times[a][seg] + ((times[b] - times[a])[seg] * f).astype(np.int64)
+
+    drone = np.searchsorted(offsets, a, side="right") - 1
+    comptes = np.bincount(drone, weights=steps, minlength=len(longueurs))
+    out_offsets = np.zeros(len(longueurs) + 1, dtype=np.int64)
+    np.cumsum(comptes.astype(np.int64), out=out_offsets[1:])
+    return out_lon, out_lat, out_depth, out_times, out_offsets
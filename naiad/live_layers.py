@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Couches mémoire NAIAD alimentées par lots incrémentaux
+
+Utilisées par le suivi en direct : chaque lot (TrajectoryStore des nouveaux
+points) ajoute ses points à la couche de points et prolonge la trajectoire
+de chaque drone avec ses seuls nouveaux sommets.
+"""
+
+from qgis.core import (
+    QgsVectorLayer, QgsField, QgsFeature, QgsGeometry, QgsPoint, QgsLineString
+)
+from qgis.PyQt.QtCore import Qt, QDateTime, QVariant
+
+
+def to_qdatetime(ns):
+    """Instant en ns depuis l'époque (UTC) converti en QDateTime."""
+    return QDateTime.fromMSecsSinceEpoch(int(ns) // 1_000_000, Qt.UTC)
+
+
+class LiveLayers:
+    """Couche de points et couche de trajectoires en mémoire, prolongées par lots."""
+
+    # Nombre de sommets au-delà duquel la trajectoire vivante d'un drone est figée
+    SOMMETS_PAR_ENTITE = 500
+
+    def __init__(self, nom):
+        self.points = QgsVectorLayer("PointZ?crs=EPSG:4326", f"Points {nom}", "memory")
+        self.points.dataProvider().addAttributes([
+            QgsField("drone_id", QVariant.String),
+            QgsField("timestamp", QVariant.DateTime),
+            QgsField("depth", QVariant.Double)
+        ])
+        self.points.updateFields()
+
+        self.lignes = QgsVectorLayer("LineStringZ?crs=EPSG:4326", f"Trajectoires {nom}", "memory")
+        self.lignes.dataProvider().addAttributes([
+            QgsField("drone_id", QVariant.String),
+            QgsField("start", QVariant.DateTime),
+            QgsField("end", QVariant.DateTime)
+        ])
+        self.lignes.updateFields()
+
+        # Par drone : ligne vivante, son identifiant, l'instant de son premier et de son dernier sommet
+        self._lignes = {}
+        self._fids = {}
+        self._debuts = {}
+        self._derniers = {}
+
+    def append(self, store):
+        """Ajoute un lot de points ; le coût ne dépend que de la taille du lot."""
+        points = []
+        nouvelles, ids_nouvelles = [], []
+        geometries, attributs = {}, {}
+
+        for track_id, lon, lat, depth, times in store.tracks():
+            drone = str(track_id)
+            for x, y, z, t in zip(lon.tolist(), lat.tolist(), depth.tolist(), times.tolist()):
+                feat = QgsFeature()
+                feat.setGeometry(QgsGeometry(QgsPoint(x, y, z)))
+                feat.setAttributes([drone, to_qdatetime(t), z])
+                points.append(feat)
+
+            # Les positions antérieures au dernier sommet ne prolongent pas la ligne
+            dernier = self._derniers.get(drone)
+            if dernier is not None:
+                garder = times > dernier
+                lon, lat, depth, times = lon[garder], lat[garder], depth[garder], times[garder]
+            if not len(times):
+                continue
+            ajout = QgsLineString(lon.tolist(), lat.tolist(), depth.tolist())
+            self._derniers[drone] = int(times[-1])
+
+            line = self._lignes.get(drone)
+            if line is None or line.numPoints() >= self.SOMMETS_PAR_ENTITE:
+                # Nouvelle entité raccordée au dernier sommet de la précédente
+                self._debuts[drone] = int(times[0])
+                self._fids.pop(drone, None)
+                if line is not None:
+                    sommet = line.endPoint()
+                    line = QgsLineString([sommet.x()], [sommet.y()], [sommet.z()])
+                    line.append(ajout)
+                else:
+                    line = ajout
+                self._lignes[drone] = line
+            else:
+                line.append(ajout)
+            fid = self._fids.get(drone)
+            if fid is None:
+                # Entité pas encore dans la couche (nouvelle, ou ajout précédent refusé)
+                feat = QgsFeature()
+                feat.setGeometry(QgsGeometry(line.clone()))
+                feat.setAttributes([drone, to_qdatetime(self._debuts[drone]), to_qdatetime(times[-1])])
+                nouvelles.append(feat)
+                ids_nouvelles.append(drone)
+            else:
+                geometries[fid] = QgsGeometry(line.clone())
+                attributs[fid] = {2: to_qdatetime(times[-1])}
+
+        self.points.dataProvider().addFeatures(points)
+        if nouvelles:
+            ok, ajoutees = self.lignes.dataProvider().addFeatures(nouvelles)
+            if ok:
+                for drone, feat in zip(ids_nouvelles, ajoutees):
+                    self._fids[drone] = feat.id()
+        if geometries:
+            self.lignes.dataProvider().changeGeometryValues(geometries)
+            self.lignes.dataProvider().changeAttributeValues(attributs)
+
+        for couche in (self.points, self.lignes):
+            couche.updateExtents()
+            couche.triggerRepaint()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Outils de carte NAIAD
+
+OutilIdentification : un clic sur la carte identifie le segment de
+trajectoire le plus proche (drone, heure et profondeur interpolées) à
+l'aide de l'index spatial des segments, sans parcourir les entités des
+couches.
+"""
+
+from math import hypot
+
+from qgis.core import QgsCoordinateReferenceSystem, QgsCoordinateTransform, QgsPointXY, QgsProject, Qgis
+from qgis.gui import QgsMapToolEmitPoint
+
+
+class OutilIdentification(QgsMapToolEmitPoint):
+    """Identification d'un drone par clic sur sa trajectoire."""
+
+    # Distance (pixels écran) en deçà de laquelle un clic touche une trajectoire
+    TOLERANCE_PIXELS = 6
+
+    def __init__(self, canvas, iface):
+        super().__init__(canvas)
+        self.iface = iface
+        self.index = None
+        self.canvasClicked.connect(self.identifier)
+
+    def identifier(self, point, bouton):
+        if self.index is None:
+            self.iface.messageBar().pushMessage(
+                "NAIAD", "Aucune trajectoire chargée", level=Qgis.Warning)
+            return
+
+        # Clic et tolérance ramenés en EPSG:4326, le système des trajectoires indexées
+        canvas = self.canvas()
+        transformation = QgsCoordinateTransform(
+            canvas.mapSettings().destinationCrs(), QgsCoordinateReferenceSystem("EPSG:4326"),
+            QgsProject.instance())
+        clic = transformation.transform(point)
+        bord = transformation.transform(QgsPointXY(
+            point.x() + canvas.mapUnitsPerPixel() * self.TOLERANCE_PIXELS, point.y()))
+        tolerance = hypot(bord.x() - clic.x(), bord.y() - clic.y())
+
+        hit = self.index.nearest(clic.x(), clic.y(), tolerance)
+        if hit is None:
+            return
+        heure = self.index.store.timestamps(hit.time)[0].isoformat()
+        self.iface.messageBar().pushMessage(
+            "NAIAD", f"Drone {hit.track_id} | Heure : {heure} | Profondeur : {hit.depth:.1f} m",
+            level=Qgis.Info)
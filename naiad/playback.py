@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Horloge de lecture des missions NAIAD
+
+La lecture est pilotée par le temps de mission (ns depuis l'époque) et non
+par un numéro de frame : le temps avance proportionnellement au temps réel
+écoulé, ce qui garde tous les drones synchronisés quelle que soit la
+densité de leurs échantillons et absorbe les ticks en retard.
+"""
+
+import time
+
+import numpy as np
+
+
+class MissionClock:
+    """Horloge de mission avancée selon le temps réel (time.monotonic_ns)."""
+
+    def __init__(self, debut, fin, duree_lecture=60.0):
+        """
+        :param debut: début de la mission (ns)
+        :param fin: fin de la mission (ns)
+        :param duree_lecture: durée en secondes de la lecture complète à la vitesse 1.0
+        """
+        self.debut = int(debut)
+        self.fin = int(fin)
+        # Nanosecondes de mission par nanoseconde réelle à la vitesse 1.0
+        self.rate = max(self.fin - self.debut, 1) / (duree_lecture * 1e9)
+        self.speed = 1.0
+        self.time = self.debut
+        self._dernier = None
+
+    @property
+    def running(self):
+        return self._dernier is not None
+
+    @property
+    def finished(self):
+        return self.time >= self.fin
+
+    @property
+    def progress(self):
+        """Avancement de la lecture dans [0, 1]."""
+        if self.fin <= self.debut:
+            return 1.0
+        return (self.time - self.debut) / (self.fin - self.debut)
+
+    def start(self):
+        self._dernier = time.monotonic_ns()
+
+    def pause(self):
+        self.tick()
+        self._dernier = None
+
+    def reset(self):
+        self.time = self.debut
+        if self.running:
+            self._dernier = time.monotonic_ns()
+
+    def seek(self, t):
+        self.time = min(max(int(t), self.debut), self.fin)
+
+    def tick(self):
+        """Avance l'horloge du temps réel écoulé depuis le tick précédent."""
+        if self._dernier is not None:
+            maintenant = time.monotonic_ns()
+            self.seek(self.time + (maintenant - self._dernier) * self.rate * self.speed)
+            self._dernier = maintenant
+        return self.time
+
+
+def sample_index(times, t):
+    """Indice du dernier échantillon d'instant <= t (-1 s'il n'y en a aucun)."""
+    return int(np.searchsorted(times, t, side="right")) - 1
+
+
+class PlaybackCursors:
+    """
+    Curseurs de lecture de toutes les trajectoires d'un TrajectoryStore.
+
+    ``ends[k]`` est le nombre d'échantillons du drone k d'instant <= t
+    (0 si sa mission n'a pas commencé). En lecture avant, chaque drone ne
+    compare que son échantillon suivant ; seuls ceux qui avancent sont
+    repositionnés par dichotomie, ce qui coûte O(drones) par image. Un
+    retour en arrière (seek, rejeu) repositionne tous les curseurs par une
+    dichotomie vectorisée.
+    """
+
+    def __init__(self, store):
+        self.times = store.times
+        self.debuts = np.asarray(store.offsets[:-1], dtype=np.int64)
+        self.fins = np.asarray(store.offsets[1:], dtype=np.int64)
+        self.ends = np.zeros(len(self.debuts), dtype=np.int64)
+        self.time = None
+
+    def _bisecter(self, pistes, bas, t):
+        # Premier échantillon d'instant > t dans [bas, fin de piste[, pour chaque piste
+        haut = self.fins[pistes]
+        while True:
+            ouverts = bas < haut
+            if not ouverts.any():
+                return bas
+            milieu = (bas + haut) // 2
+            avant = np.zeros(len(bas), dtype=bool)
+            avant[ouverts] = self.times[milieu[ouverts]] <= t
+            bas = np.where(avant, milieu + 1, bas)
+            haut = np.where(ouverts & ~avant, milieu, haut)
+
+    def seek(self, t):
+        """Repositionne tous les curseurs à l'instant t."""
+        self.time = int(t)
+        pistes = np.arange(len(self.debuts))
+        self.ends[:] = self._bisecter(pistes, self.debuts.copy(), self.time) - self.debuts
+        return self.ends
+
+    def advance(self, t):
+        """Amène les curseurs à l'instant t ; un instant antérieur au précédent équivaut à seek."""
+        t = int(t)
+        if self.time is None or t < self.time:
+            return self.seek(t)
+        self.time = t
+        suivants = self.debuts + self.ends
+        restants = suivants < self.fins
+        avancent = np.flatnonzero(restants)
+        avancent = avancent[self.times[suivants[avancent]] <= t]
+        if len(avancent):
+            self.ends[avancent] = self._bisecter(avancent, suivants[avancent] + 1, t) - self.debuts[avancent]
+        return self.ends
+
+    def started(self):
+        """Indices (triés) des drones ayant au moins un échantillon d'instant <= t."""
+        return np.flatnonzero(self.ends)
+
+    def current(self, pistes=None):
+        """Indices, dans les colonnes du store, du dernier échantillon de chaque drone commencé de ``pistes``."""
+        pistes = self.started() if pistes is None else np.asarray(pistes, dtype=np.int64)
+        return self.debuts[pistes] + self.ends[pistes] - 1
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Reprojection vectorisée des coordonnées de mission vers EPSG:4326
+
+Les colonnes X/Y sont transformées par tableaux NumPy entiers, un appel
+pyproj par bloc de ``chunksize`` points, au lieu d'un appel Python par
+ligne. Les blocs d'un tableau assez long (au moins BLOCS_MIN_POOL blocs)
+peuvent être répartis sur un pool de processus (``executor``) ; chaque
+processus garde son propre Transformer. En deçà, l'envoi des blocs aux
+processus coûte plus qu'il ne rapporte. Une source déjà en EPSG:4326 n'est
+pas transformée.
+
+Les colonnes projetées sont conservées par le cache des missions, dont la
+clé inclut le SCR source (voir load_mission) : rouvrir le même fichier
+dans le même SCR ne refait aucune transformation.
+"""
+
+from functools import lru_cache
+from itertools import repeat
+
+import numpy as np
+from pyproj import CRS, Transformer
+
+# SCR des trajectoires NAIAD
+SCR_CIBLE = "EPSG:4326"
+# Nombre de points transformés par appel pyproj (et par tâche du pool)
+TAILLE_BLOC_PROJECTION = 250_000
+# Nombre minimal de blocs pour répartir la transformation sur le pool
+BLOCS_MIN_POOL = 4
+
+
+@lru_cache(maxsize=8)
+def _transformer(crs):
+    # Un Transformer par SCR source et par processus
+    return Transformer.from_crs(CRS(crs), CRS(SCR_CIBLE), always_xy=True)
+
+
+def is_target_crs(crs):
+    """Vrai si ``crs`` est déjà le SCR des trajectoires (aucune transformation)."""
+    return CRS(crs) == CRS(SCR_CIBLE)
+
+
+def _projeter_bloc(crs, x, y):
+    lon, lat = _transformer(crs).transform(x, y)
+    return np.asarray(lon, dtype=np.float64), np.asarray(lat, dtype=np.float64)
+
+
+def reproject(x, y, crs, chunksize=TAILLE_BLOC_PROJECTION, executor=None):
+    """
+    Reprojette des tableaux de coordonnées ``crs`` en (lon, lat) EPSG:4326.
+
+    :param chunksize: nombre de points par appel pyproj
+    :param executor: pool optionnel (concurrent.futures) entre lequel les
+        blocs sont répartis ; sans pool, ou pour moins de BLOCS_MIN_POOL
+        blocs, la transformation a lieu dans le processus courant
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if is_target_crs(crs):
+        return x, y
+    debuts = range(0, len(x), chunksize)
+    blocs_x = (x[a:a + chunksize] for a in debuts)
+    blocs_y = (y[a:a + chunksize] for a in debuts)
+    if executor is None or len(x) < BLOCS_MIN_POOL * chunksize:
+        blocs = map(_projeter_bloc, repeat(crs), blocs_x, blocs_y)
+    else:
+        blocs = executor.map(_projeter_bloc, repeat(crs), blocs_x, blocs_y)
+    lon, lat = np.empty_like(x), np.empty_like(y)
+    for a, (bloc_lon, bloc_lat) in zip(debuts, blocs):
+        lon[a:a + len(bloc_lon)] = bloc_lon
+        lat[a:a + len(bloc_lat)] = bloc_lat
+    return lon, lat
+
+
+def column_transform(crs, x_col, y_col, chunksize=TAILLE_BLOC_PROJECTION, executor=None):
+    """
+    Fonction ``transform(df) -> (lon, lat)`` pour read_mission et load_mission,
+    reprojetant les colonnes ``x_col`` et ``y_col`` (voir reproject).
+
+    Retourne None si ``crs`` est déjà EPSG:4326 : les colonnes sont alors lues telles quelles.
+    """
+    if is_target_crs(crs):
+        return None
+
+    def transform(df):
+        return reproject(df[x_col].to_numpy(dtype=np.float64), df[y_col].to_numpy(dtype=np.float64),
+                         crs, chunksize, executor)
+    return transform
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Simulateur de télémétrie : rejoue un CSV de mission vers un récepteur NAIAD
+
+Exemple (depuis la racine du dépôt) :
+
+    python -m naiad.replay testfile.csv --speed 600 --port 5005
+    python -m naiad.replay testfile.csv --speed 0 --repeat 1000 --protocol tcp
+
+Les lignes sont envoyées dans l'ordre chronologique, espacées selon leurs
+horodatages divisés par ``--speed`` ; ``--speed 0`` envoie aussi vite que
+possible pour mesurer le débit soutenu. Le débit émis est affiché en fin
+d'exécution.
+"""
+
+import argparse
+import json
+import socket
+import sys
+import time
+
+import pandas as pd
+
+from .telemetry import CHAMPS_DEFAUT
+
+
+def load_messages(path, fmt="csv", fields=None):
+    """Messages (octets, instant en s) du CSV, triés par instant."""
+    fields = fields or CHAMPS_DEFAUT
+    df = pd.read_csv(path)
+    df["_t"] = pd.to_datetime(df["timestamp"])
+    df = df.sort_values("_t", kind="mergesort")
+    secondes = (df["_t"] - df["_t"].iloc[0]).dt.total_seconds().tolist()
+    lignes = df[fields].astype(str)
+    if fmt == "json":
+        messages = [json.dumps(rec).encode("utf-8") + b"\n" for rec in lignes.to_dict("records")]
+    else:
+        messages = [(",".join(rec) + "\n").encode("utf-8") for rec in lignes.itertuples(index=False)]
+    return list(zip(messages, secondes))
+
+
+def replay(messages, host="127.0.0.1", port=5005, protocol="udp", speed=1.0, repeat=1):
+    """Envoie les messages et retourne (nombre envoyé, durée en s)."""
+    if protocol == "tcp":
+        sock = socket.create_connection((host, port))
+        envoyer = sock.sendall
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        envoyer = lambda data: sock.sendto(data, (host, port))  # noqa: E731
+
+    envoyes = 0
+    debut = time.monotonic()
+    try:
+        for _ in range(repeat):
+            depart = time.monotonic()
+            for message, t in messages:
+                if speed > 0:
+                    attente = depart + t / speed - time.monotonic()
+                    if attente > 0:
+                        time.sleep(attente)
+                envoyer(message)
+                envoyes += 1
+    finally:
+        sock.close()
+    return envoyes, time.monotonic() - debut
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejoue un CSV NAIAD vers un récepteur UDP/TCP.")
+    parser.add_argument("csv", help="fichier de mission (drone_id,longitude,latitude,depth,timestamp)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--protocol", choices=("udp", "tcp"), default="udp")
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="facteur d'accélération (0 = aussi vite que possible)")
+    parser.add_argument("--repeat", type=int, default=1, help="nombre de passes sur le fichier")
+    args = parser.parse_args(argv)
+
+    messages = load_messages(args.csv, args.format)
+    envoyes, duree = replay(messages, args.host, args.port, args.protocol, args.speed, args.repeat)
+    print(f"{envoyes} messages envoyés en {duree:.2f} s ({envoyes / max(duree, 1e-9):.0f} msg/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Index des débuts de ligne d'un fichier CSV
+
+RowIndex parcourt le fichier une seule fois par blocs et note la position (en
+octets) du début de chaque ligne de données. Une ligne quelconque se lit
+ensuite par un simple ``seek``, sans charger le fichier : c'est la base de
+l'aperçu paginé du tableau.
+
+Le tri (``sort_order``, colonne lue seule avec pandas) et le filtrage
+(``matching_rows``, recherche dans le texte brut des lignes) renvoient des
+numéros de lignes. Comme la construction de l'index, ils sont prévus pour
+tourner hors du thread de l'interface.
+
+Les champs entre guillemets contenant un saut de ligne ne sont pas gérés
+(une ligne de fichier = un enregistrement).
+"""
+
+import csv
+import io
+
+import numpy as np
+import pandas as pd
+
+# Taille des blocs lus lors de la construction de l'index (octets)
+TAILLE_LECTURE = 16 * 1024 ** 2
+
+
+class RowIndex:
+    """Positions des lignes de données d'un CSV, lues à la demande."""
+
+    def __init__(self, path, encoding="utf-8"):
+        self.path = path
+        self.encoding = encoding
+        morceaux = []
+        position = 0
+        with open(path, "rb") as f:
+            entete = f.readline()
+            position = len(entete)
+            morceaux.append(np.array([position], dtype=np.int64))
+            while True:
+                bloc = f.read(TAILLE_LECTURE)
+                if not bloc:
+                    break
+                fins = np.flatnonzero(np.frombuffer(bloc, dtype=np.uint8) == ord("\n"))
+                morceaux.append(fins.astype(np.int64) + position + 1)
+                position += len(bloc)
+        debuts = np.concatenate(morceaux)
+        # Dernière ligne sans saut de ligne final, ou position de fin de fichier
+        if debuts[-1] < position:
+            debuts = np.append(debuts, position)
+        self.offsets = debuts
+        self.header = next(csv.reader([entete.decode(encoding)]))
+        self._fichier = None
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def close(self):
+        if self._fichier is not None:
+            self._fichier.close()
+            self._fichier = None
+
+    def _lire(self, a, b):
+        if self._fichier is None:
+            self._fichier = open(self.path, "rb")
+        self._fichier.seek(self.offsets[a])
+        return self._fichier.read(self.offsets[b] - self.offsets[a]).decode(self.encoding)
+
+    def rows(self, indices):
+        """Champs des lignes ``indices`` (numéros de lignes de données), dans cet ordre."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if not len(indices):
+            return []
+        a, b = int(indices.min()), int(indices.max()) + 1
+        if b - a == len(indices):
+            # Lignes contiguës : une seule lecture pour tout le bloc
+            lignes = list(csv.reader(io.StringIO(self._lire(a, b))))
+            return [lignes[i - a] for i in indices.tolist()]
+        return [next(csv.reader([self._lire(i, i + 1)])) for i in indices.tolist()]
+
+    def sort_order(self, column, descending=False):
+        """Numéros de lignes triés selon la colonne ``column`` (tri stable, y compris décroissant)."""
+        # Une valeur par ligne indexée : lignes vides gardées (NaN), aucune ligne écartée
+        valeurs = pd.read_csv(self.path, usecols=[self.header[column]], encoding=self.encoding,
+                              skip_blank_lines=False, on_bad_lines="error").iloc[:, 0]
+        if len(valeurs) != len(self):
+            raise ValueError(f"{self.path} : {len(valeurs)} valeurs lues pour {len(self)} lignes indexées")
+        if valeurs.dtype.kind in "biuf":
+            cles = valeurs.to_numpy()
+        else:
+            # Chaînes de largeur fixe : tri numpy bien plus rapide que sur des objets
+            cles = np.array(valeurs.fillna("").astype(str).tolist())
+        if descending:
+            # Tri croissant du tableau retourné : les ex aequo gardent l'ordre du fichier
+            return len(cles) - 1 - np.argsort(cles[::-1], kind="stable")[::-1]
+        return np.argsort(cles, kind="stable")
+
+    def matching_rows(self, text, rows_per_block=500_000):
+        """Numéros des lignes dont le texte contient ``text`` (sans casse)."""
+        trouvees = []
+        with open(self.path, "rb") as f:
+            for a in range(0, len(self), rows_per_block):
+                b = min(a + rows_per_block, len(self))
+                f.seek(self.offsets[a])
+                lignes = f.read(self.offsets[b] - self.offsets[a]).decode(self.encoding).split("\n")[:b - a]
+                masque = pd.Series(lignes).str.contains(text, case=False, regex=False).to_numpy()
+                trouvees.append(np.flatnonzero(masque) + a)
+        return np.concatenate(trouvees) if trouvees else np.empty(0, dtype=np.int64)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Simplification multi-résolution des trajectoires (niveaux de détail)
+
+Douglas–Peucker avec distance euclidienne synchronisée (SED) : l'écart d'un
+sommet est mesuré par rapport à la position interpolée *au même instant* sur
+le segment simplifié, en 3D (profondeur convertie en degrés). Un sommet qui
+marque un changement de vitesse, de cap ou de profondeur est donc conservé
+même s'il est aligné en plan.
+
+Chaque niveau correspond à une plage d'échelles de la carte ; sa tolérance
+vaut un demi-pixel à l'échelle la plus détaillée de la plage.
+"""
+
+import numpy as np
+
+# Seuils d'échelle (dénominateurs) séparant les niveaux de détail :
+# détail complet en dessous du premier seuil, puis un niveau simplifié par seuil
+ECHELLES_LOD = (25_000, 250_000, 2_500_000)
+# Taille d'un pixel écran selon la convention OGC (m)
+TAILLE_PIXEL = 0.00028
+# Mètres par degré (approximation à l'équateur)
+METRES_PAR_DEGRE = 111_320.0
+
+
+def tolerance_pour_echelle(echelle):
+    """Tolérance (degrés) d'un demi-pixel à l'échelle 1:``echelle``."""
+    return echelle * TAILLE_PIXEL / 2 / METRES_PAR_DEGRE
+
+
+def simplify(lon, lat, depth, times, tolerance, depth_scale=1 / METRES_PAR_DEGRE):
+    """
+    Indices (croissants) des sommets conservés par Douglas–Peucker SED.
+
+    :param tolerance: écart maximal toléré, en degrés
+    :param depth_scale: conversion de la profondeur (m) en degrés
+    """
+    n = len(lon)
+    if n <= 2 or tolerance <= 0:
+        return np.arange(n)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    z = np.asarray(depth, dtype=np.float64) * depth_scale
+    t = np.asarray(times, dtype=np.float64)
+    seuil = tolerance * tolerance
+
+    garder = np.zeros(n, dtype=bool)
+    garder[0] = garder[-1] = True
+    pile = [(0, n - 1)]
+    while pile:
+        a, b = pile.pop()
+        if b - a < 2:
+            continue
+        interieur = slice(a + 1, b)
+        duree = t[b] - t[a]
+        if duree > 0:
+            f = (t[interieur] - t[a]) / duree
+        else:
+            f = np.arange(1, b - a) / (b - a)
+        ecart = ((lon[interieur] - (lon[a] + f * (lon[b] - lon[a]))) ** 2
+                 + (lat[interieur] - (lat[a] + f * (lat[b] - lat[a]))) ** 2
+                 + (z[interieur] - (z[a] + f * (z[b] - z[a]))) ** 2)
+        i = int(np.argmax(ecart))
+        if ecart[i] > seuil:
+            k = a + 1 + i
+            garder[k] = True
+            pile.append((a, k))
+            pile.append((k, b))
+    return np.flatnonzero(garder)
+
+
+def niveaux(lon, lat, depth, times, echelles=ECHELLES_LOD):
+    """Indices conservés pour chaque seuil d'échelle de ``echelles`` (du plus détaillé au plus grossier)."""
+    resultats = []
+    indices = np.arange(len(lon))
+    for echelle in echelles:
+        # Chaque niveau simplifie le précédent : les niveaux sont emboîtés
+        garder = simplify(lon[indices], lat[indices], depth[indices], times[indices],
+                          tolerance_pour_echelle(echelle))
+        indices = indices[garder]
+        resultats.append(indices)
+    return resultats
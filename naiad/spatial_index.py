@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Index spatial des segments de trajectoires (grille uniforme)
+
+Les segments (paires de points consécutifs d'un drone) d'un TrajectoryStore
+sont rangés dans une grille régulière : chaque segment est inscrit dans
+toutes les cellules que couvre son emprise. Les cellules sont stockées en
+tableaux triés (clé de cellule -> segments), si bien qu'une requête ne lit
+que les cellules voisines du point ou de l'emprise demandés.
+
+Un drone à position unique est indexé comme un segment de longueur nulle.
+Un segment dont l'emprise couvrirait plus de CELLULES_PAR_SEGMENT cellules
+(saut entre deux sessions, position aberrante) n'est pas inscrit dans la
+grille : il est gardé à part et testé par toutes les requêtes, ce qui borne
+la taille de l'index à CELLULES_PAR_SEGMENT entrées par segment.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Résultat d'une requête : drone, instant (ns) et profondeur au point trouvé
+SegmentHit = namedtuple("SegmentHit", ["track_id", "time", "depth", "distance"])
+
+# Nombre maximal de cellules par côté de la grille
+CELLULES_MAX = 1024
+# Nombre maximal de cellules dans lesquelles un segment est inscrit
+CELLULES_PAR_SEGMENT = 64
+
+
+class SegmentIndex:
+    """Grille uniforme sur les segments d'un TrajectoryStore (coordonnées lon/lat)."""
+
+    def __init__(self, store, cell_size=None):
+        self.store = store
+        n = store.n_points
+        longueurs = np.diff(store.offsets)
+
+        # Segments i -> i+1 à l'intérieur de chaque drone, points isolés -> i -> i
+        debut = np.arange(max(n - 1, 0))
+        garder = np.ones(len(debut), dtype=bool)
+        # Dernier point de chaque drone non vide (un drone vide n'a pas de fin)
+        fins = store.offsets[1:][longueurs > 0] - 1
+        garder[fins[fins < len(debut)]] = False
+        debut = debut[garder]
+        isoles = store.offsets[:-1][longueurs == 1]
+        self.debut = np.concatenate([debut, isoles]).astype(np.int64)
+        self.fin = np.concatenate([debut + 1, isoles]).astype(np.int64)
+        self.piste = np.repeat(np.arange(len(longueurs)), longueurs)[self.debut]
+
+        x0, y0 = store.lon[self.debut], store.lat[self.debut]
+        x1, y1 = store.lon[self.fin], store.lat[self.fin]
+        if not len(self.debut):
+            self.xmin = self.ymin = 0.0
+            self.taille = 1.0
+            self.nx = self.ny = 1
+            self._cles = np.empty(0, dtype=np.int64)
+            self._segments = np.empty(0, dtype=np.int64)
+            self._grands = np.empty(0, dtype=np.int64)
+            return
+
+        self.xmin, self.ymin = float(min(x0.min(), x1.min())), float(min(y0.min(), y1.min()))
+        largeur = float(max(x0.max(), x1.max())) - self.xmin
+        hauteur = float(max(y0.max(), y1.max())) - self.ymin
+        if cell_size is None:
+            # Cellule de l'ordre d'un segment typique, grille bornée à CELLULES_MAX par côté
+            cell_size = float(np.median(np.maximum(np.abs(x1 - x0), np.abs(y1 - y0))))
+        self.taille = max(cell_size, largeur / CELLULES_MAX, hauteur / CELLULES_MAX, 1e-12)
+        self.nx = int(largeur // self.taille) + 1
+        self.ny = int(hauteur // self.taille) + 1
+
+        # Plage de cellules couverte par l'emprise de chaque segment
+        cx0, cx1 = self._colonne(np.minimum(x0, x1)), self._colonne(np.maximum(x0, x1))
+        cy0, cy1 = self._ligne(np.minimum(y0, y1)), self._ligne(np.maximum(y0, y1))
+        larg = cx1 - cx0 + 1
+        nombre = larg * (cy1 - cy0 + 1)
+        # Segments trop étendus : hors grille, candidats de toute requête
+        grands = nombre > CELLULES_PAR_SEGMENT
+        self._grands = np.flatnonzero(grands)
+        nombre = np.where(grands, 0, nombre)
+        segments = np.repeat(np.arange(len(self.debut)), nombre)
+        local = np.arange(len(segments)) - np.repeat(np.cumsum(nombre) - nombre, nombre)
+        cles = (cy0[segments] + local // larg[segments]) * self.nx + cx0[segments] + local % larg[segments]
+        ordre = np.argsort(cles, kind="stable")
+        self._cles = cles[ordre]
+        self._segments = segments[ordre]
+
+    def __len__(self):
+        return len(self.debut)
+
+    def _colonne(self, x):
+        return np.clip(((np.asarray(x) - self.xmin) // self.taille).astype(np.int64), 0, self.nx - 1)
+
+    def _ligne(self, y):
+        return np.clip(((np.asarray(y) - self.ymin) // self.taille).astype(np.int64), 0, self.ny - 1)
+
+    def _candidats(self, xmin, ymin, xmax, ymax):
+        """Segments inscrits dans les cellules qui recoupent l'emprise et segments hors grille (sans doublons)."""
+        if not len(self._cles):
+            return self._grands
+        cx0, cx1 = int(self._colonne(xmin)), int(self._colonne(xmax))
+        morceaux = [self._grands]
+        for cy in range(int(self._ligne(ymin)), int(self._ligne(ymax)) + 1):
+            a = np.searchsorted(self._cles, cy * self.nx + cx0, side="left")
+            b = np.searchsorted(self._cles, cy * self.nx + cx1, side="right")
+            morceaux.append(self._segments[a:b])
+        return np.unique(np.concatenate(morceaux))
+
+    def _filtrer(self, segments, before, tracks):
+        if before is not None:
+            segments = segments[self.store.times[self.fin[segments]] <= before]
+        if tracks is not None:
+            permises = np.array([track_id in tracks for track_id in self.store.ids], dtype=bool)
+            segments = segments[permises[self.piste[segments]]]
+        return segments
+
+    def query_bbox(self, xmin, ymin, xmax, ymax, before=None, tracks=None):
+        """
+        Segments dont l'emprise recoupe [xmin, xmax] x [ymin, ymax], en SegmentHit
+        (instant et profondeur du début de segment).
+
+        ``before`` (ns) ne garde que les segments entièrement parcourus à cet
+        instant ; ``tracks`` restreint la recherche à un ensemble
+        d'identifiants de drones.
+        """
+        segments = self._filtrer(self._candidats(xmin, ymin, xmax, ymax), before, tracks)
+        lon, lat = self.store.lon, self.store.lat
+        d, f = self.debut[segments], self.fin[segments]
+        recoupe = ((np.minimum(lon[d], lon[f]) <= xmax) & (np.maximum(lon[d], lon[f]) >= xmin)
+                   & (np.minimum(lat[d], lat[f]) <= ymax) & (np.maximum(lat[d], lat[f]) >= ymin))
+        segments = segments[recoupe]
+        ids = self.store.ids
+        return [SegmentHit(ids[p], int(t), float(z), 0.0) for p, t, z in zip(
+            self.piste[segments].tolist(), self.store.times[self.debut[segments]].tolist(),
+            self.store.depth[self.debut[segments]].tolist())]
+
+    def nearest(self, x, y, max_distance=np.inf, before=None, tracks=None):
+        """
+        Segment le plus proche de (x, y) à moins de ``max_distance`` (degrés), ou None.
+
+        L'instant et la profondeur sont interpolés au point du segment le plus
+        proche. ``before`` et ``tracks`` : voir query_bbox.
+        """
+        if not len(self):
+            return None
+        etendue = max(self.nx, self.ny) * self.taille
+        rayon = min(self.taille, max_distance)
+        while True:
+            segments = self._filtrer(self._candidats(x - rayon, y - rayon, x + rayon, y + rayon),
+                                     before, tracks)
+            if len(segments):
+                distances, f = self._distances(segments, x, y)
+                k = int(np.argmin(distances))
+                # Tout segment plus proche que le rayon recoupe forcément la fenêtre
+                if distances[k] <= rayon:
+                    if distances[k] > max_distance:
+                        return None
+                    return self._hit(segments[k], f[k], distances[k])
+            if rayon >= max_distance or rayon > etendue + abs(x - self.xmin) + abs(y - self.ymin):
+                return None
+            rayon = min(rayon * 2, max_distance)
+
+    def _distances(self, segments, x, y):
+        d, f = self.debut[segments], self.fin[segments]
+        x0, y0 = self.store.lon[d], self.store.lat[d]
+        dx, dy = self.store.lon[f] - x0, self.store.lat[f] - y0
+        norme = dx * dx + dy * dy
+        with np.errstate(invalid="ignore", divide="ignore"):
+            u = np.where(norme > 0, ((x - x0) * dx + (y - y0) * dy) / norme, 0.0)
+        u = np.clip(u, 0.0, 1.0)
+        return np.hypot(x0 + u * dx - x, y0 + u * dy - y), u
+
+    def _hit(self, segment, u, distance):
+        d, f = self.debut[segment], self.fin[segment]
+        times, depth = self.store.times, self.store.depth
+        t = int(times[d] + round(u * (times[f] - times[d])))
+        z = float(depth[d] + u * (depth[f] - depth[d]))
+        return SegmentHit(self.store.ids[self.piste[segment]], t, z, float(distance))
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Modèle de table paginé pour l'aperçu des fichiers CSV
+
+ModeleTableCsv expose un RowIndex à une QTableView : seules les lignes
+visibles sont lues, par blocs mis en cache (LRU). Le tri et le filtrage sont
+calculés dans des tâches d'arrière-plan et ne remplacent, une fois terminés,
+que la correspondance ligne affichée -> ligne du fichier.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+from qgis.core import QgsApplication
+from qgis.PyQt.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from .tasks import TacheCalcul
+
+
+class ModeleTableCsv(QAbstractTableModel):
+    """Lignes d'un CSV lues à la demande via un RowIndex."""
+
+    # Lignes lues ensemble lors d'un accès à une ligne absente du cache
+    LIGNES_PAR_BLOC = 256
+    # Nombre de blocs conservés en mémoire
+    BLOCS_EN_CACHE = 64
+
+    def __init__(self, index, parent=None, on_error=None):
+        super().__init__(parent)
+        self.index = index
+        self.on_error = on_error
+        self.ordre = None   # Permutation issue du dernier tri, ou None
+        self.filtre = None  # Lignes retenues par le dernier filtre, ou None
+        self.vue = None     # Lignes du fichier affichées, dans l'ordre (None : toutes)
+        self._blocs = OrderedDict()
+        self._taches = []
+        self._generation = {"tri": 0, "filtre": 0}
+
+    # --- Interface QAbstractTableModel ----------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.index) if self.vue is None else len(self.vue)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.index.header)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        ligne = self._ligne(index.row())
+        return ligne[index.column()] if index.column() < len(ligne) else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.index.header[section]
+        # Numéro de la ligne dans le fichier, conservé après tri et filtrage
+        return str(int(self._numeros(section, section + 1)[0]) + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0:
+            self.ordre = None
+            self._appliquer()
+            return
+        descendant = order == Qt.DescendingOrder
+        self._calculer("tri", f"NAIAD - tri par {self.index.header[column]}",
+                       lambda: self.index.sort_order(column, descendant))
+
+    # --- Filtrage ---------------------------------------------------------------
+
+    def filtrer(self, texte):
+        """Ne garde que les lignes contenant ``texte`` (chaîne vide : toutes les lignes)."""
+        if not texte:
+            self._generation["filtre"] += 1
+            self.filtre = None
+            self._appliquer()
+            return
+        self._calculer("filtre", f"NAIAD - filtre « {texte} »", lambda: self.index.matching_rows(texte))
+
+    # --- Interne -------------------------------------------------------------------
+
+    def _calculer(self, nature, description, fonction):
+        # Seul le résultat de la demande la plus récente de chaque nature est appliqué
+        self._generation[nature] += 1
+        generation = self._generation[nature]
+
+        def termine(tache):
+            if generation == self._generation[nature]:
+                setattr(self, "ordre" if nature == "tri" else "filtre", tache.resultat)
+                self._appliquer()
+
+        tache = TacheCalcul(description, fonction, termine, self.on_error)
+        self._taches.append(tache)
+        fin = lambda: self._taches.remove(tache) if tache in self._taches else None  # noqa: E731
+        tache.taskCompleted.connect(fin)
+        tache.taskTerminated.connect(fin)
+        QgsApplication.taskManager().addTask(tache)
+
+    def _appliquer(self):
+        self.beginResetModel()
+        if self.filtre is None:
+            self.vue = self.ordre
+        elif self.ordre is None:
+            self.vue = self.filtre
+        else:
+            retenues = np.zeros(len(self.index), dtype=bool)
+            retenues[self.filtre] = True
+            self.vue = self.ordre[retenues[self.ordre]]
+        self._blocs.clear()
+        self.endResetModel()
+
+    def _numeros(self, a, b):
+        return np.arange(a, b) if self.vue is None else self.vue[a:b]
+
+    def _ligne(self, row):
+        numero, decalage = divmod(row, self.LIGNES_PAR_BLOC)
+        bloc = self._blocs.get(numero)
+        if bloc is None:
+            a = numero * self.LIGNES_PAR_BLOC
+            bloc = self.index.rows(self._numeros(a, min(a + self.LIGNES_PAR_BLOC, self.rowCount())))
+            self._blocs[numero] = bloc
+            if len(self._blocs) > self.BLOCS_EN_CACHE:
+                self._blocs.popitem(last=False)
+        else:
+            self._blocs.move_to_end(numero)
+        return bloc[decalage]
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Tâches d'arrière-plan NAIAD (QgsTask)
+
+Le chargement des missions, leur interpolation et la construction des
+trajectoires s'exécutent dans le gestionnaire de tâches de QGIS : l'interface
+reste réactive, l'avancement est affiché dans la barre de messages et chaque
+tâche peut être annulée. Plusieurs missions peuvent être traitées en
+parallèle, une tâche par mission. Le fichier est d'abord validé dans la
+tâche (attribut ``rapport``, un RapportValidation) : une colonne manquante
+fait échouer la tâche, les autres problèmes sont laissés à l'appelant.
+
+Les couches créées dans ``run`` (thread de travail) sont rattachées au thread
+principal avant d'être ajoutées au projet dans ``finished``.
+
+Si un GeoPackage est demandé, les couches calculées y sont écrites puis
+rouvertes depuis le fichier ; une session ultérieure les rouvre directement
+tant que le CSV n'a pas été modifié et que les paramètres de calcul
+(colonnes lues, politique d'échantillonnage) sont les mêmes.
+"""
+
+import os
+
+import numpy as np
+from qgis.core import QgsApplication, QgsTask, QgsVectorLayer, QgsWkbTypes, Qgis, NULL
+from qgis.PyQt.QtCore import Qt, QVariant
+from qgis.PyQt.QtWidgets import QProgressBar, QPushButton
+
+from .geopackage import GeoPackageWriter, geometry_blob, is_current, iso_datetimes, point_blobs
+from .ingest import COLONNES_DEFAUT, OperationAnnulee, load_mission
+from .interpolation import SamplingPolicy
+from .simplification import ECHELLES_LOD
+from .spatial_index import SegmentIndex
+from .temporal import activer_temporel, creer_couche_segments
+from .validation import validate_mission
+
+# Index attributaires des tables de trajectoires et de segments du GeoPackage
+INDEX_LIGNES = ("drone_id", "start", "end")
+# Types SQL des champs QGIS écrits dans le GeoPackage
+TYPES_SQL = {QVariant.String: "TEXT", QVariant.DateTime: "DATETIME", QVariant.Double: "DOUBLE",
+             QVariant.Int: "INTEGER", QVariant.LongLong: "INTEGER"}
+TABLES_TRAJECTOIRES = ["points", "trajectoires"] + [f"trajectoires_{e}" for e in ECHELLES_LOD]
+
+
+class _Etape:
+    """Objet de suivi qui ramène l'avancement d'une étape dans [debut, fin] de la tâche."""
+
+    def __init__(self, tache, debut, fin):
+        self.tache = tache
+        self.debut = debut
+        self.fin = fin
+
+    def isCanceled(self):
+        return self.tache.isCanceled()
+
+    def setProgress(self, pourcentage):
+        self.tache.setProgress(self.debut + (self.fin - self.debut) * pourcentage / 100.0)
+
+
+def _valider(csv_path, columns):
+    # Rapport de validation ; sans les colonnes attendues il n'y a rien à charger
+    rapport = validate_mission(csv_path, columns)
+    schema = [p for p in rapport.problemes if p.code == "colonnes"]
+    if schema:
+        raise ValueError(schema[0].message)
+    return rapport
+
+
+class _TacheNAIAD(QgsTask):
+    """Base commune : capture de l'erreur dans ``run`` et rappels dans ``finished``."""
+
+    def __init__(self, description, on_success, on_error=None):
+        super().__init__(description, QgsTask.CanCancel)
+        self.on_success = on_success
+        self.on_error = on_error
+        self.exception = None
+
+    def run(self):
+        try:
+            self.executer()
+            return not self.isCanceled()
+        except OperationAnnulee:
+            return False
+        except Exception as e:
+            self.exception = e
+            return False
+
+    def executer(self):
+        raise NotImplementedError
+
+    def finished(self, result):
+        if result:
+            # Exécuté dans le thread de l'interface : une erreur ne doit pas remonter jusqu'à QGIS
+            try:
+                self.on_success(self)
+            except Exception as e:
+                self.exception = e
+        if self.exception is not None and self.on_error is not None:
+            self.on_error(self.exception)
+
+
+class TacheTrajectoires(_TacheNAIAD):
+    """
+    Couche de points (texte délimité), trajectoires et leurs niveaux simplifiés d'un CSV.
+
+    Le CSV n'est analysé qu'une fois, par load_mission : trajectoires, niveaux
+    et index des segments sont construits depuis le TrajectoryStore ; la
+    couche de points ne sert qu'à l'affichage.
+
+    Avec ``geopackage`` (chemin), les couches sont écrites dans ce fichier et
+    lues depuis lui ; s'il est à jour, elles en sont rouvertes sans calcul.
+    ``columns`` : correspondance des colonnes du CSV (voir load_mission).
+    """
+
+    def __init__(self, csv_path, plugin, on_success, on_error=None, geopackage=None, columns=None):
+        super().__init__(f"NAIAD - trajectoires {os.path.basename(csv_path)}", on_success, on_error)
+        self.csv_path = csv_path
+        self.plugin = plugin
+        self.geopackage = geopackage
+        self.columns = dict(COLONNES_DEFAUT, **(columns or {}))
+        self.rapport = None
+        self.points = None
+        self.lignes = None
+        self.niveaux = []
+        self.index = None
+
+    def parametres(self):
+        """Paramètres de calcul enregistrés avec les tables du GeoPackage."""
+        return {"colonnes": self.columns, "echelles": list(ECHELLES_LOD)}
+
+    def executer(self):
+        self.rapport = _valider(self.csv_path, self.columns)
+        if self.isCanceled():
+            raise OperationAnnulee("Opération annulée")
+        if self.geopackage is not None and is_current(
+                self.geopackage, self.csv_path, TABLES_TRAJECTOIRES, self.parametres()):
+            store = load_mission(self.csv_path, self.columns, feedback=_Etape(self, 0, 90))
+            self.ouvrir_geopackage()
+        else:
+            # Avec un GeoPackage, le calcul occupe la première moitié de l'avancement
+            part = 0.5 if self.geopackage is not None else 1.0
+            # Une seule analyse du CSV (ou lecture du cache) : lignes, niveaux et index en dérivent
+            store = load_mission(self.csv_path, self.columns, feedback=_Etape(self, 0, 60 * part))
+            if self.geopackage is None:
+                # Couche de points pour l'affichage seulement (remplacée par la table du GeoPackage sinon)
+                uri = (f"file:///{self.csv_path}?type=csv&delimiter=,&xField={self.columns['lon']}"
+                       f"&yField={self.columns['lat']}&zField={self.columns['depth']}&crs=EPSG:4326")
+                self.points = QgsVectorLayer(uri, "Points Drone", "delimitedtext")
+                if not self.points.isValid():
+                    raise ValueError("Fichier CSV invalide")
+            self.setProgress(65 * part)
+
+            resume = self.plugin.resume_cinematique(store)
+            self.lignes = self.plugin.couche_lignes(store, resume=resume)
+            self.niveaux = self.plugin.creer_niveaux(
+                store, self.lignes, feedback=_Etape(self, 70 * part, 100 * part), resume=resume)
+            if self.geopackage is not None:
+                self.enregistrer(store)
+                self.ouvrir_geopackage()
+        self.index = SegmentIndex(store)
+
+        thread = QgsApplication.instance().thread()
+        for couche in [self.points, self.lignes] + self.niveaux:
+            couche.moveToThread(thread)
+
+    def enregistrer(self, store):
+        """Écrit points (depuis le store), trajectoires et niveaux dans le GeoPackage."""
+        longueurs = np.diff(store.offsets)
+        ids = np.repeat(np.array([str(i) for i in store.ids], dtype=object), longueurs).tolist()
+        emprises = np.column_stack([store.lon, store.lon, store.lat, store.lat])
+        with GeoPackageWriter(self.geopackage) as ecrivain:
+            ecrivain.write_table(
+                "points", "POINT", [("drone_id", "TEXT"), ("timestamp", "DATETIME"), ("depth", "DOUBLE")],
+                point_blobs(store.lon, store.lat, store.depth), emprises,
+                [ids, iso_datetimes(store.times), store.depth.tolist()],
+                z=True, indexes=("drone_id", "timestamp"), feedback=_Etape(self, 50, 85),
+                parameters=self.parametres())
+            couches = [self.lignes] + self.niveaux
+            for k, (table, couche) in enumerate(zip(TABLES_TRAJECTOIRES[1:], couches)):
+                ecrire_couche(ecrivain, table, couche, INDEX_LIGNES,
+                              feedback=_Etape(self, 85 + 15 * k / len(couches), 85 + 15 * (k + 1) / len(couches)),
+                              parameters=self.parametres())
+
+    def ouvrir_geopackage(self):
+        self.points = ouvrir_couche(self.geopackage, "points", "Points Drone")
+        self.lignes = ouvrir_couche(self.geopackage, "trajectoires", "Trajectoires")
+        self.niveaux = [ouvrir_couche(self.geopackage, table, self.plugin.nom_niveau(echelle))
+                        for table, echelle in zip(TABLES_TRAJECTOIRES[2:], ECHELLES_LOD)]
+        self.plugin.regler_echelles(self.lignes, self.niveaux)
+
+
+class TacheMission(_TacheNAIAD):
+    """
+    Chargement (cache ou ingestion en flux) puis interpolation d'une mission
+    selon ``politique`` (SamplingPolicy, politique par défaut si None).
+
+    Avec ``temporel=True``, construit en plus la couche des segments datés
+    lue par le contrôleur temporel (attribut ``segments``), écrite dans la
+    table ``segments`` de ``geopackage`` si un chemin est fourni.
+    ``columns`` : correspondance des colonnes du CSV (voir load_mission).
+    """
+
+    def __init__(self, csv_path, on_success, on_error=None, temporel=False, geopackage=None, politique=None,
+                 columns=None):
+        super().__init__(f"NAIAD - mission {os.path.basename(csv_path)}", on_success, on_error)
+        self.csv_path = csv_path
+        self.politique = politique or SamplingPolicy()
+        self.columns = dict(COLONNES_DEFAUT, **(columns or {}))
+        self.temporel = temporel
+        self.geopackage = geopackage
+        self.rapport = None
+        self.store = None
+        self.track_paths = None
+        self.segments = None
+        self.index = None
+
+    def parametres(self):
+        """Paramètres de calcul enregistrés avec la table ``segments`` du GeoPackage."""
+        return {"colonnes": self.columns, "politique": vars(self.politique)}
+
+    def executer(self):
+        self.rapport = _valider(self.csv_path, self.columns)
+        if self.isCanceled():
+            raise OperationAnnulee("Opération annulée")
+        self.store = load_mission(self.csv_path, self.columns, feedback=_Etape(self, 0, 80))
+        if self.isCanceled():
+            raise OperationAnnulee("Opération annulée")
+        if not self.store.n_points:
+            raise ValueError(f"Aucune position valide dans {os.path.basename(self.csv_path)}")
+        self.setProgress(80)
+        self.track_paths = self.store.interpolated(self.politique)
+        self.index = SegmentIndex(self.store)
+        if self.temporel:
+            if self.geopackage is None or not is_current(
+                    self.geopackage, self.csv_path, ["segments"], self.parametres()):
+                self.segments = creer_couche_segments(self.track_paths, feedback=_Etape(self, 85, 95))
+            if self.geopackage is not None:
+                if self.segments is not None:
+                    with GeoPackageWriter(self.geopackage) as ecrivain:
+                        ecrire_couche(ecrivain, "segments", self.segments, INDEX_LIGNES,
+                                      feedback=_Etape(self, 95, 100), parameters=self.parametres())
+                self.segments = ouvrir_couche(self.geopackage, "segments", "Segments temporels")
+                activer_temporel(self.segments, self.track_paths.ids)
+            self.segments.moveToThread(QgsApplication.instance().thread())
+        self.setProgress(100)
+
+
+class TacheCalcul(_TacheNAIAD):
+    """Exécute ``fonction()`` hors du thread de l'interface ; le résultat est dans ``resultat``."""
+
+    def __init__(self, description, fonction, on_success, on_error=None):
+        super().__init__(description, on_success, on_error)
+        self.fonction = fonction
+        self.resultat = None
+
+    def executer(self):
+        self.resultat = self.fonction()
+
+
+def _valeur_sql(valeur):
+    # Attribut QGIS -> valeur SQLite (dates en texte ISO 8601 UTC)
+    if valeur is None or valeur == NULL:
+        return None
+    if hasattr(valeur, "toUTC"):
+        return valeur.toUTC().toString(Qt.ISODateWithMs)
+    return valeur
+
+
+def ecrire_couche(ecrivain, table, couche, index=(), feedback=None, parameters=None):
+    """
+    Copie les entités et les champs d'une couche vectorielle dans la table
+    ``table`` d'un GeoPackageWriter (``parameters`` : voir write_table).
+    """
+    champs = [(champ.name(), TYPES_SQL.get(champ.type(), "TEXT")) for champ in couche.fields()]
+    geometries, emprises = [], []
+    valeurs = [[] for _ in champs]
+    for f in couche.getFeatures():
+        geometrie = f.geometry()
+        b = geometrie.boundingBox()
+        emprise = (b.xMinimum(), b.xMaximum(), b.yMinimum(), b.yMaximum())
+        geometries.append(geometry_blob(geometrie.asWkb(), emprise, ecrivain.srs_id))
+        emprises.append(emprise)
+        for colonne, (nom, _) in zip(valeurs, champs):
+            colonne.append(_valeur_sql(f[nom]))
+    type_wkb = couche.wkbType()
+    nom_type = QgsWkbTypes.displayString(QgsWkbTypes.flatType(type_wkb)).upper()
+    ecrivain.write_table(table, nom_type, champs, geometries, emprises, valeurs,
+                         z=QgsWkbTypes.hasZ(type_wkb), indexes=index, feedback=feedback, parameters=parameters)
+
+
+def ouvrir_couche(chemin, table, nom):
+    """Couche OGR sur une table du GeoPackage."""
+    couche = QgsVectorLayer(f"{chemin}|layername={table}", nom, "ogr")
+    if not couche.isValid():
+        raise ValueError(f"Table {table} illisible dans {chemin}")
+    return couche
+
+
+def afficher_progression(iface, tache):
+    """Message avec barre de progression et bouton d'annulation, retiré à la fin de la tâche."""
+    barre_messages = iface.messageBar()
+    message = barre_messages.createMessage("NAIAD", tache.description())
+    barre = QProgressBar()
+    barre.setRange(0, 100)
+    bouton = QPushButton("Annuler")
+    bouton.clicked.connect(tache.cancel)
+    message.layout().addWidget(barre)
+    message.layout().addWidget(bouton)
+    widget = barre_messages.pushWidget(message, Qgis.Info)
+
+    tache.progressChanged.connect(lambda p: barre.setValue(int(p)))
+    tache.taskCompleted.connect(lambda: barre_messages.popWidget(widget))
+    tache.taskTerminated.connect(lambda: barre_messages.popWidget(widget))
+
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Réception de télémétrie en direct sur UDP/TCP
+
+Le récepteur tourne dans une boucle asyncio sur un thread d'arrière-plan et
+se contente d'accumuler les lignes reçues (une position par ligne, au format
+CSV ou JSON). Le thread Qt vide ce tampon à cadence fixe avec ``drain`` :
+toutes les lignes du lot sont analysées ensemble, sans travail par message
+côté interface. Une ligne illisible est écartée et comptée (``rejected``)
+sans faire perdre le reste du lot ; le tampon est borné (``MAX_LIGNES``) et
+les lignes les plus anciennes sont abandonnées (``dropped``) si l'interface
+ne le vide plus.
+
+Format CSV : colonnes dans l'ordre ``fields`` (par défaut
+drone_id,longitude,latitude,depth,timestamp). Format JSON : un objet par
+ligne dont les clés sont ces mêmes noms de colonnes.
+"""
+
+import asyncio
+import csv
+import io
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+from .ingest import COLONNES_DEFAUT, parse_chunk
+
+CHAMPS_DEFAUT = ["drone_id", "longitude", "latitude", "depth", "timestamp"]
+
+
+class _UdpProtocol(asyncio.DatagramProtocol):
+    def __init__(self, receiver):
+        self.receiver = receiver
+
+    def datagram_received(self, data, addr):
+        # Un datagramme peut contenir plusieurs lignes
+        self.receiver.push(data.splitlines())
+
+
+class TelemetryReceiver:
+    """Récepteur UDP/TCP de positions, tamponnées jusqu'au prochain ``drain``."""
+
+    # Taille demandée pour le tampon de réception UDP du noyau (octets)
+    TAMPON_UDP = 8 * 1024 ** 2
+    # Nombre maximal de lignes en attente du prochain ``drain``
+    MAX_LIGNES = 1_000_000
+
+    def __init__(self, host="127.0.0.1", port=5005, udp=True, tcp=True, fields=None, columns=None):
+        self.host = host
+        self.port = port
+        self.udp = udp
+        self.tcp = tcp
+        self.fields = fields or CHAMPS_DEFAUT
+        self.columns = columns or COLONNES_DEFAUT
+        self._lignes = deque(maxlen=self.MAX_LIGNES)
+        self._clients = set()
+        self._verrou = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._pret = threading.Event()
+        self._erreur = None
+        # Statistiques de débit
+        self.received = 0
+        self.rejected = 0
+        self.dropped = 0
+        self._debut = None
+
+    # --- Thread de réception -------------------------------------------------
+
+    def push(self, lignes):
+        lignes = [l for l in lignes if l.strip()]
+        with self._verrou:
+            # Lignes les plus anciennes évincées par la deque bornée
+            self.dropped += max(len(self._lignes) + len(lignes) - self.MAX_LIGNES, 0)
+            self._lignes.extend(lignes)
+
+    async def _client_tcp(self, reader, writer):
+        tache = asyncio.current_task()
+        self._clients.add(tache)
+        try:
+            while True:
+                ligne = await reader.readline()
+                if not ligne:
+                    break
+                self.push([ligne])
+        except asyncio.CancelledError:
+            # Arrêt du récepteur : fin normale de la connexion
+            pass
+        finally:
+            self._clients.discard(tache)
+            writer.close()
+
+    async def _demarrer_serveurs(self):
+        serveurs = []
+        if self.udp:
+            # Tampon noyau élargi pour absorber les rafales entre deux passages de la boucle
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.TAMPON_UDP)
+            sock.bind((self.host, self.port))
+            transport, _ = await self._loop.create_datagram_endpoint(
+                lambda: _UdpProtocol(self), sock=sock)
+            serveurs.append(transport)
+        if self.tcp:
+            serveurs.append(await asyncio.start_server(self._client_tcp, self.host, self.port))
+        return serveurs
+
+    def _executer(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            serveurs = self._loop.run_until_complete(self._demarrer_serveurs())
+        except OSError as e:
+            self._erreur = e
+            self._pret.set()
+            self._loop.close()
+            return
+        self._pret.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            for serveur in serveurs:
+                serveur.close()
+            # Connexions TCP encore ouvertes : leurs tâches sont annulées et attendues
+            clients = list(self._clients)
+            for tache in clients:
+                tache.cancel()
+            self._loop.run_until_complete(asyncio.gather(*clients, return_exceptions=True))
+            self._loop.run_until_complete(asyncio.sleep(0))
+            self._loop.close()
+
+    # --- Interface (thread Qt) -------------------------------------------------
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Démarre la réception ; lève OSError si le port n'est pas disponible."""
+        self._pret.clear()
+        self._erreur = None
+        self._thread = threading.Thread(target=self._executer, name="naiad-telemetrie", daemon=True)
+        self._thread.start()
+        self._pret.wait()
+        if self._erreur is not None:
+            self._thread = None
+            raise self._erreur
+        self.received = self.rejected = self.dropped = 0
+        self._debut = time.monotonic()
+
+    def stop(self):
+        if self.running:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._thread = None
+
+    @property
+    def rate(self):
+        """Débit moyen reçu depuis le démarrage (messages par seconde)."""
+        if self._debut is None:
+            return 0.0
+        return self.received / max(time.monotonic() - self._debut, 1e-9)
+
+    def _objets_json(self, lignes):
+        objets = []
+        for ligne in lignes:
+            try:
+                objet = json.loads(ligne)
+            except ValueError:
+                continue
+            if isinstance(objet, dict):
+                objets.append(objet)
+        return objets
+
+    def drain(self):
+        """
+        TrajectoryStore des positions reçues depuis le dernier appel, ou None.
+
+        Les lignes illisibles (JSON invalide, nombre de champs CSV incorrect,
+        valeurs écartées par parse_chunk) sont ignorées et comptées dans ``rejected``.
+        """
+        with self._verrou:
+            lignes, self._lignes = self._lignes, deque(maxlen=self.MAX_LIGNES)
+        if not lignes:
+            return None
+        self.received += len(lignes)
+
+        blocs = []
+        json_lignes = [l for l in lignes if l.lstrip().startswith(b"{")]
+        if json_lignes:
+            blocs.append(pd.DataFrame(self._objets_json(json_lignes), columns=self.fields))
+        if len(json_lignes) < len(lignes):
+            csv_lignes = b"\n".join(l.rstrip(b"\r\n") for l in lignes if not l.lstrip().startswith(b"{"))
+            blocs.append(pd.read_csv(io.BytesIO(csv_lignes), header=None, names=self.fields,
+                                     dtype=object, on_bad_lines="skip", encoding_errors="replace",
+                                     quoting=csv.QUOTE_NONE))
+        store = parse_chunk(pd.concat(blocs, ignore_index=True), self.columns)
+        self.rejected += len(lignes) - store.n_points
+        return store if store.n_points else None
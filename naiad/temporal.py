@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture des missions par le contrôleur temporel de QGIS
+
+Chaque segment interpolé est écrit une seule fois dans une couche mémoire avec
+ses instants de début et de fin ; les propriétés temporelles de la couche
+lient ces attributs au contrôleur temporel du canevas. Chaque image de
+l'animation est alors un simple rendu filtré de la couche, sans écriture
+dans le fournisseur.
+"""
+
+import numpy as np
+from qgis.core import (
+    QgsVectorLayer, QgsField, QgsFeature, QgsGeometry, QgsLineString,
+    QgsRendererCategory, QgsCategorizedSymbolRenderer, QgsLineSymbol,
+    QgsVectorLayerTemporalProperties, QgsTemporalNavigationObject,
+    QgsDateTimeRange, QgsInterval
+)
+from qgis.PyQt.QtCore import QVariant
+
+from .ingest import OperationAnnulee
+from .live_layers import to_qdatetime
+
+# Couleurs attribuées aux drones, dans l'ordre du store
+PALETTE = ["red", "blue", "green", "orange", "purple", "cyan", "magenta"]
+# Cadence de l'animation pilotée par le contrôleur temporel
+IMAGES_PAR_SECONDE = 10
+
+
+def renderer_drones(ids):
+    """Rendu catégorisé par drone_id, une couleur de PALETTE par drone."""
+    categories = []
+    for i, drone_id in enumerate(ids):
+        symbol = QgsLineSymbol.createSimple({"color": PALETTE[i % len(PALETTE)], "width": "1"})
+        categories.append(QgsRendererCategory(str(drone_id), symbol, str(drone_id)))
+    return QgsCategorizedSymbolRenderer("drone_id", categories)
+
+
+def creer_couche_segments(track_paths, nom="Segments temporels", feedback=None):
+    """
+    Couche mémoire d'un segment par paire d'échantillons consécutifs de
+    ``track_paths`` (TrajectoryStore interpolé), avec attributs ``start``/``end``,
+    cinématique du segment et propriétés temporelles actives.
+    """
+    couche = QgsVectorLayer("LineString?crs=EPSG:4326", nom, "memory")
+    provider = couche.dataProvider()
+    provider.addAttributes([
+        QgsField("drone_id", QVariant.String),
+        QgsField("start", QVariant.DateTime),
+        QgsField("end", QVariant.DateTime),
+        QgsField("length_m", QVariant.Double),
+        QgsField("speed", QVariant.Double),
+        QgsField("heading", QVariant.Double),
+        QgsField("vertical_rate", QVariant.Double),
+        QgsField("cumul_m", QVariant.Double)
+    ])
+    couche.updateFields()
+
+    # Cinématique de tous les segments en une passe ; NaN -> NULL
+    cinematique = track_paths.kinematics()
+    colonnes = [np.where(np.isnan(v), None, v).tolist() for v in cinematique]
+
+    for k, (track_id, lon, lat, _, times) in enumerate(track_paths.tracks()):
+        if feedback is not None:
+            if feedback.isCanceled():
+                raise OperationAnnulee("Opération annulée")
+            feedback.setProgress(100 * k / max(len(track_paths), 1))
+        drone = str(track_id)
+        xs, ys = lon.tolist(), lat.tolist()
+        instants = [to_qdatetime(t) for t in times.tolist()]
+        debut = int(track_paths.offsets[k])
+        features = []
+        for i in range(len(xs) - 1):
+            feat = QgsFeature()
+            feat.setGeometry(QgsGeometry(QgsLineString(xs[i:i + 2], ys[i:i + 2])))
+            feat.setAttributes([drone, instants[i], instants[i + 1]]
+                               + [colonne[debut + i] for colonne in colonnes])
+            features.append(feat)
+        provider.addFeatures(features)
+    couche.updateExtents()
+    activer_temporel(couche, track_paths.ids)
+    return couche
+
+
+def activer_temporel(couche, ids):
+    """Lie les champs ``start``/``end`` au contrôleur temporel et colore la couche par drone."""
+    proprietes = couche.temporalProperties()
+    proprietes.setMode(QgsVectorLayerTemporalProperties.ModeFeatureDateTimeStartAndEndFromFields)
+    proprietes.setStartField("start")
+    proprietes.setEndField("end")
+    proprietes.setIsActive(True)
+    couche.setRenderer(renderer_drones(ids))
+
+
+def configurer_controleur(canvas, debut, fin, duree_lecture=60.0):
+    """
+    Règle le contrôleur temporel du canevas sur la mission [debut, fin] (ns) :
+    lecture en ``duree_lecture`` secondes, plage cumulative (traînées) si
+    la version de QGIS le permet.
+    """
+    controleur = canvas.temporalController()
+    controleur.setNavigationMode(QgsTemporalNavigationObject.Animated)
+    controleur.setTemporalExtents(QgsDateTimeRange(to_qdatetime(debut), to_qdatetime(fin)))
+    images = max(int(duree_lecture * IMAGES_PAR_SECONDE), 1)
+    pas = max((fin - debut) / 1e9 / images, 1e-3)
+    controleur.setFrameDuration(QgsInterval(pas))
+    controleur.setFramesPerSecond(IMAGES_PAR_SECONDE)
+    if hasattr(controleur, "setTemporalRangeCumulative"):
+        controleur.setTemporalRangeCumulative(True)
+    controleur.rewindToStart()
+    return controleur
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Index temporel des trajectoires
+
+IntervalIndex est un arbre d'intervalles centré, statique, construit sur des
+tableaux : chaque nœud garde les intervalles qui contiennent son centre,
+triés par début et par fin, si bien qu'une requête ne descend qu'une branche
+et ne lit que les intervalles qu'elle renvoie (O(log n + k)).
+
+TemporalIndex l'applique aux durées de mission des drones d'un
+TrajectoryStore ; à l'intérieur d'un drone, les échantillons étant triés par
+temps, les segments concernés s'obtiennent par recherche dichotomique.
+"""
+
+import numpy as np
+
+
+class IntervalIndex:
+    """Arbre d'intervalles fermés [starts[i], ends[i]] ; les requêtes renvoient des indices i."""
+
+    def __init__(self, starts, ends):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        # Nœuds : centre, fils gauche/droit, intervalles au centre triés par début et par fin
+        self._centres, self._gauche, self._droite = [], [], []
+        self._par_debut, self._debuts, self._par_fin, self._fins = [], [], [], []
+        self._racine = self._construire(np.arange(len(self.starts)))
+
+    def _construire(self, indices):
+        if not len(indices):
+            return -1
+        bornes = np.concatenate([self.starts[indices], self.ends[indices]])
+        centre = int(np.median(bornes))
+        contient = (self.starts[indices] <= centre) & (self.ends[indices] >= centre)
+        ici = indices[contient]
+        par_debut = ici[np.argsort(self.starts[ici], kind="stable")]
+        par_fin = ici[np.argsort(self.ends[ici], kind="stable")]
+
+        noeud = len(self._centres)
+        self._centres.append(centre)
+        self._gauche.append(-1)
+        self._droite.append(-1)
+        self._par_debut.append(par_debut)
+        self._debuts.append(self.starts[par_debut])
+        self._par_fin.append(par_fin)
+        self._fins.append(self.ends[par_fin])
+
+        reste = indices[~contient]
+        self._gauche[noeud] = self._construire(reste[self.ends[reste] < centre])
+        self._droite[noeud] = self._construire(reste[self.starts[reste] > centre])
+        return noeud
+
+    def overlapping(self, t0, t1=None):
+        """Indices (triés) des intervalles qui recoupent [t0, t1] (l'instant t0 si t1 est omis)."""
+        t1 = t0 if t1 is None else t1
+        trouves = []
+        pile = [self._racine]
+        while pile:
+            noeud = pile.pop()
+            if noeud < 0:
+                continue
+            centre = self._centres[noeud]
+            if t1 < centre:
+                # Intervalles du nœud commencés au plus tard en t1
+                k = np.searchsorted(self._debuts[noeud], t1, side="right")
+                trouves.append(self._par_debut[noeud][:k])
+                pile.append(self._gauche[noeud])
+            elif t0 > centre:
+                # Intervalles du nœud terminés au plus tôt en t0
+                k = np.searchsorted(self._fins[noeud], t0, side="left")
+                trouves.append(self._par_fin[noeud][k:])
+                pile.append(self._droite[noeud])
+            else:
+                trouves.append(self._par_debut[noeud])
+                pile.append(self._gauche[noeud])
+                pile.append(self._droite[noeud])
+        if not trouves:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(trouves))
+
+
+class TemporalIndex:
+    """Drones et segments actifs d'un TrajectoryStore à un instant ou sur une période (ns)."""
+
+    def __init__(self, store):
+        self.store = store
+        offsets = store.offsets
+        pleines = np.flatnonzero(np.diff(offsets) > 0)
+        self._pistes = pleines
+        debuts = store.times[offsets[pleines]]
+        fins = store.times[offsets[pleines + 1] - 1]
+        self.spans = IntervalIndex(debuts, fins)
+        # Drones triés par début de mission, pour « drones déjà partis à t »
+        ordre = np.argsort(debuts, kind="stable")
+        self._par_debut = pleines[ordre]
+        self._debuts = debuts[ordre]
+
+    def started(self, t):
+        """Indices (triés) des drones dont la mission a commencé à l'instant t."""
+        k = np.searchsorted(self._debuts, t, side="right")
+        return np.sort(self._par_debut[:k])
+
+    def active(self, t):
+        """
+        Drones en mission à l'instant t et leur segment encadrant.
+
+        Retourne (pistes, indices) : indices de drones et, pour chacun, l'indice
+        local du dernier échantillon antérieur ou égal à t (le segment encadrant
+        va de cet échantillon au suivant).
+        """
+        pistes = self._pistes[self.spans.overlapping(t)]
+        indices = np.empty(len(pistes), dtype=np.int64)
+        for j, k in enumerate(pistes.tolist()):
+            times = self.store.track(k)[3]
+            indices[j] = np.searchsorted(times, t, side="right") - 1
+        return pistes, indices
+
+    def overlapping(self, t0, t1):
+        """
+        Segments qui recoupent [t0, t1], par drone.
+
+        Retourne une liste de (piste, a, b) : les échantillons locaux a..b-1 du
+        drone forment les segments concernés.
+        """
+        resultat = []
+        for k in self._pistes[self.spans.overlapping(t0, t1)].tolist():
+            times = self.store.track(k)[3]
+            a = max(int(np.searchsorted(times, t0, side="right")) - 1, 0)
+            b = min(int(np.searchsorted(times, t1, side="left")) + 1, len(times))
+            resultat.append((k, a, b))
+        return resultat
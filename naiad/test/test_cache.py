@@ -0,0 +1,87 @@
+# coding=utf-8
+"""Mission cache test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from naiad.cache import MissionCache
+from naiad.ingest import load_mission, read_mission
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+class MissionCacheTest(unittest.TestCase):
+    """Test the on-disk mission cache."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.cache = MissionCache(self.directory)
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_round_trip(self):
+        """A cached mission loads back identical to a fresh parse."""
+        fresh = read_mission(CSV)
+        cached = load_mission(CSV, cache=self.cache)
+        again = load_mission(CSV, cache=self.cache)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        for store in (cached, again):
+            self.assertEqual(store.ids, fresh.ids)
+            self.assertEqual(store.times.tolist(), fresh.times.tolist())
+            self.assertEqual(store.lon.tolist(), fresh.lon.tolist())
+            self.assertEqual(str(store.tz), str(fresh.tz))
+
+    def test_oversized_entry_is_reused(self):
+        """A mission larger than the bound is parsed once, then read from the cache."""
+        self.cache.max_bytes = 1
+        load_mission(CSV, cache=self.cache)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        with mock.patch('naiad.ingest.stream_mission', side_effect=AssertionError('CSV re-parsed')):
+            store = load_mission(CSV, cache=self.cache)
+        self.assertEqual(store.times.tolist(), read_mission(CSV).times.tolist())
+
+    def test_key(self):
+        """The key depends on the column mapping and the CRS."""
+        key = self.cache.key(CSV, {'lon': 'x'}, 'EPSG:4326')
+        self.assertEqual(key, self.cache.key(CSV, {'lon': 'x'}, 'EPSG:4326'))
+        self.assertNotEqual(key, self.cache.key(CSV, {'lon': 'x'}, 'EPSG:2154'))
+        self.assertNotEqual(key, self.cache.key(CSV, {'lon': 'y'}, 'EPSG:4326'))
+        self.assertNotEqual(key, self.cache.key(CSV, {'lon': 'x'}, 'EPSG:4326', content_hash=True))
+
+    def test_eviction(self):
+        """Least recently used entries are evicted beyond the size bound."""
+        store = read_mission(CSV)
+        self.cache.max_bytes = 1
+        self.cache.save('a', store)
+        # L'entrée qui vient d'être écrite reste lisible, même au-delà de la borne
+        encore = self.cache.save('b', store)
+        self.assertEqual(os.listdir(self.directory), ['b'])
+        self.assertEqual(encore.times.tolist(), store.times.tolist())
+        self.assertIsNotNone(self.cache.load('b'))
+        self.cache.max_bytes = 10 ** 9
+        self.cache.save('c', store)
+        self.assertIsNotNone(self.cache.load('c'))
+        self.assertIsNone(self.cache.load('a'))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(MissionCacheTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
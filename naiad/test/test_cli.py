@@ -0,0 +1,107 @@
+# coding=utf-8
+"""Batch command-line conversion test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import pandas as pd
+
+from naiad.cli import main, mission_names, mission_tables
+from naiad.ingest import read_mission
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+class CliTest(unittest.TestCase):
+    """Test mission tables and the parallel batch entry point."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.df = pd.read_csv(CSV)
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory)
+
+    def convertir(self, *args):
+        sortie = io.StringIO()
+        with contextlib.redirect_stdout(sortie), contextlib.redirect_stderr(io.StringIO()):
+            code = main(list(args) + ['-o', self.directory, '-j', '2', '--no-cache'])
+        return code, sortie.getvalue()
+
+    def test_mission_tables(self):
+        """One summary row per drone and one segment per consecutive pair of fixes."""
+        tables = mission_tables(read_mission(CSV))
+        comptes = self.df['drone_id'].value_counts().sort_index()
+        self.assertEqual(tables.summary['drone_id'].tolist(), comptes.index.tolist())
+        self.assertEqual(tables.summary['n_points'].tolist(), comptes.tolist())
+        self.assertEqual(len(tables.segments), len(self.df) - len(comptes))
+        premier = tables.segments.iloc[0]
+        self.assertEqual(premier['cumul_m'], 0.0)
+        self.assertAlmostEqual(tables.summary['length_m'].iloc[0],
+                               tables.segments[tables.segments['drone_id'] == 'AUV1']['length_m'].sum())
+
+    def test_gpkg_and_geojson(self):
+        """Each mission gets its GeoPackage and GeoJSON files, plus a global summary."""
+        code, sortie = self.convertir(CSV, '-f', 'gpkg', 'geojson')
+        self.assertEqual(code, 0)
+        self.assertIn('1 mission(s)', sortie)
+        con = sqlite3.connect(os.path.join(self.directory, 'testfile.gpkg'))
+        self.assertEqual(con.execute('SELECT count(*) FROM segments').fetchone()[0], len(self.df) - 4)
+        self.assertEqual(con.execute('SELECT count(*) FROM rtree_trajectoires_geom').fetchone()[0], 4)
+        self.assertEqual(con.execute('SELECT count(*) FROM resume').fetchone()[0], 4)
+        con.close()
+        with open(os.path.join(self.directory, 'testfile_trajectoires.geojson'), encoding='utf-8') as f:
+            collection = json.load(f)
+        auv1 = collection['features'][0]
+        self.assertEqual(auv1['properties']['drone_id'], 'AUV1')
+        self.assertEqual(auv1['properties']['start'], '2024-03-13T10:00:00.000Z')
+        self.assertEqual(auv1['geometry']['coordinates'][0], [-1.93068, 49.48759, -1.0])
+        resume = pd.read_csv(os.path.join(self.directory, 'summary.csv'))
+        self.assertEqual(resume['mission'].unique().tolist(), ['testfile'])
+
+    def test_failure_is_reported(self):
+        """A failing mission does not stop the others and sets the exit code."""
+        code, sortie = self.convertir(CSV, os.path.join(self.directory, 'absente.csv'))
+        self.assertEqual(code, 1)
+        self.assertIn('1 échec(s)', sortie)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, 'testfile.gpkg')))
+
+    def test_homonymous_missions(self):
+        """Missions with the same file name get distinct outputs and summary names."""
+        for dossier in ('a', 'b'):
+            os.makedirs(os.path.join(self.directory, 'missions', dossier))
+            shutil.copy(CSV, os.path.join(self.directory, 'missions', dossier, 'run.csv'))
+        a, b = (os.path.join(self.directory, 'missions', d, 'run.csv') for d in ('a', 'b'))
+        self.assertEqual(mission_names([a, b, CSV]), ['a_run', 'b_run', 'testfile'])
+        self.assertEqual(mission_names([CSV, CSV]), ['testfile_1', 'testfile_2'])
+        code, _ = self.convertir(a, b, '-f', 'gpkg')
+        self.assertEqual(code, 0)
+        for nom in ('a_run', 'b_run'):
+            self.assertTrue(os.path.exists(os.path.join(self.directory, nom + '.gpkg')))
+        resume = pd.read_csv(os.path.join(self.directory, 'summary.csv'))
+        self.assertEqual(resume['mission'].unique().tolist(), ['a_run', 'b_run'])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CliTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,74 @@
+# coding=utf-8
+"""CSV tail reader test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from naiad.follow import CsvTail
+
+HEADER = 'drone_id,longitude,latitude,depth,timestamp\n'
+
+
+class CsvTailTest(unittest.TestCase):
+    """Test incremental reading of a growing CSV."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'live.csv')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(HEADER + 'A,1.0,2.0,-1,2024-03-13T10:00:00Z\n')
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def append(self, text):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_only_new_lines_are_read(self):
+        """Each call returns the complete lines appended since the last one."""
+        tail = CsvTail(self.path)
+        self.assertEqual(tail.read_new().n_points, 1)
+        self.assertIsNone(tail.read_new())
+
+        self.append('B,3.0,4.0,-2,2024-03-13T10:05:00Z\nA,1.1,2.1,-1,2024-03-13T10:0')
+        lot = tail.read_new()
+        self.assertEqual(lot.ids, ['B'])
+
+        # La ligne partielle est complétée puis lue
+        self.append('6:00Z\n')
+        lot = tail.read_new()
+        self.assertEqual(lot.ids, ['A'])
+        self.assertEqual(lot.lon.tolist(), [1.1])
+        self.assertFalse(tail.pending)
+
+    def test_skip_existing_and_max_bytes(self):
+        """Existing content can be skipped and reads can be bounded."""
+        tail = CsvTail(self.path)
+        tail.skip_existing()
+        self.append('A,1.1,2.1,-1,2024-03-13T10:06:00Z\nA,1.2,2.2,-1,2024-03-13T10:07:00Z\n')
+        lot = tail.read_new(max_bytes=40)
+        self.assertEqual(lot.n_points, 1)
+        self.assertTrue(tail.pending)
+        self.assertEqual(tail.read_new().lon.tolist(), [1.2])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(CsvTailTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,180 @@
+# coding=utf-8
+"""GeoPackage writer test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import sqlite3
+import struct
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from naiad import geopackage
+from naiad.geopackage import (
+    GeoPackageWriter, geometry_blob, geopackage_path, is_current, iso_datetimes, linestring_wkb, list_tables,
+    point_blobs, segment_blobs
+)
+
+CHAMPS = [('drone_id', 'TEXT'), ('timestamp', 'DATETIME'), ('depth', 'DOUBLE')]
+
+
+class GeoPackageTest(unittest.TestCase):
+    """Test table writing, spatial and attribute indexes, and freshness checks."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'mission.gpkg')
+        self.lon = np.array([5.70, 5.71, 5.72, 6.00])
+        self.lat = np.array([45.10, 45.11, 45.12, 45.50])
+        self.depth = np.array([1.0, 2.0, 3.0, 4.0])
+        self.times = np.array([0, 1, 2, 3], dtype=np.int64) * 1_000_000_000
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory)
+
+    def ecrire_points(self, table='points', parameters=None):
+        with GeoPackageWriter(self.path) as ecrivain:
+            ecrivain.write_table(
+                table, 'POINT', CHAMPS, point_blobs(self.lon, self.lat, self.depth),
+                np.column_stack([self.lon, self.lon, self.lat, self.lat]),
+                [['A', 'A', 'A', 'B'], iso_datetimes(self.times), self.depth.tolist()],
+                z=True, indexes=('drone_id', 'timestamp'), parameters=parameters)
+
+    def test_point_blobs(self):
+        """Point geometries carry the GeoPackage header followed by ISO WKB PointZ."""
+        blob = point_blobs(self.lon, self.lat, self.depth)[1]
+        magic, version, flags, srs_id, ordre, type_wkb, x, y, z = struct.unpack('<2sBBiBIddd', blob)
+        self.assertEqual((magic, version, flags, srs_id, ordre, type_wkb), (b'GP', 0, 1, 4326, 1, 1001))
+        self.assertEqual((x, y, z), (5.71, 45.11, 2.0))
+
+    def test_geometry_blob_envelope(self):
+        """Envelope is stored as minx, maxx, miny, maxy before the WKB."""
+        wkb = struct.pack('<BIIdddd', 1, 2, 2, 1.0, 2.0, 3.0, 4.0)
+        blob = geometry_blob(wkb, (1.0, 3.0, 2.0, 4.0))
+        self.assertEqual(struct.unpack('<2sBBi4d', blob[:40]), (b'GP', 0, 3, 4326, 1.0, 3.0, 2.0, 4.0))
+        self.assertEqual(blob[40:], wkb)
+
+    def test_line_geometries(self):
+        """Lines and two-vertex segments are encoded as ISO WKB LineStringZ."""
+        wkb = linestring_wkb(self.lon[:3], self.lat[:3], self.depth[:3])
+        self.assertEqual(struct.unpack('<BII', wkb[:9]), (1, 1002, 3))
+        self.assertEqual(struct.unpack('<3d', wkb[33:57]), (5.71, 45.11, 2.0))
+        blob = segment_blobs([6.0], [45.5], [5.7], [45.1], [1.0], [2.0])[0]
+        self.assertEqual(struct.unpack('<2sBBi4d', blob[:40]), (b'GP', 0, 3, 4326, 5.7, 6.0, 45.1, 45.5))
+        self.assertEqual(blob[40:], linestring_wkb([6.0, 5.7], [45.5, 45.1], [1.0, 2.0]))
+        self.assertEqual(segment_blobs([6.0], [45.5], [5.7], [45.1], header=False)[0],
+                         linestring_wkb([6.0, 5.7], [45.5, 45.1]))
+
+    def test_iso_datetimes(self):
+        """Nanosecond instants are written as UTC ISO 8601 with milliseconds."""
+        self.assertEqual(iso_datetimes([1_700_000_000_123_000_000]), ['2023-11-14T22:13:20.123Z'])
+
+    def test_write_table(self):
+        """Rows, metadata, R-tree and attribute indexes are written together."""
+        self.ecrire_points()
+        con = sqlite3.connect(self.path)
+        self.assertEqual(con.execute('PRAGMA application_id').fetchone()[0], geopackage.APPLICATION_ID)
+        self.assertEqual(con.execute('SELECT drone_id, timestamp, depth FROM points WHERE fid = 4').fetchone(),
+                         ('B', '1970-01-01T00:00:03.000Z', 4.0))
+        self.assertEqual(con.execute(
+            'SELECT min_x, min_y, max_x, max_y FROM gpkg_contents WHERE table_name = ?', ('points',)).fetchone(),
+            (5.70, 45.10, 6.00, 45.50))
+        self.assertEqual(con.execute('SELECT geometry_type_name, z FROM gpkg_geometry_columns').fetchone(),
+                         ('POINT', 1))
+        proches = con.execute('SELECT id FROM rtree_points_geom WHERE minx <= 5.75 AND miny <= 45.2 '
+                              'ORDER BY id').fetchall()
+        self.assertEqual([p[0] for p in proches], [1, 2, 3])
+        index = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue({'idx_points_drone_id', 'idx_points_timestamp'} <= index)
+        triggers = con.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger'").fetchone()[0]
+        self.assertEqual(triggers, 6)
+        con.close()
+
+    def test_rewrite_replaces_table(self):
+        """Writing a table again replaces it without touching the others."""
+        self.ecrire_points()
+        self.ecrire_points('segments')
+        self.lon = self.lon[:2]
+        self.lat = self.lat[:2]
+        self.depth = self.depth[:2]
+        self.times = self.times[:2]
+        with GeoPackageWriter(self.path) as ecrivain:
+            ecrivain.write_table(
+                'points', 'POINT', CHAMPS, point_blobs(self.lon, self.lat, self.depth),
+                np.column_stack([self.lon, self.lon, self.lat, self.lat]),
+                [['A', 'A'], iso_datetimes(self.times), self.depth.tolist()], z=True)
+        con = sqlite3.connect(self.path)
+        self.assertEqual(con.execute('SELECT count(*) FROM points').fetchone()[0], 2)
+        self.assertEqual(con.execute('SELECT count(*) FROM rtree_points_geom').fetchone()[0], 2)
+        self.assertEqual(con.execute('SELECT count(*) FROM segments').fetchone()[0], 4)
+        con.close()
+        self.assertEqual(sorted(list_tables(self.path)), ['points', 'segments'])
+
+    def test_failed_write_rolls_back(self):
+        """An error during the transaction leaves the previous table intact."""
+        self.ecrire_points()
+        with GeoPackageWriter(self.path) as ecrivain:
+            with self.assertRaises(sqlite3.Error):
+                ecrivain.write_table('points', 'POINT', CHAMPS, point_blobs(self.lon, self.lat),
+                                     np.zeros((4, 4)), [['A'] * 4, [None] * 4])
+        con = sqlite3.connect(self.path)
+        self.assertEqual(con.execute('SELECT count(*) FROM points').fetchone()[0], 4)
+        con.close()
+
+    def test_is_current(self):
+        """A GeoPackage is current when every table was written after the source changed."""
+        source = os.path.join(self.directory, 'mission.csv')
+        with open(source, 'w') as f:
+            f.write('drone_id\n')
+        passe = time.time() - 60
+        os.utime(source, (passe, passe))
+        self.assertEqual(geopackage_path(source), self.path)
+        self.assertFalse(is_current(self.path, source, ['points']))
+        self.ecrire_points()
+        self.assertTrue(is_current(self.path, source, ['points']))
+        self.assertFalse(is_current(self.path, source, ['points', 'segments']))
+        ensuite = time.time() + 60
+        os.utime(source, (ensuite, ensuite))
+        self.assertFalse(is_current(self.path, source, ['points']))
+
+    def test_is_current_parameters(self):
+        """Tables computed with other parameters are not current."""
+        source = os.path.join(self.directory, 'mission.csv')
+        with open(source, 'w') as f:
+            f.write('drone_id\n')
+        passe = time.time() - 60
+        os.utime(source, (passe, passe))
+        reglages = {'colonnes': {'id': 'drone_id'}, 'politique': {'frame_budget': 100, 'frames_per_hour': 360}}
+        self.ecrire_points()
+        self.assertFalse(is_current(self.path, source, ['points'], reglages))
+        self.ecrire_points(parameters=reglages)
+        self.ecrire_points('segments', parameters={'politique': None})
+        self.assertTrue(is_current(self.path, source, ['points'], dict(reversed(list(reglages.items())))))
+        self.assertTrue(is_current(self.path, source, ['points']))
+        autres = dict(reglages, politique={'frame_budget': 200, 'frames_per_hour': 360})
+        self.assertFalse(is_current(self.path, source, ['points'], autres))
+        self.assertFalse(is_current(self.path, source, ['points', 'segments'], reglages))
+        # Une table réécrite sans paramètres perd les précédents
+        self.ecrire_points()
+        self.assertFalse(is_current(self.path, source, ['points'], reglages))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(GeoPackageTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,123 @@
+# coding=utf-8
+"""Streaming ingest test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from naiad.ingest import OperationAnnulee, read_mission, stream_mission
+from naiad.validation import validate_mission
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+class StreamMissionTest(unittest.TestCase):
+    """Test the chunked, disk-spilling CSV ingest."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_matches_in_memory_read(self):
+        """Merging small sorted runs gives the same store as a full read."""
+        expected = read_mission(CSV)
+        store = stream_mission(CSV, self.directory, chunksize=4)
+        self.assertEqual(store.ids, expected.ids)
+        self.assertEqual(store.offsets.tolist(), expected.offsets.tolist())
+        self.assertEqual(store.times.tolist(), expected.times.tolist())
+        self.assertEqual(store.lon.tolist(), expected.lon.tolist())
+        self.assertEqual(store.depth.tolist(), expected.depth.tolist())
+        self.assertEqual(str(store.tz), str(expected.tz))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'series')))
+
+    def test_invalid_rows_are_dropped(self):
+        """Rows with unreadable coordinates or times are skipped."""
+        path = os.path.join(self.directory, 'bad.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('drone_id,longitude,latitude,depth,timestamp\n'
+                    'A,1.0,2.0,-1,2024-03-13T10:00:00Z\n'
+                    'A,abc,2.0,-1,2024-03-13T11:00:00Z\n'
+                    'A,1.5,2.5,-1,pas une date\n'
+                    'A,2.0,3.0,,2024-03-13T12:00:00Z\n')
+        store = stream_mission(path, os.path.join(self.directory, 'store'), chunksize=2)
+        self.assertEqual(store.n_points, 2)
+        self.assertEqual(store.depth.tolist(), [-1.0, 0.0])
+
+    def test_validation_matches_ingest(self):
+        """Rows reported as errors by validate_mission are exactly the rows ingest drops."""
+        path = os.path.join(self.directory, 'bad.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('drone_id,longitude,latitude,depth,timestamp\n'
+                    'A,1.0,2.0,-1,2024-03-13T10:00:00Z\n'      # 2
+                    'A,1.5,2.5,-1,01/02/2024 00:00:03\n'       # 3 autre format, lisible
+                    'A,200.0,2.0,-1,2024-03-13T11:00:00Z\n'    # 4 longitude hors plage
+                    ',2.0,3.0,-1,2024-03-13T12:00:00Z\n'       # 5 identifiant manquant
+                    'B,2.0,3.0,-1,2024-03-13T12:00:00Z\n')     # 6
+        rapport = validate_mission(path)
+        erreurs = sorted(set().union(*(p.lignes.tolist() for p in rapport.erreurs)))
+        self.assertEqual(erreurs, [4, 5])
+        store = stream_mission(path, os.path.join(self.directory, 'store'), chunksize=2)
+        self.assertEqual(store.n_points, rapport.n_rows - len(erreurs))
+        self.assertEqual(store.ids, ['A', 'B'])
+        self.assertEqual(sorted(store.lon.tolist()), [1.0, 1.5, 2.0])
+        self.assertEqual(store.timestamps(store.times[:1])[0].isoformat(), '2024-01-02T00:00:03+00:00')
+
+    def test_ids_typed_across_chunks(self):
+        """Numeric-only and alphanumeric chunks give one text id per drone."""
+        path = os.path.join(self.directory, 'ids.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('drone_id,longitude,latitude,depth,timestamp\n'
+                    '7,1.0,2.0,-1,2024-03-13T10:00:00Z\n'
+                    '8,1.0,2.0,-1,2024-03-13T10:00:00Z\n'
+                    'A7,1.0,2.0,-1,2024-03-13T10:00:00Z\n'
+                    ',1.0,2.0,-1,2024-03-13T10:01:00Z\n'
+                    '7,1.5,2.5,-1,2024-03-13T10:01:00Z\n')
+        store = stream_mission(path, os.path.join(self.directory, 'store'), chunksize=2)
+        self.assertEqual(store.ids, ['7', '8', 'A7'])
+        self.assertEqual(store.offsets.tolist(), [0, 2, 3, 4])
+        self.assertEqual(read_mission(path).ids, store.ids)
+
+    def test_feedback_progress_and_cancel(self):
+        """Progress is reported to the feedback object, which can cancel the ingest."""
+        class Feedback:
+            def __init__(self, cancel_after):
+                self.progress = []
+                self.cancel_after = cancel_after
+
+            def isCanceled(self):
+                return len(self.progress) >= self.cancel_after
+
+            def setProgress(self, value):
+                self.progress.append(value)
+
+        feedback = Feedback(cancel_after=1000)
+        stream_mission(CSV, os.path.join(self.directory, 'ok'), chunksize=4, feedback=feedback)
+        self.assertEqual(feedback.progress, sorted(feedback.progress))
+        self.assertLessEqual(feedback.progress[-1], 100)
+
+        directory = os.path.join(self.directory, 'annule')
+        with self.assertRaises(OperationAnnulee):
+            stream_mission(CSV, directory, chunksize=4, feedback=Feedback(cancel_after=1))
+        self.assertFalse(os.path.exists(os.path.join(directory, 'series')))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(StreamMissionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
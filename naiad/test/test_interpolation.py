@@ -0,0 +1,104 @@
+# coding=utf-8
+"""Interpolation engine test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from naiad.interpolation import SamplingPolicy, interpolate_segments
+from naiad.trajectory_store import TrajectoryStore, from_epoch_ns
+
+
+class InterpolationTest(unittest.TestCase):
+    """Test the vectorized interpolation engine."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.df = pd.DataFrame({
+            'drone_id': ['B', 'A', 'A', 'A', 'C'],
+            'longitude': [5.0, 1.0, 0.0, 0.1, 7.0],
+            'latitude': [5.0, 0.0, 0.0, 0.0, 7.0],
+            'depth': [-1.0, -4.0, 0.0, -2.0, -3.0],
+            'timestamp': pd.to_datetime([
+                '2024-03-13T10:00:00Z', '2024-03-13T11:00:00Z',
+                '2024-03-13T09:00:00Z', '2024-03-13T10:00:00Z',
+                '2024-03-13T10:30:00Z']),
+        })
+
+    def test_policy_time_and_distance(self):
+        """Each segment gets the larger of the time and distance demands."""
+        policy = SamplingPolicy(frames_per_hour=60, metres_per_vertex=100.0, frame_budget=None)
+        steps = policy.steps(np.array([50.0, 1000.0, 0.0]),
+                             np.array([3600, 60, 0], dtype=np.int64) * 1_000_000_000)
+        self.assertEqual(steps.tolist(), [60, 10, 1])
+        bornee = SamplingPolicy(frames_per_hour=60, metres_per_vertex=None, frame_budget=None,
+                                min_steps=5, max_steps=20)
+        self.assertEqual(bornee.steps(np.zeros(2), np.array([0, 3600]) * 1_000_000_000).tolist(), [5, 20])
+
+    def test_policy_budget(self):
+        """The global budget bounds the total while keeping every segment start."""
+        policy = SamplingPolicy(frames_per_hour=None, metres_per_vertex=1.0, frame_budget=100)
+        steps = policy.steps(np.array([1000.0, 100.0, 0.0, 10.0]), np.zeros(4, dtype=np.int64))
+        self.assertLessEqual(steps.sum(), 100)
+        self.assertTrue((steps >= 1).all())
+        self.assertGreater(steps[0], steps[1])
+        self.assertEqual(policy.steps(np.full(200, 1000.0), np.zeros(200, dtype=np.int64)).tolist(),
+                         [1] * 200)
+
+    def test_segments(self):
+        """Every segment is sampled and single points are kept."""
+        store = TrajectoryStore.from_dataframe(self.df)
+        self.assertEqual(store.ids, ['A', 'B', 'C'])
+        policy = SamplingPolicy(frames_per_hour=10, metres_per_vertex=None, frame_budget=None)
+        out = interpolate_segments(
+            store.lon, store.lat, store.depth, store.times, store.offsets, policy)
+        out_lon, out_lat, out_depth, out_times, out_offsets = out
+
+        # A : deux segments d'une heure en 10 étapes chacun, puis sa dernière position
+        self.assertEqual(out_offsets.tolist(), [0, 21, 22, 23])
+        self.assertAlmostEqual(out_lon[10], 0.1)
+        self.assertAlmostEqual(out_depth[5], -1.0)
+        stamps = from_epoch_ns(out_times, store.tz)
+        self.assertEqual(stamps[5], pd.Timestamp('2024-03-13T09:30:00Z'))
+        self.assertEqual(stamps[20], pd.Timestamp('2024-03-13T11:00:00Z'))
+        self.assertEqual(out_lon[21], 5.0)
+        self.assertEqual(stamps[22], pd.Timestamp('2024-03-13T10:30:00Z'))
+
+    def test_distance_is_geodesic(self):
+        """Distance-based density uses metres, not degrees (0.1° of longitude at 0° N ~ 11 km)."""
+        store = TrajectoryStore.from_dataframe(self.df)
+        policy = SamplingPolicy(frames_per_hour=None, metres_per_vertex=1000.0, frame_budget=None)
+        out_offsets = store.interpolated(policy).offsets
+        # 11.1 km -> 12 étapes, 100.2 km -> 101 étapes, plus la dernière position
+        self.assertEqual(out_offsets.tolist(), [0, 114, 115, 116])
+
+    def test_last_fix_is_emitted(self):
+        """Each track ends on its last raw fix, even with one step per segment."""
+        store = TrajectoryStore.from_dataframe(self.df)
+        for policy in (SamplingPolicy(frames_per_hour=10, metres_per_vertex=None, frame_budget=None),
+                       SamplingPolicy(frames_per_hour=None, metres_per_vertex=1e7, frame_budget=None),
+                       SamplingPolicy(frame_budget=1)):
+            out = interpolate_segments(store.lon, store.lat, store.depth, store.times, store.offsets, policy)
+            out_offsets = out[4]
+            for brut, echantillons in zip((store.lon, store.lat, store.depth, store.times), out[:4]):
+                self.assertEqual(echantillons[out_offsets[1:] - 1].tolist(), brut[store.offsets[1:] - 1].tolist())
+        # Un segment par drone en une seule étape : départ et arrivée
+        self.assertEqual(out_offsets.tolist(), [0, 3, 4, 5])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(InterpolationTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
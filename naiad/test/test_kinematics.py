@@ -0,0 +1,103 @@
+# coding=utf-8
+"""Trajectory kinematics test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import unittest
+
+import numpy as np
+
+from naiad import kinematics
+from naiad.kinematics import compute_kinematics, geodesic_inverse, track_summary
+from naiad.trajectory_store import TrajectoryStore
+
+S = 1_000_000_000
+
+
+class KinematicsTest(unittest.TestCase):
+    """Test geodesic lengths, speeds, headings and per-track summaries."""
+
+    def setUp(self):
+        """Runs before each test."""
+        # Drone A : 0.01° vers l'est puis 0.01° vers le nord à 49° N, 100 s par segment
+        # Drone B : point unique ; drone C : deux positions identiques
+        self.lon = np.array([2.00, 2.01, 2.01, 5.0, 6.0, 6.0])
+        self.lat = np.array([49.00, 49.00, 49.01, 45.0, 45.0, 45.0])
+        self.depth = np.array([0.0, 10.0, 5.0, 0.0, 1.0, 1.0])
+        self.times = np.array([0, 100, 200, 0, 0, 50], dtype=np.int64) * S
+        self.offsets = np.array([0, 3, 4, 6])
+
+    def test_geodesic_inverse(self):
+        """East-west distances shrink with latitude, unlike hypot of degrees."""
+        distance, cap = geodesic_inverse([2.0, 2.0], [49.0, 49.0], [2.01, 2.0], [49.0, 49.01])
+        self.assertAlmostEqual(distance[0], 731.1, delta=1.0)
+        self.assertAlmostEqual(distance[1], 1111.9, delta=1.0)
+        self.assertAlmostEqual(cap[0], 90.0, delta=0.01)
+        self.assertAlmostEqual(cap[1], 0.0, delta=0.01)
+
+    def test_haversine_fallback(self):
+        """Without pyproj, haversine stays within 0.5 % of the ellipsoid."""
+        attendu, cap_attendu = geodesic_inverse([2.0, -70.0], [49.0, -30.0], [2.3, -69.0], [48.8, -31.0])
+        geod = kinematics._GEOD
+        kinematics._GEOD = None
+        try:
+            distance, cap = geodesic_inverse([2.0, -70.0], [49.0, -30.0], [2.3, -69.0], [48.8, -31.0])
+        finally:
+            kinematics._GEOD = geod
+        np.testing.assert_allclose(distance, attendu, rtol=5e-3)
+        np.testing.assert_allclose(cap, cap_attendu, atol=0.5)
+
+    def test_compute_kinematics(self):
+        """Values describe segment i -> i+1 and never cross track boundaries."""
+        k = compute_kinematics(self.lon, self.lat, self.depth, self.times, self.offsets)
+        self.assertEqual(k.length[2], 0.0)
+        self.assertEqual(k.length[3], 0.0)
+        self.assertAlmostEqual(k.speed[0], k.length[0] / 100)
+        self.assertAlmostEqual(k.heading[0], 90.0, delta=0.01)
+        self.assertAlmostEqual(k.heading[1], 0.0, delta=0.01)
+        np.testing.assert_allclose(k.vertical_rate[:2], [0.1, -0.05])
+        self.assertTrue(np.isnan(k.speed[2]) and np.isnan(k.heading[2]))
+        # Drone immobile : vitesse nulle, cap indéfini
+        self.assertEqual(k.speed[4], 0.0)
+        self.assertTrue(np.isnan(k.heading[4]))
+        np.testing.assert_allclose(k.cumulative, [0.0, k.length[0], k.length[0] + k.length[1], 0.0, 0.0, 0.0])
+
+    def test_vertical_rate_sign(self):
+        """With depths negative below the surface, diving gives a negative rate."""
+        depth = np.array([-1.0, -3.0, -2.0])
+        k = compute_kinematics(self.lon[:3], self.lat[:3], depth, self.times[:3], np.array([0, 3]))
+        np.testing.assert_allclose(k.vertical_rate[:2], [-0.02, 0.01])
+
+    def test_track_summary(self):
+        """Totals, mean and maximum speeds are aggregated per track."""
+        k = compute_kinematics(self.lon, self.lat, self.depth, self.times, self.offsets)
+        total, moyenne, maximum = track_summary(k, self.times, self.offsets)
+        self.assertAlmostEqual(total[0], k.length[0] + k.length[1])
+        self.assertAlmostEqual(moyenne[0], total[0] / 200)
+        self.assertAlmostEqual(maximum[0], max(k.speed[0], k.speed[1]))
+        self.assertEqual(total[1], 0.0)
+        self.assertTrue(np.isnan(moyenne[1]) and np.isnan(maximum[1]))
+        self.assertEqual((total[2], moyenne[2], maximum[2]), (0.0, 0.0, 0.0))
+
+    def test_store_kinematics(self):
+        """TrajectoryStore exposes the kinematics of its sorted arrays."""
+        store = TrajectoryStore(['A', 'B', 'C'], self.lon, self.lat, self.depth, self.times, self.offsets)
+        np.testing.assert_allclose(store.kinematics().cumulative,
+                                   compute_kinematics(self.lon, self.lat, self.depth,
+                                                      self.times, self.offsets).cumulative)
+        self.assertEqual(len(store.summary()[0]), 3)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(KinematicsTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,69 @@
+# coding=utf-8
+"""Playback clock test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from naiad.playback import MissionClock, PlaybackCursors, sample_index
+from naiad.trajectory_store import TrajectoryStore
+
+
+class PlaybackTest(unittest.TestCase):
+    """Test the mission clock and position lookup."""
+
+    def test_sample_index(self):
+        """The last sample at or before t is found."""
+        times = np.array([10, 20, 30], dtype=np.int64)
+        self.assertEqual(sample_index(times, 5), -1)
+        self.assertEqual(sample_index(times, 20), 1)
+        self.assertEqual(sample_index(times, 29), 1)
+        self.assertEqual(sample_index(times, 99), 2)
+
+    def test_fractional_speed(self):
+        """Mission time follows wall time, including slow speeds and late ticks."""
+        clock = MissionClock(0, 1000, duree_lecture=1e-6)
+        clock.speed = 0.5
+        with mock.patch('naiad.playback.time.monotonic_ns', side_effect=[0, 100, 1100]):
+            clock.start()
+            self.assertEqual(clock.tick(), 50)
+            # Tick en retard : le temps de mission saute d'autant
+            self.assertEqual(clock.tick(), 550)
+        self.assertFalse(clock.finished)
+        clock.seek(5000)
+        self.assertTrue(clock.finished)
+        self.assertEqual(clock.progress, 1.0)
+
+    def test_cursors_follow_time(self):
+        """Incremental advances, jumps and rewinds match a per-track search."""
+        # Drone A : instants répétés ; B : commence tard ; C : un seul échantillon
+        times = np.array([0, 10, 10, 20, 50, 30, 40, 60, 25], dtype=np.int64)
+        offsets = np.array([0, 5, 8, 9])
+        store = TrajectoryStore(['A', 'B', 'C'], np.zeros(9), np.zeros(9), np.zeros(9), times, offsets)
+        cursors = PlaybackCursors(store)
+        for t in [-5, 0, 9, 10, 11, 25, 26, 45, 100, 15, 15, 60, 0]:
+            cursors.advance(t)
+            attendu = [sample_index(store.track(k)[3], t) + 1 for k in range(3)]
+            self.assertEqual(cursors.ends.tolist(), attendu, t)
+        cursors.seek(30)
+        self.assertEqual(cursors.started().tolist(), [0, 1, 2])
+        self.assertEqual(cursors.current().tolist(), [3, 5, 8])
+        self.assertEqual(cursors.current([1]).tolist(), [5])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(PlaybackTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,102 @@
+# coding=utf-8
+"""Vectorized reprojection test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from pyproj import Transformer
+
+from naiad.cache import MissionCache
+from naiad.ingest import load_mission
+from naiad.projection import column_transform, reproject
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+class ProjectionTest(unittest.TestCase):
+    """Test chunked column reprojection and its reuse through the mission cache."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        # Mission de test exprimée en Lambert-93
+        self.df = pd.read_csv(CSV)
+        vers_l93 = Transformer.from_crs('EPSG:4326', 'EPSG:2154', always_xy=True)
+        self.x, self.y = vers_l93.transform(self.df['longitude'].to_numpy(), self.df['latitude'].to_numpy())
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory)
+
+    def test_matches_point_transform(self):
+        """Chunked array transforms give the per-point pyproj result."""
+        depuis_l93 = Transformer.from_crs('EPSG:2154', 'EPSG:4326', always_xy=True)
+        attendu = np.array([depuis_l93.transform(x, y) for x, y in zip(self.x, self.y)])
+        lon, lat = reproject(self.x, self.y, 'EPSG:2154', chunksize=7)
+        np.testing.assert_array_equal(lon, attendu[:, 0])
+        np.testing.assert_array_equal(lat, attendu[:, 1])
+        np.testing.assert_allclose(lon, self.df['longitude'], atol=1e-7)
+
+    def test_process_pool(self):
+        """Chunks spread over a process pool are reassembled in order."""
+        serie = reproject(self.x, self.y, 'EPSG:2154')
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            parallele = reproject(self.x, self.y, 'EPSG:2154', chunksize=5, executor=pool)
+        np.testing.assert_array_equal(parallele[0], serie[0])
+        np.testing.assert_array_equal(parallele[1], serie[1])
+
+    def test_short_input_stays_in_process(self):
+        """Fewer than BLOCS_MIN_POOL chunks are not shipped to the pool."""
+        class Refuse:
+            def map(self, *args):
+                raise AssertionError('pool used for a short input')
+
+        serie = reproject(self.x, self.y, 'EPSG:2154')
+        courte = reproject(self.x, self.y, 'EPSG:2154', chunksize=len(self.x) // 3, executor=Refuse())
+        np.testing.assert_array_equal(courte[0], serie[0])
+
+    def test_target_crs_is_not_transformed(self):
+        """WGS 84 sources are read as is."""
+        self.assertIsNone(column_transform('EPSG:4326', 'longitude', 'latitude'))
+        lon, lat = reproject([1.5, 2.0], [45.0, 46.0], 'EPSG:4326')
+        self.assertEqual(lon.tolist(), [1.5, 2.0])
+
+    def test_cached_projection(self):
+        """Reopening the same file in the same CRS reuses the projected columns."""
+        chemin = os.path.join(self.directory, 'l93.csv')
+        self.df.assign(longitude=self.x, latitude=self.y).to_csv(chemin, index=False)
+        cache = MissionCache(os.path.join(self.directory, 'cache'))
+        appels = []
+        transform = column_transform('EPSG:2154', 'longitude', 'latitude')
+
+        def compter(df):
+            appels.append(len(df))
+            return transform(df)
+
+        store = load_mission(chemin, crs='EPSG:2154', transform=compter, cache=cache)
+        encore = load_mission(chemin, crs='EPSG:2154', transform=compter, cache=cache)
+        self.assertEqual(appels, [len(self.df)])
+        np.testing.assert_array_equal(encore.lon, store.lon)
+        self.assertAlmostEqual(float(store.lat.min()), self.df['latitude'].min(), places=7)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ProjectionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
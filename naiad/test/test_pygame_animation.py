@@ -0,0 +1,197 @@
+# coding=utf-8
+"""Pygame animation helpers test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+# Pas de fenêtre : surfaces hors écran uniquement
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import pygame  # noqa: E402
+
+import PYGAME_animation as animation  # noqa: E402
+from naiad.trajectory_store import TrajectoryStore  # noqa: E402
+
+S = 1_000_000_000
+ROUGE, VERT = (255, 0, 0), (0, 255, 0)
+
+
+class ScreenProjectionTest(unittest.TestCase):
+    """Test the vectorized map to screen projection."""
+
+    def setUp(self):
+        """Runs before each test."""
+        rng = np.random.default_rng(3)
+        self.lats = rng.uniform(40.0, 56.0, 200)
+        self.lons = rng.uniform(-12.0, 8.0, 200)
+
+    def test_matches_point_formula(self):
+        """Whole arrays give the per-point latlon_to_screen result, off-screen points included."""
+        lats = np.concatenate([self.lats, [48.0, 60.0, 30.0]])
+        lons = np.concatenate([self.lons, [-2.0, -40.0, 50.0]])
+        for zoom, lat0, lon0 in [(1.0, 0.0, 0.0), (5.0, 48.0, -2.0), (37.3, 47.9, -2.1)]:
+            attendu = [animation.latlon_to_screen(la, lo, zoom, lat0, lon0) for la, lo in zip(lats, lons)]
+            points = animation.project_to_screen(lats, lons, zoom, lat0, lon0)
+            self.assertEqual(points.dtype, np.int64)
+            self.assertEqual([tuple(p) for p in points.tolist()], attendu)
+        decales = animation.project_to_screen(lats, lons, 5.0, 48.0, -2.0, offset=(10, 20))
+        np.testing.assert_array_equal(decales - [10, 20], animation.project_to_screen(lats, lons, 5.0, 48.0, -2.0))
+
+    def test_round_trip(self):
+        """Unprojecting projected points gives back the input, to the pixel."""
+        zoom, lat0, lon0 = 20.0, 48.0, -2.0
+        points = animation.project_to_screen(self.lats, self.lons, zoom, lat0, lon0)
+        lats, lons = animation.screen_to_latlon(points[:, 0], points[:, 1], zoom, lat0, lon0)
+        pixel_lon = 360 / animation.WINDOW_WIDTH / zoom
+        pixel_lat = 180 / animation.WINDOW_HEIGHT / zoom
+        np.testing.assert_array_less(np.abs(lons - self.lons), pixel_lon)
+        np.testing.assert_array_less(np.abs(lats - self.lats), pixel_lat)
+        # Le centre de l'écran est exactement le centre de la vue
+        self.assertEqual(animation.screen_to_latlon(animation.WINDOW_WIDTH // 2, animation.WINDOW_HEIGHT // 2,
+                                                    zoom, lat0, lon0), (lat0, lon0))
+
+
+class TrailCacheTest(unittest.TestCase):
+    """Test incremental trail drawing and when the cached surface is rebuilt."""
+
+    def setUp(self):
+        """Runs before each test."""
+        # Drone A vers l'est, drone B vers le nord, autour de (48° N, 2° W)
+        self.store = TrajectoryStore(
+            ['A', 'B'], [-2.0, -1.95, -1.9, -2.0, -2.0, -2.0], [48.0, 48.0, 48.0, 48.0, 48.05, 48.1],
+            np.full(6, -1.0), np.array([0, 10, 20, 0, 10, 20], dtype=np.int64) * S, [0, 3, 6])
+        self.cache = animation.TrailCache(self.store, {'A': ROUGE, 'B': VERT})
+        self.vue = (100.0, 48.05, -1.95)
+
+    def pixel(self, lat, lon, zoom=100.0):
+        x, y = animation.latlon_to_screen(lat, lon, zoom, self.cache.anchor[0], self.cache.anchor[1])
+        return tuple(self.cache.surface.get_at((x + self.cache.margin[0], y + self.cache.margin[1])))[:3]
+
+    def test_extend_draws_only_new_points(self):
+        """Each extend draws the points not drawn yet and keeps the polyline connected."""
+        self.cache.set_view(*self.vue, None, 0)
+        self.cache.extend([0, 1], [2, 1])
+        self.assertEqual(self.cache.drawn.tolist(), [2, 1])
+        self.assertEqual(self.pixel(48.0, -1.975), ROUGE)
+        self.assertEqual(self.pixel(48.0, -1.925), (0, 0, 0))
+        self.cache.extend([0, 1], [3, 3])
+        self.assertEqual(self.cache.drawn.tolist(), [3, 3])
+        self.assertEqual(self.pixel(48.0, -1.925), ROUGE)
+        self.assertEqual(self.pixel(48.075, -2.0), VERT)
+        # Aucun point nouveau : rien à tracer
+        self.cache.extend([0], [2])
+        self.assertEqual(self.cache.drawn.tolist(), [3, 3])
+
+    def test_invalidation(self):
+        """Small zoom changes and pans reuse the surface; other view changes clear it."""
+        zoom, lat, lon = self.vue
+
+        def apres(*vue):
+            self.cache.set_view(*self.vue, None, 10)
+            self.cache.extend([0, 1], [3, 3])
+            self.cache.set_view(*vue)
+            return self.cache.drawn.sum() > 0
+
+        self.assertTrue(apres(zoom * 1.05, lat, lon, None, 10))
+        self.assertTrue(apres(zoom / 1.05, lat + 0.1, lon, None, 20))
+        self.assertFalse(apres(zoom * 1.5, lat, lon, None, 10))
+        self.assertFalse(apres(zoom, lat, lon, frozenset(['A']), 10))
+        self.assertFalse(apres(zoom, lat, lon, None, 0))
+        self.assertFalse(apres(zoom, lat + 10, lon, None, 10))
+        self.cache.invalidate()
+        self.cache.set_view(*self.vue, None, 10)
+        self.assertEqual(self.cache.drawn.sum(), 0)
+
+    def test_scaled_blit(self):
+        """Between rebuilds the cached trails are scaled to the current zoom."""
+        self.cache.set_view(*self.vue, None, 0)
+        self.cache.extend([0, 1], [3, 3])
+        zoom = self.vue[0] * 1.08
+        self.cache.set_view(zoom, self.vue[1], self.vue[2], None, 10)
+        screen = pygame.Surface((animation.WINDOW_WIDTH, animation.WINDOW_HEIGHT))
+        self.cache.blit(screen, zoom, self.vue[1], self.vue[2])
+        x, y = animation.latlon_to_screen(48.0, -1.93, zoom, self.vue[1], self.vue[2])
+        voisins = [tuple(screen.get_at((x + dx, y + dy)))[:3] for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+        self.assertIn(ROUGE, voisins)
+
+
+class AnimatedBackgroundTest(unittest.TestCase):
+    """Test lazy GIF decoding, the frame cache bound and the prefetch thread."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Runs once: convert_alpha needs a display."""
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Runs once after the tests."""
+        pygame.display.quit()
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'fond.gif')
+        # Une couleur unie par image
+        self.couleurs = [(20 * i, 255 - 20 * i, 100) for i in range(12)]
+        images = [Image.new('RGB', (16, 8), c) for c in self.couleurs]
+        images[0].save(self.path, save_all=True, append_images=images[1:], duration=100, loop=0)
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory)
+
+    def parcourir(self, fond, tours=2):
+        # Une image par appel à update, comme à chaque frame de l'animation
+        fond.frame_delay = -1
+        vues = []
+        for _ in range(tours * fond.n_frames):
+            vues.append(tuple(fond.get_current_frame().get_at((5, 5)))[:3])
+            self.assertLessEqual(len(fond.frames), fond.cache_frames)
+            fond.update()
+        return vues
+
+    def test_frames_in_order_with_bounded_cache(self):
+        """Frames are shown in GIF order while at most cache_frames are kept."""
+        fond = animation.AnimatedBackground(self.path, cache_frames=3, prefetch=False)
+        self.assertEqual(fond.n_frames, len(self.couleurs))
+        self.assertEqual(len(fond.frames), 0)
+        self.assertEqual(self.parcourir(fond), self.couleurs * 2)
+        # Les images gardées sont les dernières affichées
+        self.assertEqual(list(fond.frames), [9, 10, 11])
+
+    def test_prefetch_thread(self):
+        """Prefetched frames keep the order and the worker stops on close."""
+        fond = animation.AnimatedBackground(self.path, cache_frames=4)
+        self.assertTrue(fond.worker.daemon)
+        self.assertEqual(self.parcourir(fond), self.couleurs * 2)
+        self.assertLessEqual(len(fond.ready), 2)
+        worker = fond.worker
+        fond.close()
+        self.assertFalse(worker.is_alive())
+        fond.close()
+        self.assertEqual(self.parcourir(fond, tours=1), self.couleurs)
+
+
+if __name__ == "__main__":
+    cases = (ScreenProjectionTest, TrailCacheTest, AnimatedBackgroundTest)
+    suite = unittest.TestSuite(unittest.makeSuite(case) for case in cases)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
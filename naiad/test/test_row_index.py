@@ -0,0 +1,96 @@
+# coding=utf-8
+"""CSV row index test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+from naiad import row_index
+from naiad.row_index import RowIndex
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+class RowIndexTest(unittest.TestCase):
+    """Test on-demand row access, sorting and filtering."""
+
+    def setUp(self):
+        """Runs before each test."""
+        with open(CSV, encoding='utf-8') as f:
+            lecteur = csv.reader(f)
+            self.header = next(lecteur)
+            self.rows = list(lecteur)
+        self.index = RowIndex(CSV)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Runs after each test."""
+        self.index.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_rows_match_csv_reader(self):
+        """Contiguous and scattered reads return the same fields as csv.reader."""
+        self.assertEqual(self.index.header, self.header)
+        self.assertEqual(len(self.index), len(self.rows))
+        self.assertEqual(self.index.rows(range(len(self.rows))), self.rows)
+        self.assertEqual(self.index.rows([7, 2, 5]), [self.rows[7], self.rows[2], self.rows[5]])
+
+    def test_small_read_blocks_and_missing_final_newline(self):
+        """Offsets do not depend on the read block size or a final newline."""
+        path = os.path.join(self.directory, 'sans_fin.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('a,b\n1,x\n2,y\n3,z')
+        taille = row_index.TAILLE_LECTURE
+        row_index.TAILLE_LECTURE = 3
+        try:
+            index = RowIndex(path)
+        finally:
+            row_index.TAILLE_LECTURE = taille
+        self.assertEqual(index.rows([0, 1, 2]), [['1', 'x'], ['2', 'y'], ['3', 'z']])
+        index.close()
+
+    def test_sort_and_filter(self):
+        """Sorting and filtering return file row numbers."""
+        colonne = self.header.index('timestamp')
+        ordre = self.index.sort_order(colonne)
+        valeurs = [self.rows[i][colonne] for i in ordre]
+        self.assertEqual(valeurs, sorted(valeurs))
+        profondeur = self.header.index('depth')
+        ordre = self.index.sort_order(profondeur, descending=True)
+        valeurs = [float(self.rows[i][profondeur]) for i in ordre]
+        self.assertEqual(valeurs, sorted(valeurs, reverse=True))
+
+        drone = self.rows[0][0]
+        lignes = self.index.matching_rows(drone.lower())
+        self.assertEqual(lignes.tolist(), [i for i, r in enumerate(self.rows) if drone in ','.join(r)])
+
+    def test_sort_blank_lines_and_ties(self):
+        """Blank lines keep their row number; ties stay in file order both ways."""
+        path = os.path.join(self.directory, 'vide.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('a,b\n3,x\n\n1,y\n3,z\n1,w\n')
+        index = RowIndex(path)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.sort_order(0).tolist(), [2, 4, 0, 3, 1])
+        self.assertEqual(index.sort_order(0, descending=True).tolist(), [1, 0, 3, 2, 4])
+        self.assertEqual(index.sort_order(1, descending=True).tolist(), [3, 2, 0, 4, 1])
+        index.close()
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(RowIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,65 @@
+# coding=utf-8
+"""Trajectory simplification test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import unittest
+
+import numpy as np
+
+from naiad.simplification import ECHELLES_LOD, niveaux, simplify, tolerance_pour_echelle
+
+
+class SimplifyTest(unittest.TestCase):
+    """Test the time- and depth-aware Douglas-Peucker simplification."""
+
+    def test_uniform_straight_track_keeps_endpoints(self):
+        """A constant-speed straight track reduces to its two endpoints."""
+        lon = np.linspace(0.0, 1.0, 11)
+        times = np.arange(11) * 60
+        kept = simplify(lon, np.zeros(11), np.zeros(11), times, 1e-6)
+        self.assertEqual(kept.tolist(), [0, 10])
+
+    def test_spatial_spike_is_kept(self):
+        """A vertex far from the chord is kept."""
+        kept = simplify([0.0, 0.5, 1.0], [0.0, 0.2, 0.0], [0, 0, 0], [0, 1, 2], 0.01)
+        self.assertEqual(kept.tolist(), [0, 1, 2])
+
+    def test_speed_change_is_kept(self):
+        """An aligned vertex reached much earlier than at constant speed is kept (SED)."""
+        kept = simplify([0.0, 0.9, 1.0], [0, 0, 0], [0, 0, 0], [0, 10, 100], 0.01)
+        self.assertEqual(kept.tolist(), [0, 1, 2])
+
+    def test_depth_change_is_kept(self):
+        """A dive between two surface fixes is kept."""
+        kept = simplify([0.0, 0.5, 1.0], [0, 0, 0], [0.0, -5000.0, 0.0], [0, 1, 2], 0.01)
+        self.assertEqual(kept.tolist(), [0, 1, 2])
+
+    def test_levels_are_nested(self):
+        """Each coarser level keeps a subset of the previous one."""
+        rng = np.random.default_rng(0)
+        lon = np.cumsum(rng.normal(0, 0.01, 500))
+        lat = np.cumsum(rng.normal(0, 0.01, 500))
+        depth = -np.abs(np.cumsum(rng.normal(0, 1, 500)))
+        times = np.arange(500) * 30
+        levels = niveaux(lon, lat, depth, times)
+        self.assertEqual(len(levels), len(ECHELLES_LOD))
+        for fine, coarse in zip(levels, levels[1:]):
+            self.assertTrue(set(coarse.tolist()) <= set(fine.tolist()))
+            self.assertLessEqual(len(coarse), len(fine))
+        self.assertLess(tolerance_pour_echelle(ECHELLES_LOD[0]), tolerance_pour_echelle(ECHELLES_LOD[1]))
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SimplifyTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,119 @@
+# coding=utf-8
+"""Segment spatial index test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import unittest
+
+import numpy as np
+
+from naiad.spatial_index import SegmentIndex
+from naiad.trajectory_store import TrajectoryStore
+
+
+def brute_force(store, x, y):
+    """Smallest point-to-segment distance over every segment of the store."""
+    best = np.inf
+    for _, lon, lat, _, _ in store.tracks():
+        if len(lon) == 1:
+            best = min(best, np.hypot(lon[0] - x, lat[0] - y))
+        for i in range(len(lon) - 1):
+            dx, dy = lon[i + 1] - lon[i], lat[i + 1] - lat[i]
+            u = np.clip(((x - lon[i]) * dx + (y - lat[i]) * dy) / (dx * dx + dy * dy), 0, 1)
+            best = min(best, np.hypot(lon[i] + u * dx - x, lat[i] + u * dy - y))
+    return best
+
+
+class SegmentIndexTest(unittest.TestCase):
+    """Test nearest-segment and bounding box queries."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.store = TrajectoryStore.from_arrays(
+            ['A', 'A', 'A', 'B', 'B', 'C'],
+            [0.0, 1.0, 1.0, 5.0, 5.0, 9.0],
+            [0.0, 0.0, 1.0, 5.0, 6.0, 9.0],
+            [0.0, -10.0, -20.0, 0.0, -4.0, -1.0],
+            np.array([0, 100, 200, 0, 100, 50]) * 10 ** 9, None)
+        self.index = SegmentIndex(self.store)
+
+    def test_nearest_interpolates_time_and_depth(self):
+        """The hit carries the drone id and values interpolated on the segment."""
+        hit = self.index.nearest(0.5, 0.1)
+        self.assertEqual(hit.track_id, 'A')
+        self.assertAlmostEqual(hit.distance, 0.1)
+        self.assertEqual(hit.time, 50 * 10 ** 9)
+        self.assertAlmostEqual(hit.depth, -5.0)
+
+    def test_single_position_is_indexed(self):
+        """A drone with a single fix can be hit."""
+        self.assertEqual(self.index.nearest(9.1, 9.0).track_id, 'C')
+
+    def test_filters(self):
+        """Distance, time and drone filters restrict the candidates."""
+        self.assertIsNone(self.index.nearest(3.0, 3.0, max_distance=0.5))
+        self.assertEqual(self.index.nearest(5.2, 5.5, tracks={'A'}).track_id, 'A')
+        self.assertEqual(self.index.nearest(1.1, 0.5).time, 150 * 10 ** 9)
+        # The segment still being travelled at 150 s is not drawn yet
+        self.assertEqual(self.index.nearest(1.1, 0.5, before=150 * 10 ** 9).time, 100 * 10 ** 9)
+
+    def test_query_bbox(self):
+        """Only segments whose extent crosses the box are returned."""
+        hits = self.index.query_bbox(0.8, 0.5, 2.0, 2.0)
+        self.assertEqual([(h.track_id, h.time) for h in hits], [('A', 100 * 10 ** 9)])
+        self.assertEqual(self.index.query_bbox(20, 20, 30, 30), [])
+
+    def test_matches_brute_force(self):
+        """Grid search returns the same distance as a full scan."""
+        rng = np.random.default_rng(0)
+        n = 2000
+        store = TrajectoryStore.from_arrays(
+            rng.integers(0, 20, n), np.cumsum(rng.normal(0, 0.01, n)),
+            np.cumsum(rng.normal(0, 0.01, n)), np.zeros(n), np.arange(n), None)
+        index = SegmentIndex(store)
+        for x, y in rng.uniform(-1, 1, (20, 2)):
+            self.assertAlmostEqual(index.nearest(x, y).distance, brute_force(store, x, y))
+
+    def test_empty_tracks(self):
+        """Drones without samples, first or in the middle, do not mask other segments."""
+        store = TrajectoryStore(['V', 'A', 'W', 'B', 'C'], [0.0, 1.0, 1.0, 5.0, 5.0, 9.0, 9.0],
+                                [0.0, 0.0, 1.0, 5.0, 6.0, 9.0, 10.0], np.zeros(7),
+                                np.array([0, 100, 200, 0, 100, 50, 60]) * 10 ** 9, [0, 0, 3, 3, 5, 7])
+        index = SegmentIndex(store)
+        self.assertEqual(sorted(zip(index.debut.tolist(), index.fin.tolist())), [(0, 1), (1, 2), (3, 4), (5, 6)])
+        self.assertEqual([store.ids[p] for p in index.piste[np.argsort(index.debut)]], ['A', 'A', 'B', 'C'])
+        for x, y in [(0.5, 0.1), (1.1, 0.5), (5.2, 5.5), (9.1, 9.5)]:
+            self.assertAlmostEqual(index.nearest(x, y).distance, brute_force(store, x, y))
+
+    def test_long_segments_are_kept_out_of_the_grid(self):
+        """A jump across the whole extent adds one entry, not a cell per covered square."""
+        rng = np.random.default_rng(1)
+        n = 2000
+        lon = np.cumsum(rng.normal(0, 0.001, n))
+        lat = np.cumsum(rng.normal(0, 0.001, n))
+        # Positions aberrantes en (0, 0) et saut vers une autre zone
+        lon[500], lat[500] = 40.0, 40.0
+        lon[1500:] += 30.0
+        store = TrajectoryStore.from_arrays(np.zeros(n, dtype=np.int64), lon, lat, np.zeros(n),
+                                            np.arange(n), None)
+        index = SegmentIndex(store)
+        self.assertLessEqual(len(index._cles), 64 * len(index))
+        self.assertEqual(len(index._grands), 3)
+        for x, y in [(20.0, 20.0), (35.0, 35.0), (15.0, 0.0)] + list(rng.uniform(-1, 1, (10, 2))):
+            self.assertAlmostEqual(index.nearest(x, y).distance, brute_force(store, x, y))
+        self.assertEqual(len(index.query_bbox(19.9, 19.9, 20.1, 20.1)), 2)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(SegmentIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
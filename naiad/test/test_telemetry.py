@@ -0,0 +1,125 @@
+# coding=utf-8
+"""Telemetry receiver and replay test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import socket
+import time
+import unittest
+
+from naiad.replay import load_messages, replay
+from naiad.telemetry import TelemetryReceiver
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class TelemetryTest(unittest.TestCase):
+    """Test live telemetry ingest over sockets."""
+
+    def wait_for(self, receiver, expected):
+        received, store = 0, None
+        for _ in range(50):
+            lot = receiver.drain()
+            if lot is not None:
+                received += lot.n_points
+                store = lot
+            if received >= expected:
+                break
+            time.sleep(0.05)
+        return received, store
+
+    def test_tcp_json(self):
+        """JSON lines sent over TCP are batched into a store."""
+        port = free_port()
+        receiver = TelemetryReceiver(port=port, udp=False)
+        receiver.start()
+        try:
+            messages = load_messages(CSV, 'json')
+            sent, _ = replay(messages, port=port, protocol='tcp', speed=0)
+            received, store = self.wait_for(receiver, sent)
+        finally:
+            receiver.stop()
+        self.assertEqual(received, sent)
+        self.assertEqual(store.ids[0], 'AUV1')
+
+    def test_udp_csv(self):
+        """CSV datagrams are parsed with the default field order."""
+        port = free_port()
+        receiver = TelemetryReceiver(port=port, tcp=False)
+        receiver.start()
+        try:
+            messages = load_messages(CSV)[:5]
+            sent, _ = replay(messages, port=port, speed=0)
+            received, store = self.wait_for(receiver, sent)
+        finally:
+            receiver.stop()
+        self.assertEqual(received, 5)
+        self.assertFalse(receiver.running)
+
+    def test_malformed_lines_are_skipped(self):
+        """A bad line is counted and skipped without losing the rest of the batch."""
+        receiver = TelemetryReceiver()
+        receiver.push([b'{"drone_id": "A", "longitude": 1.0, "latitude": 2.0, "depth": -1, '
+                       b'"timestamp": "2024-03-13T10:00:00Z"}',
+                       b'{"drone_id": "A", "longitude": ',
+                       b'[1, 2]',
+                       b'B,1.5,2.5,-1,2024-03-13T10:01:00Z',
+                       b'B,1.5,2.5,-1,2024-03-13T10:02:00Z,extra,fields',
+                       b'B,"1.5,2.5,-1,2024-03-13T10:03:00Z',
+                       b'\xff\xfe,1,2,3,4',
+                       b'B,1.6,2.6,-1,2024-03-13T10:04:00Z'])
+        store = receiver.drain()
+        self.assertEqual(store.ids, ['A', 'B'])
+        self.assertEqual(store.n_points, 3)
+        self.assertEqual(receiver.rejected, 5)
+        self.assertIsNone(receiver.drain())
+
+    def test_buffer_is_bounded(self):
+        """Without drains, the oldest lines are dropped beyond MAX_LIGNES."""
+        class SmallReceiver(TelemetryReceiver):
+            MAX_LIGNES = 3
+
+        receiver = SmallReceiver()
+        receiver.push([b'A,1,2,0,2024-03-13T10:00:0%d' % i for i in range(5)])
+        self.assertEqual(receiver.dropped, 2)
+        store = receiver.drain()
+        self.assertEqual(store.n_points, 3)
+
+    def test_stop_closes_tcp_clients(self):
+        """Stopping the receiver cancels the handlers of connected TCP clients."""
+        port = free_port()
+        receiver = TelemetryReceiver(port=port, udp=False)
+        receiver.start()
+        client = socket.create_connection(('127.0.0.1', port))
+        try:
+            client.sendall(b'A,1.0,2.0,-1,2024-03-13T10:00:00Z\n')
+            received, _ = self.wait_for(receiver, 1)
+            self.assertEqual(received, 1)
+            receiver.stop()
+            client.settimeout(2)
+            self.assertEqual(client.recv(10), b'')
+            self.assertEqual(receiver._clients, set())
+        finally:
+            client.close()
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TelemetryTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,71 @@
+# coding=utf-8
+"""Temporal interval index test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import unittest
+
+import numpy as np
+
+from naiad.temporal_index import IntervalIndex, TemporalIndex
+from naiad.trajectory_store import TrajectoryStore
+
+
+class IntervalIndexTest(unittest.TestCase):
+    """Test the centered interval tree against a linear scan."""
+
+    def test_matches_linear_scan(self):
+        """Point and range queries return exactly the overlapping intervals."""
+        rng = np.random.default_rng(0)
+        starts = rng.integers(0, 10000, 500)
+        ends = starts + rng.integers(0, 500, 500)
+        index = IntervalIndex(starts, ends)
+        for t0 in rng.integers(-10, 10600, 200):
+            self.assertEqual(index.overlapping(t0).tolist(),
+                             np.flatnonzero((starts <= t0) & (ends >= t0)).tolist())
+            t1 = t0 + 300
+            self.assertEqual(index.overlapping(t0, t1).tolist(),
+                             np.flatnonzero((starts <= t1) & (ends >= t0)).tolist())
+
+    def test_empty(self):
+        """An empty index answers with no intervals."""
+        self.assertEqual(IntervalIndex([], []).overlapping(5).tolist(), [])
+
+
+class TemporalIndexTest(unittest.TestCase):
+    """Test active-drone and segment queries on a store."""
+
+    def setUp(self):
+        """Runs before each test."""
+        store = TrajectoryStore.from_arrays(
+            ['A', 'A', 'A', 'B', 'B', 'C'], [0, 1, 2, 0, 1, 0], [0, 0, 0, 1, 1, 2],
+            [0, 0, 0, 0, 0, 0], np.array([0, 10, 20, 15, 30, 50]), None)
+        self.index = TemporalIndex(store)
+
+    def test_active(self):
+        """Active drones come with their bracketing sample."""
+        tracks, samples = self.index.active(16)
+        self.assertEqual(tracks.tolist(), [0, 1])
+        self.assertEqual(samples.tolist(), [1, 0])
+        self.assertEqual(self.index.active(40)[0].tolist(), [])
+        self.assertEqual(self.index.started(40).tolist(), [0, 1])
+
+    def test_overlapping(self):
+        """Segments overlapping a period are returned as sample ranges."""
+        self.assertEqual(self.index.overlapping(12, 18), [(0, 1, 3), (1, 0, 2)])
+        self.assertEqual(self.index.overlapping(45, 60), [(2, 0, 1)])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TemporalIndexTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
@@ -0,0 +1,64 @@
+# coding=utf-8
+"""Trajectory store test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from naiad.trajectory_store import TrajectoryStore
+
+
+class TrajectoryStoreTest(unittest.TestCase):
+    """Test the columnar trajectory store."""
+
+    def setUp(self):
+        """Runs before each test."""
+        path = os.path.join(
+            os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+        self.df = pd.read_csv(path)
+        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+        self.store = TrajectoryStore.from_dataframe(self.df)
+
+    def test_layout(self):
+        """Tracks are contiguous, sorted slices of the shared arrays."""
+        self.assertEqual(len(self.store), self.df['drone_id'].nunique())
+        self.assertEqual(self.store.n_points, len(self.df))
+        for track_id, lon, lat, depth, times in self.store.tracks():
+            rows = self.df[self.df['drone_id'] == track_id].sort_values('timestamp')
+            self.assertEqual(lon.tolist(), rows['longitude'].tolist())
+            self.assertEqual(depth.tolist(), rows['depth'].astype(float).tolist())
+            self.assertTrue((times[1:] >= times[:-1]).all())
+            # Vues sans copie
+            self.assertTrue(np.shares_memory(lon, self.store.lon))
+
+    def test_timestamps(self):
+        """Epoch nanoseconds convert back to the original timestamps."""
+        t0, t1 = self.store.time_range()
+        self.assertEqual(self.store.timestamps(t0)[0], self.df['timestamp'].min())
+        self.assertEqual(self.store.timestamps(t1)[0], self.df['timestamp'].max())
+
+    def test_interpolated(self):
+        """Interpolation keeps the drone layout."""
+        dense = self.store.interpolated()
+        self.assertEqual(dense.ids, self.store.ids)
+        self.assertGreater(dense.n_points, self.store.n_points)
+        self.assertEqual(dense.time_range()[0], self.store.time_range()[0])
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(TrajectoryStoreTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
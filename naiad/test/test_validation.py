@@ -0,0 +1,97 @@
+# coding=utf-8
+"""Mission validation test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'ruohan.yin@etu.univ-grenoble-alpes.fr'
+__date__ = '2025-03-21'
+__copyright__ = 'Copyright 2025, YIN Ruoahn'
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from naiad.ingest import parse_timestamps
+from naiad.validation import validate_mission
+
+CSV = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'testfile.csv')
+
+
+class ValidateMissionTest(unittest.TestCase):
+    """Test the vectorized validation report."""
+
+    def setUp(self):
+        """Runs before each test."""
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Runs after each test."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def write(self, text):
+        path = os.path.join(self.directory, 'mission.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_sample_file_is_clean(self):
+        """The shipped sample file has no problem."""
+        rapport = validate_mission(CSV)
+        self.assertTrue(rapport.valide)
+        self.assertEqual(rapport.problemes, [])
+
+    def test_missing_columns(self):
+        """Missing columns are reported before reading the data."""
+        rapport = validate_mission(self.write('drone_id,longitude,latitude\nA,1,2\n'))
+        self.assertFalse(rapport.valide)
+        self.assertEqual([p.code for p in rapport.problemes], ['colonnes'])
+        self.assertIn('timestamp', rapport.problemes[0].message)
+
+    def test_row_numbers(self):
+        """Each problem lists the file line numbers involved."""
+        rapport = validate_mission(self.write(
+            'drone_id,longitude,latitude,depth,timestamp\n'
+            'A,1.0,2.0,-1,2024-03-13T10:00:00Z\n'       # 2
+            'A,abc,2.0,-1,2024-03-13T10:01:00Z\n'       # 3 lon non numérique
+            'A,1.0,95.0,-1,2024-03-13T10:02:00Z\n'      # 4 lat hors plage
+            'A,1.0,2.0,,2024-03-13T10:03:00Z\n'         # 5 profondeur manquante
+            'A,1.0,2.0,-1,pas une date\n'               # 6 horodatage illisible
+            'A,1.0,2.0,-1,2024-03-13T10:03:00Z\n'       # 7 doublon de 5
+            'A,1.0,2.0,-1,2024-03-13T10:02:30Z\n'       # 8 recul
+            'A,1.0,2.0,-1,2024-03-13T14:00:00Z\n'       # 9 interruption
+            ',1.0,2.0,-1,2024-03-13T10:00:00Z\n'))      # 10 identifiant manquant
+        lignes = {p.code: p.lignes.tolist() for p in rapport.problemes}
+        self.assertEqual(lignes['lon'], [3])
+        self.assertEqual(lignes['lat_plage'], [4])
+        self.assertEqual(lignes['depth'], [5])
+        self.assertEqual(lignes['timestamp'], [6])
+        self.assertEqual(lignes['doublon'], [7])
+        self.assertEqual(lignes['ordre'], [8])
+        self.assertEqual(lignes['ecart'], [9])
+        self.assertEqual(lignes['id'], [10])
+        self.assertFalse(rapport.valide)
+        self.assertIn('ligne(s) : 3', rapport.resume())
+
+    def test_fast_timestamp_parser_matches_pandas(self):
+        """The byte-level ISO parser agrees with pandas and rejects invalid dates."""
+        valeurs = np.array(['2024-03-13T10:00:00Z', '2024-02-29 23:59:59', '2023-02-29T00:00:00Z',
+                            '1969-12-31T23:59:59Z', '2024-03-13T10:00:00+02:00', 'x', None], dtype=object)
+        ns, ok = parse_timestamps(valeurs)
+        self.assertEqual(ok.tolist(), [True, True, False, True, True, False, False])
+        attendu = pd.to_datetime(pd.Series(valeurs[ok]), utc=True, format='mixed').dt.as_unit('ns')
+        self.assertEqual(ns[ok].tolist(), attendu.array.asi8.tolist())
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ValidateMissionTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
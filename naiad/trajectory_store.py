@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Stockage columnar des trajectoires NAIAD
+
+Les positions de tous les drones sont rangées dans des tableaux contigus
+(lon, lat, profondeur en float64, instants en int64 ns depuis l'époque UTC),
+triés par drone puis par temps. Les points du drone ``ids[k]`` occupent
+l'intervalle ``offsets[k]:offsets[k+1]`` : chaque trajectoire est une vue,
+sans copie ni objet Python par point. Ce module est partagé par le plugin
+QGIS et la visualisation pygame.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .interpolation import interpolate_segments
+from .kinematics import compute_kinematics, track_summary
+
+
+def to_epoch_ns(values):
+    """Convertit une colonne de dates pandas en entiers int64 (ns depuis l'époque, UTC)."""
+    return np.asarray(pd.Series(values).values).astype("datetime64[ns]").view(np.int64)
+
+
+def from_epoch_ns(ns, tz=None):
+    """Reconstruit un DatetimeIndex (fuseau ``tz`` éventuel) depuis des entiers ns."""
+    index = pd.DatetimeIndex(np.asarray(ns, dtype=np.int64).view("datetime64[ns]"))
+    if tz is not None:
+        index = index.tz_localize("UTC").tz_convert(tz)
+    return index
+
+
+class TrajectoryStore:
+    """Trajectoires de plusieurs drones en tableaux contigus découpés par drone."""
+
+    def __init__(self, ids, lon, lat, depth, times, offsets, tz=None):
+        self.ids = list(ids)
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.depth = np.asarray(depth, dtype=np.float64)
+        self.times = np.asarray(times, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.tz = tz
+        self._index = {track_id: k for k, track_id in enumerate(self.ids)}
+
+    @classmethod
+    def from_dataframe(cls, df, id_col="drone_id", lon_col="longitude", lat_col="latitude",
+                       time_col="timestamp", depth_col="depth"):
+        """
+        Construit le stockage depuis un DataFrame dont ``time_col`` est de type datetime.
+
+        Les lignes sont triées (tri stable) par drone puis par temps ; la
+        profondeur vaut 0 si ``depth_col`` est absente.
+        """
+        df = df.sort_values([id_col, time_col], kind="mergesort")
+        ids, counts = np.unique(df[id_col].to_numpy(), return_counts=True)
+        offsets = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        if depth_col in df.columns:
+            depth = df[depth_col].to_numpy(dtype=np.float64)
+        else:
+            depth = np.zeros(len(df), dtype=np.float64)
+        return cls(
+            ids.tolist(),
+            df[lon_col].to_numpy(dtype=np.float64),
+            df[lat_col].to_numpy(dtype=np.float64),
+            depth,
+            to_epoch_ns(df[time_col]),
+            offsets,
+            getattr(df[time_col].dt, "tz", None),
+        )
+
+    @classmethod
+    def from_arrays(cls, ids, lon, lat, depth, times, tz=None):
+        """Construit le stockage depuis des colonnes non triées (tri stable par drone puis temps)."""
+        valeurs, codes = np.unique(np.asarray(ids), return_inverse=True)
+        codes = codes.ravel()
+        ordre = np.lexsort((times, codes))
+        offsets = np.zeros(len(valeurs) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(valeurs)), out=offsets[1:])
+        return cls(
+            valeurs.tolist(),
+            np.asarray(lon, dtype=np.float64)[ordre],
+            np.asarray(lat, dtype=np.float64)[ordre],
+            np.asarray(depth, dtype=np.float64)[ordre],
+            np.asarray(times, dtype=np.int64)[ordre],
+            offsets,
+            tz,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_points(self):
+        return len(self.times)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.lon, self.lat, self.depth, self.times, self.offsets))
+
+    def index(self, track_id):
+        """Rang du drone ``track_id`` dans le stockage."""
+        return self._index[track_id]
+
+    def track(self, k):
+        """Vues (lon, lat, depth, times) de la trajectoire de rang ``k``."""
+        a, b = self.offsets[k], self.offsets[k + 1]
+        return self.lon[a:b], self.lat[a:b], self.depth[a:b], self.times[a:b]
+
+    def tracks(self):
+        """Itère sur (track_id, lon, lat, depth, times) pour chaque drone."""
+        for k, track_id in enumerate(self.ids):
+            yield (track_id,) + self.track(k)
+
+    def bounds(self):
+        """Emprise (lon_min, lat_min, lon_max, lat_max) de tous les points."""
+        return self.lon.min(), self.lat.min(), self.lon.max(), self.lat.max()
+
+    def time_range(self):
+        """Premier et dernier instant (ns) de la mission."""
+        return int(self.times.min()), int(self.times.max())
+
+    def timestamps(self, ns):
+        """Instants ns convertis en DatetimeIndex dans le fuseau de la mission."""
+        return from_epoch_ns(np.atleast_1d(ns), self.tz)
+
+    def interpolated(self, policy=None):
+        """Nouveau stockage contenant les échantillons interpolés de chaque segment (voir SamplingPolicy)."""
+        lon, lat, depth, times, offsets = interpolate_segments(
+            self.lon, self.lat, self.depth, self.times, self.offsets, policy)
+        return TrajectoryStore(self.ids, lon, lat, depth, times, offsets, self.tz)
+
+    def kinematics(self):
+        """Longueurs, vitesses, caps, vitesses verticales et distances cumulées (voir Kinematics)."""
+        return compute_kinematics(self.lon, self.lat, self.depth, self.times, self.offsets)
+
+    def summary(self, kinematics=None):
+        """Par drone : (longueur totale en m, vitesse moyenne, vitesse maximale en m/s)."""
+        if kinematics is None:
+            kinematics = self.kinematics()
+        return track_summary(kinematics, self.times, self.offsets)
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Validation d'un fichier de mission avant chargement
+
+``validate_mission`` lit les colonnes utiles en une passe puis applique des
+contrôles vectorisés : présence des colonnes, types, plages de coordonnées,
+horodatages illisibles, doublons (drone, instant), ordre chronologique par
+drone et interruptions anormales. Le résultat est un RapportValidation qui
+liste chaque problème avec les numéros de lignes concernés (numérotation du
+fichier, en-tête = ligne 1).
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .ingest import BORNES, COLONNES_DEFAUT, parse_timestamps
+
+# Un problème détecté : niveau ("erreur" ou "avertissement"), code, message et lignes du fichier
+Probleme = namedtuple("Probleme", ["niveau", "code", "message", "lignes"])
+
+# Une interruption est signalée au-delà de ce multiple du pas d'échantillonnage médian
+FACTEUR_ECART = 10
+# Nombre de numéros de lignes cités par problème dans le résumé
+LIGNES_RESUME = 10
+
+
+class RapportValidation:
+    """Problèmes détectés dans un fichier de mission."""
+
+    def __init__(self, path, n_rows=0):
+        self.path = path
+        self.n_rows = n_rows
+        self.problemes = []
+
+    def ajouter(self, niveau, code, message, lignes=None):
+        """Enregistre un problème ; ignoré si ``lignes`` est fourni mais vide."""
+        if lignes is not None and not len(lignes):
+            return
+        lignes = np.asarray(lignes if lignes is not None else [], dtype=np.int64)
+        self.problemes.append(Probleme(niveau, code, message, lignes))
+
+    @property
+    def erreurs(self):
+        return [p for p in self.problemes if p.niveau == "erreur"]
+
+    @property
+    def avertissements(self):
+        return [p for p in self.problemes if p.niveau == "avertissement"]
+
+    @property
+    def valide(self):
+        """Vrai si aucune erreur (les avertissements n'empêchent pas le chargement)."""
+        return not self.erreurs
+
+    def resume(self):
+        """Texte lisible du rapport, limité aux premières lignes de chaque problème."""
+        if not self.problemes:
+            return f"{self.n_rows} lignes, aucun problème détecté"
+        texte = [f"{self.n_rows} lignes, {len(self.erreurs)} erreur(s), "
+                 f"{len(self.avertissements)} avertissement(s)"]
+        for p in self.problemes:
+            ligne = f"[{p.niveau}] {p.message}"
+            if len(p.lignes):
+                cites = ", ".join(str(n) for n in p.lignes[:LIGNES_RESUME].tolist())
+                suite = " ..." if len(p.lignes) > LIGNES_RESUME else ""
+                ligne += f" ({len(p.lignes)} ligne(s) : {cites}{suite})"
+            texte.append(ligne)
+        return "\n".join(texte)
+
+
+def validate_mission(path, columns=None):
+    """Contrôle complet d'un CSV de mission ; retourne un RapportValidation."""
+    columns = dict(COLONNES_DEFAUT, **(columns or {}))
+    rapport = RapportValidation(path)
+
+    # 1. Schéma
+    entete = list(pd.read_csv(path, nrows=0).columns)
+    manquants = [c for c in columns.values() if c not in entete]
+    if manquants:
+        rapport.ajouter("erreur", "colonnes", f"Champs manquants: {', '.join(manquants)}")
+        return rapport
+
+    id_col, t_col = columns["id"], columns["time"]
+    df = pd.read_csv(path, usecols=list(dict.fromkeys(columns.values())),
+                     dtype={id_col: object, t_col: object})
+    rapport.n_rows = len(df)
+    lignes = np.arange(len(df), dtype=np.int64) + 2
+
+    # 2. Types et plages
+    ids = df[id_col].to_numpy()
+    sans_id = pd.isna(ids)
+    rapport.ajouter("erreur", "id", "Identifiant de drone manquant", lignes[sans_id])
+
+    for role, nom in (("lon", "Longitude"), ("lat", "Latitude")):
+        borne = BORNES[role]
+        valeurs = pd.to_numeric(df[columns[role]], errors="coerce").to_numpy(dtype=np.float64)
+        rapport.ajouter("erreur", role, f"{nom} manquante ou non numérique", lignes[np.isnan(valeurs)])
+        rapport.ajouter("erreur", role + "_plage", f"{nom} hors de [-{borne:g}, {borne:g}]",
+                        lignes[np.abs(valeurs) > borne])
+
+    profondeur = pd.to_numeric(df[columns["depth"]], errors="coerce").to_numpy(dtype=np.float64)
+    rapport.ajouter("avertissement", "depth", "Profondeur manquante ou non numérique (remplacée par 0)",
+                    lignes[np.isnan(profondeur)])
+
+    times, lisibles = parse_timestamps(df[t_col].to_numpy())
+    rapport.ajouter("erreur", "timestamp", "Horodatage illisible", lignes[~lisibles])
+
+    # 3. Cohérence par drone, sur les lignes dont l'identifiant et l'instant sont lisibles
+    valides = np.flatnonzero(lisibles & ~sans_id)
+    codes = pd.factorize(ids[valides])[0]
+    t = times[valides]
+
+    ordre = np.lexsort((t, codes))
+    meme = codes[ordre][1:] == codes[ordre][:-1]
+    pas = np.diff(t[ordre])
+    doublons = ordre[1:][meme & (pas == 0)]
+    rapport.ajouter("avertissement", "doublon", "Position en double (même drone, même instant)",
+                    np.sort(lignes[valides[doublons]]))
+
+    # Ordre du fichier à l'intérieur de chaque drone
+    fichier = np.argsort(codes, kind="stable")
+    recul = fichier[1:][(codes[fichier][1:] == codes[fichier][:-1]) & (np.diff(t[fichier]) < 0)]
+    rapport.ajouter("avertissement", "ordre", "Horodatage antérieur au précédent du même drone",
+                    np.sort(lignes[valides[recul]]))
+
+    positifs = pas[meme & (pas > 0)]
+    if len(positifs):
+        seuil = FACTEUR_ECART * np.median(positifs)
+        ecarts = ordre[1:][meme & (pas > seuil)]
+        rapport.ajouter("avertissement", "ecart",
+                        f"Interruption de plus de {pd.Timedelta(int(seuil), 'ns')} dans la trajectoire",
+                        np.sort(lignes[valides[ecarts]]))
+    return rapport